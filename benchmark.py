@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Haze Visuals Discord Bot - Ticket Benchmark
+Runs the real bot against the local Discord stand-in and measures ticket throughput
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+from fakediscord import FakeDiscord, INTERACTION_DEADLINE
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DISCOUNT_CODE = "BENCH"
+BANNER_SIZE = 2 * 1024 * 1024  # bytes, roughly the size of the real banner GIFs
+
+def write_banner_gif(path, size=BANNER_SIZE):
+    """Write a valid 1x1 GIF padded to ``size`` bytes with comment blocks (stands in for the banner assets)"""
+    header = b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff'
+    image = b'\x2c\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02\x44\x01\x00'
+    blocks = max(0, (size - len(header) - len(image) - 4) // 256)
+    with open(path, 'wb') as f:
+        f.write(header + b'\x21\xfe' + (b'\xff' + b'\x00' * 255) * blocks + b'\x00' + image + b'\x3b')
+
+def percentile(samples, pct):
+    """Return the pct-th percentile (0-100) of a list of numbers"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+def embed_title(prefix):
+    """Predicate for messages with an embed whose title starts with ``prefix``"""
+    return lambda message: any((embed.get('title') or '').startswith(prefix) for embed in message['embeds'])
+
+class StageFailed(Exception):
+    pass
+
+class BotHarness:
+    """Starts main.py's bot against a FakeDiscord with the guild layout of the default server config.
+
+    The bot runs on the calling loop; customers and staff are driven on the
+    fake's loop, so their timings are not skewed by a busy bot loop. All
+    files the bot writes go to a temporary working directory.
+    """
+    def __init__(self, fake, appointment_hours='00:00-23:59', appointment_slot_minutes=5):
+        self.fake = fake
+        self.workdir = tempfile.mkdtemp(prefix="ticketbot-bench-")
+        self.main = None
+        self.guild_id = None
+        self.panel_channel_id = None
+        self.staff_id = None
+        self._bot_task = None
+        self._env = {
+            'DATABASE_PATH': os.path.join(self.workdir, 'ticketbot.db'),
+            'PORT': '0',
+            'WEB_HOST': '127.0.0.1',
+            'LOG_LEVEL': os.getenv('LOG_LEVEL', 'WARNING'),
+            'APPOINTMENT_OPENING_HOURS': appointment_hours,
+            'APPOINTMENT_SLOT_MINUTES': str(appointment_slot_minutes),
+        }
+
+    def _import_main(self):
+        os.environ.update(self._env)
+        os.chdir(self.workdir)
+        sys.path.insert(0, REPO_DIR)
+        import main
+        # The banner GIFs are not part of the repository; generated stand-ins let the upload cache run
+        os.makedirs(os.path.dirname(main.DEFAULT_BANNER_PATH), exist_ok=True)
+        for path in {main.DEFAULT_BANNER_PATH, main.PANEL_BANNER_PATH}:
+            write_banner_gif(path)
+        return main
+
+    def _build_guild(self):
+        main, fake = self.main, self.fake
+        config = main.get_default_config()
+        guild_id = fake.add_guild("Haze Visuals Bench")
+        for name in (config['roles']['customer_role'], config['roles']['staff_role'], config['roles']['admin_role']):
+            fake.add_role(guild_id, name, position=10)
+        for name, channel_id in config['categories'].items():
+            fake.add_channel(guild_id, name, type=4, channel_id=channel_id)
+        fake.add_channel(guild_id, "counter", type=4, channel_id=main.COUNTER_CATEGORY_ID)
+        for name, channel_id in config['channels'].items():
+            if channel_id:
+                fake.add_channel(guild_id, name.replace('_', '-'), channel_id=channel_id)
+        self.panel_channel_id = fake.add_channel(guild_id, "ticket-panel")
+        server_config = main.get_server_config(guild_id)
+        server_config['channels']['asset_channel'] = fake.add_channel(guild_id, "bot-assets")
+        main.save_server_config(guild_id, server_config)
+        self.staff_id = fake.add_member(guild_id, "bench-staff", roles=[fake.role_id(guild_id, config['roles']['staff_role'])])
+        self.guild_id = guild_id
+
+    def add_customer(self, name):
+        return self.fake.add_member(self.guild_id, name)
+
+    async def start(self, timeout=30.0):
+        self.fake.start()
+        self.fake.install()
+        self.main = self._import_main()
+        self._build_guild()
+
+        await self.main.save_discount_code(DISCOUNT_CODE, 0.1)
+        self.main.bot._connection.guild_ready_timeout = 0.1
+        self._bot_task = asyncio.create_task(self.main.bot.start("fake-token"))
+        deadline = time.monotonic() + timeout
+        while self.main.startup.last_run_time is None:
+            if self._bot_task.done():
+                self._bot_task.result()
+            if time.monotonic() > deadline:
+                raise TimeoutError("bot did not finish startup")
+            await asyncio.sleep(0.05)
+
+    async def stop(self):
+        if self.main is not None:
+            await self.main.bot.close()
+            if self._bot_task:
+                await asyncio.gather(self._bot_task, return_exceptions=True)
+        self.fake.stop()
+        os.chdir(REPO_DIR)
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+class StageStats:
+    """Latency samples and failures per stage"""
+    def __init__(self):
+        self.samples = collections.defaultdict(list)
+        self.failures = collections.Counter()
+        self.retries = collections.Counter()   # clicks the bot did not answer in time
+        self.errors = collections.defaultdict(collections.Counter)
+
+    def summary(self):
+        rows = {}
+        for stage in list(dict.fromkeys([*self.samples, *self.failures])):
+            samples = self.samples[stage]
+            attempts = len(samples) + self.failures[stage]
+            rows[stage] = {
+                'count': len(samples),
+                'failures': self.failures[stage],
+                'failure_rate': self.failures[stage] / attempts if attempts else 0.0,
+                'retries': self.retries[stage],
+                'p50_ms': percentile(samples, 50) * 1000,
+                'p90_ms': percentile(samples, 90) * 1000,
+                'p99_ms': percentile(samples, 99) * 1000,
+                'max_ms': max(samples, default=0.0) * 1000,
+                'errors': dict(self.errors[stage]),
+            }
+        return rows
+
+class TicketJourney:
+    """One customer's Bestellung ticket, driven stage by stage on the fake's loop.
+
+    Every stage clicks like a user would and waits until the bot produced
+    the visible result of that step (the next message or the deleted
+    channel); its latency is from the click until then.
+    """
+    def __init__(self, harness, stats, name, think_time=0.0, reaction_time=0.1, timeout=20.0):
+        self.harness = harness
+        self.fake = harness.fake
+        self.stats = stats
+        self.name = name
+        self.user_id = harness.add_customer(name)
+        self.think_time = think_time
+        self.reaction_time = reaction_time
+        self.timeout = timeout
+        self.paused = 0.0
+        self.current_stage = None
+        self.channel_id = None
+        self.control_message = None
+
+    async def react(self):
+        # A user needs a moment before clicking what just appeared (and the bot to store
+        # its view); this pause is not counted in the stage latency
+        started = time.monotonic()
+        await asyncio.sleep(self.reaction_time)
+        self.paused += time.monotonic() - started
+
+    async def stage(self, name, step):
+        self.current_stage = name
+        self.paused = 0.0
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(step(), self.timeout)
+        except Exception as e:
+            self.stats.failures[name] += 1
+            self.stats.errors[name][type(e).__name__ if not str(e) else str(e)[:80]] += 1
+            raise StageFailed(name) from e
+        self.stats.samples[name].append(time.monotonic() - started - self.paused)
+        if self.think_time:
+            await asyncio.sleep(self.fake.random.uniform(0.5, 1.5) * self.think_time)
+
+    async def click(self, message, label, user_id=None, channel_id=None, attempts=3):
+        """Click a button; like a user, click again if Discord reports the interaction as failed"""
+        custom_id = self.fake.find_button(message, label)
+        if custom_id is None:
+            raise StageFailed(f"no button '{label}'")
+        for _ in range(attempts):
+            await self.react()
+            interaction = await self.fake.click(
+                self.harness.guild_id, user_id or self.user_id, channel_id or self.channel_id, custom_id, message
+            )
+            try:
+                await asyncio.wait_for(asyncio.shield(interaction.response), INTERACTION_DEADLINE)
+                return interaction
+            except asyncio.TimeoutError:
+                self.stats.retries[self.current_stage] += 1
+        raise StageFailed(f"'{label}' not answered")
+
+    async def next_message(self, predicate, after, user_id=None):
+        return await self.fake.wait_for_message(self.channel_id, predicate, user_id=user_id, after=after, timeout=self.timeout)
+
+    async def submit(self, interaction, values):
+        if interaction.modal is None:
+            raise StageFailed("no modal")
+        await self.react()
+        submitted = await self.fake.submit_modal(self.harness.guild_id, self.user_id, interaction, values)
+        await submitted.response
+        return submitted
+
+    # Stages
+
+    async def open_ticket(self):
+        fake = self.fake
+        interaction = await fake.click(self.harness.guild_id, self.user_id, self.harness.panel_channel_id, "ticket_bestellung")
+        followup = await fake.wait_for(lambda: interaction.followups and interaction.followups[-1], self.timeout)
+        match = re.search(r'<#(\d+)>', followup['content'])
+        if not match:
+            raise StageFailed(followup['content'][:80])
+        self.channel_id = int(match.group(1))
+        self.control_message = await self.next_message(lambda m: fake.find_button(m, "Paid"), 0)
+
+    async def custom_details(self):
+        clothing = await self.next_message(embed_title("👕 Clothing Bestellung"), 0)
+        after = self.fake.snowflake()
+        interaction = await self.click(clothing, "Custom")
+        await self.submit(interaction, ["Schwarz", "Gold", f"Bench{self.user_id % 1000}"])
+        self.products = await self.next_message(embed_title("📦 Produkt Auswahl"), after)
+
+    async def choose_product(self):
+        after = self.fake.snowflake()
+        await self.click(self.products, "Custom Paket")
+        self.discount_choice = await self.next_message(embed_title("🎟️ Discount Code"), after)
+
+    async def redeem_discount(self):
+        after = self.fake.snowflake()
+        interaction = await self.click(self.discount_choice, "Discount Code verwenden")
+        await self.submit(interaction, [DISCOUNT_CODE])
+        self.delivery = await self.next_message(embed_title("🚚 Delivery Optionen"), after)
+        if DISCOUNT_CODE not in self.delivery['embeds'][0]['description']:
+            raise StageFailed("discount not applied")
+
+    async def choose_delivery(self):
+        after = self.fake.snowflake()
+        await self.click(self.delivery, "Standard Delivery")
+        self.payment = await self.next_message(embed_title("💳 Zahlung"), after)
+
+    async def pay(self):
+        after = self.fake.snowflake()
+        await self.click(self.payment, "PayPal")
+        paypal = await self.next_message(embed_title("💙 PayPal Zahlung"), after)
+        await self.click(paypal, "Zahlung gesendet")
+        await self.next_message(embed_title("⏳ Zahlung wird verarbeitet"), after)
+
+    async def mark_paid(self):
+        after = self.fake.snowflake()
+        await self.click(self.control_message, "Paid", user_id=self.harness.staff_id)
+        self.appointment_days = await self.next_message(embed_title("📅 Termin buchen"), after)
+
+    async def book_appointment(self, attempts=5):
+        days = list(self.fake.buttons(self.appointment_days))
+        for _ in range(attempts):
+            day = await self.click(self.appointment_days, self.fake.random.choice(days))
+            times = day.response_message
+            if not times or not self.fake.buttons(times):
+                raise StageFailed("no time slots offered")
+            booking = await self.click(times, self.fake.random.choice(list(self.fake.buttons(times))))
+            message = booking.response_message or {}
+            if any((embed.get('title') or '').startswith("✅ Termin gebucht") for embed in message.get('embeds', [])):
+                return
+        raise StageFailed("no free slot after retries")
+
+    async def close(self):
+        await self.click(self.control_message, "Close", user_id=self.harness.staff_id)
+        await self.fake.wait_for(lambda: self.channel_id not in self.fake.channels, self.timeout)
+
+    STAGES = (
+        ('create', open_ticket),
+        ('custom_details', custom_details),
+        ('product', choose_product),
+        ('discount', redeem_discount),
+        ('delivery', choose_delivery),
+        ('payment', pay),
+        ('paid', mark_paid),
+        ('appointment', book_appointment),
+        ('close', close),
+    )
+
+    async def run(self, stages=None):
+        """Walk through the stages; returns True if all of them succeeded"""
+        for name, step in self.STAGES:
+            if stages is not None and name not in stages:
+                continue
+            try:
+                await self.stage(name, lambda: step(self))
+            except StageFailed:
+                return False
+        return True
+
+SCENARIOS = {
+    'create': ('create', 'close'),
+    'order': ('create', 'custom_details', 'product', 'discount', 'delivery', 'payment', 'close'),
+    'lifecycle': None,  # all stages including payment confirmation and appointment
+}
+
+async def run_tickets(harness, stats, count, concurrency, stages=None, think_time=0.0, prefix="customer"):
+    """Run ``count`` journeys with at most ``concurrency`` at a time; returns (succeeded, seconds)"""
+    fake = harness.fake
+    semaphore = asyncio.Semaphore(concurrency)
+    journeys = [TicketJourney(harness, stats, f"{prefix}{index:04d}", think_time) for index in range(count)]
+
+    async def one(journey):
+        async with semaphore:
+            return await journey.run(stages)
+
+    async def all_journeys():
+        started = time.monotonic()
+        results = await asyncio.gather(*(one(journey) for journey in journeys))
+        return sum(results), time.monotonic() - started
+
+    return await fake.run(all_journeys())
+
+def api_snapshot(fake):
+    return collections.Counter(fake.calls), sum(fake.rate_limited.values()), fake.failed_interactions()
+
+def print_stages(rows):
+    print(f"{'Stage':<16}{'OK':>6}{'Fail':>6}{'Retry':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage, row in rows.items():
+        print(f"{stage:<16}{row['count']:>6}{row['failures']:>6}{row['retries']:>7}{row['p50_ms']:>10.0f}{row['p90_ms']:>10.0f}{row['p99_ms']:>10.0f}{row['max_ms']:>10.0f}")
+        for error, count in row['errors'].items():
+            print(f"    ❌ {count}x {error}")
+
+async def benchmark(args):
+    limits = {'rate_limits': {}, 'sub_limits': {}, 'default_bucket': None, 'global_limit': None} if args.no_rate_limits else {}
+    fake = FakeDiscord(seed=args.seed, rest_latency=args.rest_latency, channel_create_latency=args.channel_latency, **limits)
+    harness = BotHarness(fake)
+    await harness.start()
+    try:
+        if args.warmup:
+            await run_tickets(harness, StageStats(), args.warmup, args.concurrency, SCENARIOS[args.scenario], prefix="warmup")
+
+        stats = StageStats()
+        calls_before, limited_before, failed_before = api_snapshot(fake)
+        succeeded, seconds = await run_tickets(harness, stats, args.tickets, args.concurrency, SCENARIOS[args.scenario], args.think_time)
+        # Let the ticket log flush so its calls are part of the total
+        await harness.main.ticket_log.flush()
+        calls_after, limited_after, failed_after = api_snapshot(fake)
+        calls = calls_after - calls_before
+
+        result = {
+            'scenario': args.scenario,
+            'tickets': args.tickets,
+            'concurrency': args.concurrency,
+            'succeeded': succeeded,
+            'seconds': seconds,
+            'tickets_per_second': succeeded / seconds if seconds else 0.0,
+            'api_calls_per_ticket': sum(calls.values()) / args.tickets,
+            'rate_limited': limited_after - limited_before,
+            'failed_interactions': failed_after - failed_before,
+            'stages': stats.summary(),
+            'routes': dict(calls.most_common(10)),
+            'banner_cache': harness.main.banner_assets.stats(),
+        }
+    finally:
+        await harness.stop()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    print(f"\n🎫 Szenario '{args.scenario}': {succeeded}/{args.tickets} Tickets in {seconds:.1f}s "
+          f"(Concurrency {args.concurrency}, Seed {args.seed})")
+    print(f"⚡ Durchsatz: {result['tickets_per_second']:.2f} Tickets/s")
+    print(f"📡 API-Calls pro Ticket: {result['api_calls_per_ticket']:.1f} · 429er: {result['rate_limited']} · "
+          f"fehlgeschlagene Interaktionen: {result['failed_interactions']}")
+    banner = result['banner_cache']
+    print(f"🖼️ Banner-Cache: {banner.get('uploads', 0)} Uploads · {banner.get('hits', 0)} Hits · "
+          f"{banner.get('misses', 0)} Misses · {banner.get('errors', 0)} Fehler\n")
+    print_stages(result['stages'])
+    print("\n📊 Häufigste Routen (pro Ticket):")
+    for route, count in result['routes'].items():
+        print(f"    {count / args.tickets:>6.1f}  {route}")
+    return result
+
+def parse_args(argv=None, description=__doc__):
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='lifecycle',
+                        help="create: nur Erstellen/Schließen, order: bis zur Zahlung, lifecycle: alles inkl. Termin")
+    parser.add_argument('--tickets', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=2, help="Tickets vor der Messung (nicht gezählt)")
+    parser.add_argument('--think-time', type=float, default=0.0, help="Sekunden Pause zwischen den Schritten eines Kunden")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--rest-latency', type=float, default=0.03, help="Simulierte Latenz pro REST-Aufruf in Sekunden")
+    parser.add_argument('--channel-latency', type=float, default=0.25, help="Simulierte Latenz beim Kanal-Erstellen")
+    parser.add_argument('--no-rate-limits', action='store_true')
+    parser.add_argument('--json', metavar='DATEI', help="Ergebnis zusätzlich als JSON speichern")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    asyncio.run(benchmark(parse_args()))
@@ -0,0 +1,841 @@
+#!/usr/bin/env python3
+"""
+Haze Visuals Discord Bot - Local Discord Stand-in
+Offline fake of Discord's REST API and gateway for benchmarks and load tests
+"""
+
+import asyncio
+import collections
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+
+from aiohttp import web
+import discord
+import yarl
+
+API_VERSION = 10
+INTERACTION_DEADLINE = 3.0   # seconds until Discord rejects the initial response
+FOLLOWUP_LIFETIME = 15 * 60  # seconds an interaction token accepts followups
+EPHEMERAL = 1 << 6
+
+# (method, route) -> (requests, per seconds); buckets are kept per major parameter
+DEFAULT_RATE_LIMITS = {
+    ('POST', '/channels/{channel_id}/messages'): (5, 5.0),
+    ('PATCH', '/channels/{channel_id}/messages/{message_id}'): (5, 5.0),
+    ('DELETE', '/channels/{channel_id}/messages/{message_id}'): (5, 1.0),
+    ('PATCH', '/channels/{channel_id}'): (5, 5.0),
+    ('POST', '/guilds/{guild_id}/channels'): (10, 10.0),
+    ('DELETE', '/channels/{channel_id}'): (5, 5.0),
+    ('PUT', '/guilds/{guild_id}/members/{user_id}/roles/{role_id}'): (10, 10.0),
+    ('POST', '/webhooks/{webhook_id}/{webhook_token}'): (5, 2.0),
+}
+# Limits Discord enforces without announcing them in the headers: (method, route) -> (field, requests, per seconds)
+DEFAULT_SUB_LIMITS = {
+    ('PATCH', '/channels/{channel_id}'): ('name', 2, 600.0),  # channel renames
+}
+DEFAULT_BUCKET = (50, 1.0)
+GLOBAL_RATE_LIMIT = (50, 1.0)
+UNLIMITED_ROUTES = {('POST', '/interactions/{interaction_id}/{interaction_token}/callback')}
+
+ADMINISTRATOR = 1 << 3
+
+def json_response(payload, status=200, headers=None):
+    # discord.py only decodes bodies whose content type is exactly application/json (no charset)
+    return web.Response(body=json.dumps(payload).encode(), status=status,
+                        headers={**(headers or {}), 'Content-Type': 'application/json'})
+
+class FakeHTTPError(Exception):
+    def __init__(self, status, message, code=0):
+        super().__init__(message)
+        self.status = status
+        self.payload = {'message': message, 'code': code}
+
+class SnowflakeFactory:
+    """Snowflakes carrying the current time (discord.py derives created_at from them)"""
+    def __init__(self):
+        self._counter = itertools.count(1)
+
+    def __call__(self):
+        return discord.utils.time_snowflake(datetime.now(timezone.utc)) + next(self._counter) % (1 << 22)
+
+class RateLimiter:
+    """Fixed-window buckets per route and major parameter, plus the global limit"""
+    def __init__(self, limits, default, global_limit, sub_limits=None):
+        self.limits = limits
+        self.sub_limits = sub_limits or {}
+        self.default = default
+        self.global_limit = global_limit
+        self._windows = {}  # key -> [window_start, used]
+
+    def _take(self, key, limit, per, now):
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= per:
+            window = self._windows[key] = [now, 0]
+        if window[1] >= limit:
+            return False, 0, window[0] + per - now
+        window[1] += 1
+        return True, limit - window[1], window[0] + per - now
+
+    def check(self, method, route, major, body=None, use_global=True):
+        """Return (allowed, headers, retry_after, is_global)"""
+        now = time.monotonic()
+        if self.global_limit and use_global:
+            allowed, _, reset_after = self._take('global', *self.global_limit, now)
+            if not allowed:
+                return False, {'X-RateLimit-Global': 'true', 'X-RateLimit-Scope': 'global'}, reset_after, True
+        sub_limit = self.sub_limits.get((method, route))
+        if sub_limit and isinstance(body, dict) and sub_limit[0] in body:
+            field, limit, per = sub_limit
+            allowed, _, reset_after = self._take((method, route, field, major), limit, per, now)
+            if not allowed:
+                return False, {'X-RateLimit-Scope': 'shared'}, reset_after, False
+        limit, per = self.limits.get((method, route), self.default) or (None, None)
+        if limit is None:
+            return True, {}, 0, False
+        bucket = f"{method} {route}"
+        allowed, remaining, reset_after = self._take((bucket, major), limit, per, now)
+        headers = {
+            'X-RateLimit-Limit': str(limit),
+            'X-RateLimit-Remaining': str(remaining),
+            'X-RateLimit-Reset': f"{time.time() + reset_after:.3f}",
+            'X-RateLimit-Reset-After': f"{reset_after:.3f}",
+            'X-RateLimit-Bucket': format(zlib.crc32(bucket.encode()), '08x'),
+        }
+        if not allowed:
+            headers['X-RateLimit-Scope'] = 'user'
+        return allowed, headers, reset_after, False
+
+class FakeInteraction:
+    """An interaction sent to the bot and the responses it got"""
+    def __init__(self, interaction_id, token, kind, user_id, guild_id, channel_id, data):
+        self.id = interaction_id
+        self.token = token
+        self.type = kind
+        self.user_id = user_id
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.data = data
+        self.created = time.monotonic()
+        self.response = asyncio.get_running_loop().create_future()  # (callback type, data)
+        self.acknowledged = False
+        self.response_message = None
+        self.followups = []
+
+    @property
+    def modal(self):
+        """The modal the bot opened in response, or None"""
+        if self.response.done() and not self.response.cancelled() and self.response.result()[0] == 9:
+            return self.response.result()[1]
+        return None
+
+class FakeDiscord:
+    """Local stand-in for Discord's REST API and gateway.
+
+    Runs an aiohttp server on its own thread and event loop, so the bot under
+    test talks to it over real HTTP and WebSocket connections just like to
+    Discord. REST calls get a simulated latency and per-route rate limits
+    (including 429s); interactions are dispatched over the gateway and must
+    be answered within 3 seconds. Driver methods (``click``,
+    ``submit_modal``, ``wait_for_message``) run on the fake's loop - use
+    ``run`` to call them from another loop.
+    """
+    def __init__(self, *, seed=0, rest_latency=0.03, channel_create_latency=0.25,
+                 rate_limits=None, sub_limits=None, default_bucket=DEFAULT_BUCKET, global_limit=GLOBAL_RATE_LIMIT):
+        self.random = random.Random(seed)
+        self.rest_latency = rest_latency
+        self.channel_create_latency = channel_create_latency
+        self.limiter = RateLimiter(
+            DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits, default_bucket, global_limit,
+            DEFAULT_SUB_LIMITS if sub_limits is None else sub_limits
+        )
+        self.snowflake = SnowflakeFactory()
+
+        self.application_id = self.snowflake()
+        self.bot_user = self._user(self.application_id, "HazeBot", bot=True)
+        self.guilds = {}      # guild_id -> guild payload (without channels/members)
+        self.channels = {}    # channel_id -> channel payload
+        self.members = collections.defaultdict(dict)  # guild_id -> {user_id: member payload}
+        self.messages = collections.defaultdict(dict)  # channel_id -> {message_id: message}
+        self.interactions = {}  # token -> FakeInteraction
+        self.webhooks = {}    # webhook_id -> webhook payload
+        self.commands = {}    # scope -> command payloads
+
+        self.calls = collections.Counter()             # "METHOD route" -> requests
+        self.rate_limited = collections.Counter()      # "METHOD route" -> 429s
+        self.unknown_routes = collections.Counter()
+        self.expired_interactions = 0                  # initial responses that came too late
+
+        self.loop = None
+        self.base_url = None
+        self._thread = None
+        self._runner = None
+        self._ws = None
+        self._sequence = 0
+        self._connected = None
+        self._changed = None
+        self._routes = [
+            (method, route, re.compile('^' + re.sub(r'\{(\w+)\}', r'(?P<\1>[^/]+)', route) + '$'), handler)
+            for method, route, handler in self._route_table()
+        ]
+
+    # ----------------------------------------
+    # Guild layout
+    # ----------------------------------------
+
+    @staticmethod
+    def _user(user_id, name, bot=False):
+        return {
+            'id': str(user_id), 'username': name, 'global_name': name, 'discriminator': '0',
+            'avatar': None, 'bot': bot, 'public_flags': 0,
+        }
+
+    def add_guild(self, name, guild_id=None):
+        guild_id = guild_id or self.snowflake()
+        self.guilds[guild_id] = {
+            'id': str(guild_id), 'name': name, 'icon': None, 'splash': None, 'discovery_splash': None,
+            'owner_id': str(self.application_id), 'afk_channel_id': None, 'afk_timeout': 300,
+            'verification_level': 0, 'default_message_notifications': 0, 'explicit_content_filter': 0,
+            'roles': [], 'emojis': [], 'stickers': [], 'features': [], 'mfa_level': 0,
+            'system_channel_id': None, 'system_channel_flags': 0, 'rules_channel_id': None,
+            'vanity_url_code': None, 'description': None, 'banner': None, 'premium_tier': 0,
+            'premium_subscription_count': 0, 'preferred_locale': 'de', 'public_updates_channel_id': None,
+            'nsfw_level': 0, 'premium_progress_bar_enabled': False, 'large': False,
+        }
+        # @everyone has the guild's id
+        self.add_role(guild_id, '@everyone', permissions=0, position=0, role_id=guild_id)
+        self.add_role(guild_id, 'Bot', permissions=ADMINISTRATOR, position=100)
+        bot_role = self.guilds[guild_id]['roles'][-1]['id']
+        self.members[guild_id][self.application_id] = self._member(self.bot_user, [bot_role])
+        return guild_id
+
+    def add_role(self, guild_id, name, permissions=0, position=1, role_id=None):
+        role = {
+            'id': str(role_id or self.snowflake()), 'name': name, 'color': 0, 'hoist': False, 'icon': None,
+            'unicode_emoji': None, 'position': position, 'permissions': str(permissions),
+            'managed': False, 'mentionable': True, 'flags': 0,
+        }
+        self.guilds[guild_id]['roles'].append(role)
+        return int(role['id'])
+
+    def role_id(self, guild_id, name):
+        return next(int(role['id']) for role in self.guilds[guild_id]['roles'] if role['name'] == name)
+
+    def add_channel(self, guild_id, name, type=0, parent_id=None, channel_id=None):
+        channel_id = channel_id or self.snowflake()
+        self.channels[channel_id] = self._channel(guild_id, channel_id, {'name': name, 'type': type, 'parent_id': parent_id})
+        return channel_id
+
+    def _channel(self, guild_id, channel_id, data):
+        channel = {
+            'id': str(channel_id), 'guild_id': str(guild_id), 'type': data.get('type', 0),
+            'name': data.get('name', 'channel'), 'position': data.get('position', len(self.channels)),
+            'parent_id': str(data['parent_id']) if data.get('parent_id') else None,
+            'permission_overwrites': data.get('permission_overwrites', []), 'topic': data.get('topic'),
+            'nsfw': False, 'rate_limit_per_user': 0, 'last_message_id': None, 'flags': 0,
+        }
+        if channel['type'] == 2:
+            channel.update(bitrate=64000, user_limit=data.get('user_limit', 0), rtc_region=None)
+        return channel
+
+    def add_member(self, guild_id, name, roles=(), user_id=None):
+        user_id = user_id or self.snowflake()
+        self.members[guild_id][user_id] = self._member(self._user(user_id, name), [str(role) for role in roles])
+        return user_id
+
+    @staticmethod
+    def _member(user, roles):
+        return {
+            'user': user, 'nick': None, 'avatar': None, 'roles': list(roles),
+            'joined_at': datetime.now(timezone.utc).isoformat(), 'premium_since': None,
+            'deaf': False, 'mute': False, 'flags': 0, 'pending': False, 'communication_disabled_until': None,
+        }
+
+    def _permissions(self, guild_id, member):
+        roles = {role['id']: int(role['permissions']) for role in self.guilds[guild_id]['roles']}
+        value = roles.get(str(guild_id), 0)
+        for role_id in member['roles']:
+            value |= roles.get(role_id, 0)
+        return (1 << 53) - 1 if value & ADMINISTRATOR else value
+
+    def _guild_create(self, guild_id):
+        guild_channels = [channel for channel in self.channels.values() if channel.get('guild_id') == str(guild_id)]
+        return {
+            **self.guilds[guild_id],
+            'channels': guild_channels,
+            'members': list(self.members[guild_id].values()),
+            'member_count': len(self.members[guild_id]),
+            'threads': [], 'presences': [], 'voice_states': [], 'stage_instances': [],
+            'guild_scheduled_events': [], 'soundboard_sounds': [], 'unavailable': False,
+            'joined_at': datetime.now(timezone.utc).isoformat(),
+        }
+
+    # ----------------------------------------
+    # Lifecycle
+    # ----------------------------------------
+
+    def start(self, host='127.0.0.1', port=0):
+        """Start the server thread and return the base URL"""
+        ready = threading.Event()
+
+        def serve():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self._serve(host, port))
+            ready.set()
+            self.loop.run_forever()
+
+        self._thread = threading.Thread(target=serve, name="fake-discord", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.base_url
+
+    async def _serve(self, host, port):
+        self._connected = asyncio.Event()
+        self._changed = asyncio.Condition()
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_get('/gateway', self._gateway)
+        app.router.add_route('*', '/api/v{version}/{path:.*}', self._rest)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{port}"
+
+    def install(self):
+        """Point discord.py's REST and gateway URLs at this stand-in"""
+        discord.http.Route.BASE = f"{self.base_url}/api/v{API_VERSION}"
+        discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(f"{self.base_url.replace('http', 'ws', 1)}/gateway")
+
+    def run(self, coro):
+        """Run a driver coroutine on the fake's loop, awaitable from any other loop"""
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def stop(self):
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+    # ----------------------------------------
+    # Gateway
+    # ----------------------------------------
+
+    async def _gateway(self, request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        await ws.send_str(json.dumps({'op': 10, 'd': {'heartbeat_interval': 41250}, 's': None, 't': None}))
+        async for message in ws:
+            payload = json.loads(message.data)
+            if payload['op'] == 1:
+                await ws.send_str(json.dumps({'op': 11, 'd': None, 's': None, 't': None}))
+            elif payload['op'] in (2, 6):
+                self._ws = ws
+                self._sequence = 0
+                await self.dispatch('READY', {
+                    'v': API_VERSION, 'user': {**self.bot_user, 'verified': True, 'mfa_enabled': False, 'flags': 0},
+                    'guilds': [{'id': str(guild_id), 'unavailable': True} for guild_id in self.guilds],
+                    'session_id': 'fake-session', 'resume_gateway_url': f"{self.base_url.replace('http', 'ws', 1)}/gateway",
+                    'application': {'id': str(self.application_id), 'flags': 0}, 'private_channels': [],
+                    'relationships': [], 'presences': [], 'guild_join_requests': [], 'geo_ordered_rtc_regions': [],
+                })
+                for guild_id in self.guilds:
+                    await self.dispatch('GUILD_CREATE', self._guild_create(guild_id))
+                self._connected.set()
+        if self._ws is ws:
+            self._ws = None
+            self._connected.clear()
+        return ws
+
+    async def dispatch(self, event, data):
+        """Send a gateway event to the bot"""
+        if self._ws is None:
+            await self._connected.wait()
+        self._sequence += 1
+        await self._ws.send_str(json.dumps({'op': 0, 't': event, 's': self._sequence, 'd': data}))
+
+    async def wait_connected(self):
+        await self._connected.wait()
+
+    # ----------------------------------------
+    # REST
+    # ----------------------------------------
+
+    def _route_table(self):
+        return [
+            ('GET', '/gateway/bot', self._get_gateway),
+            ('GET', '/gateway', self._get_gateway),
+            ('GET', '/users/@me', lambda r, p, b: self.bot_user),
+            ('GET', '/oauth2/applications/@me', self._get_application),
+            ('GET', '/applications/@me', self._get_application),
+            ('GET', '/users/{user_id}', self._get_user),
+            ('POST', '/users/@me/channels', self._create_dm),
+            ('PUT', '/applications/{application_id}/commands', self._put_commands),
+            ('PUT', '/applications/{application_id}/guilds/{guild_id}/commands', self._put_commands),
+            ('GET', '/applications/{application_id}/commands', lambda r, p, b: self.commands.get('global', [])),
+            ('GET', '/guilds/{guild_id}', lambda r, p, b: self._guild_create(int(p['guild_id']))),
+            ('GET', '/guilds/{guild_id}/channels', self._get_guild_channels),
+            ('POST', '/guilds/{guild_id}/channels', self._create_channel),
+            ('GET', '/guilds/{guild_id}/roles', lambda r, p, b: self.guilds[int(p['guild_id'])]['roles']),
+            ('GET', '/guilds/{guild_id}/members/{user_id}', self._get_member),
+            ('PUT', '/guilds/{guild_id}/members/{user_id}/roles/{role_id}', self._add_member_role),
+            ('DELETE', '/guilds/{guild_id}/members/{user_id}/roles/{role_id}', self._remove_member_role),
+            ('GET', '/channels/{channel_id}', self._get_channel),
+            ('PATCH', '/channels/{channel_id}', self._edit_channel),
+            ('DELETE', '/channels/{channel_id}', self._delete_channel),
+            ('PUT', '/channels/{channel_id}/permissions/{overwrite_id}', lambda r, p, b: None),
+            ('DELETE', '/channels/{channel_id}/permissions/{overwrite_id}', lambda r, p, b: None),
+            ('GET', '/channels/{channel_id}/messages', self._get_messages),
+            ('POST', '/channels/{channel_id}/messages', self._create_message),
+            ('POST', '/channels/{channel_id}/messages/bulk-delete', self._bulk_delete),
+            ('GET', '/channels/{channel_id}/messages/{message_id}', self._get_message),
+            ('PATCH', '/channels/{channel_id}/messages/{message_id}', self._edit_message),
+            ('DELETE', '/channels/{channel_id}/messages/{message_id}', self._delete_message),
+            ('PUT', '/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/{user}', lambda r, p, b: None),
+            ('DELETE', '/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/{user}', lambda r, p, b: None),
+            ('GET', '/channels/{channel_id}/webhooks', self._get_webhooks),
+            ('POST', '/channels/{channel_id}/webhooks', self._create_webhook),
+            ('POST', '/interactions/{interaction_id}/{interaction_token}/callback', self._interaction_callback),
+            ('POST', '/webhooks/{webhook_id}/{webhook_token}', self._execute_webhook),
+            ('GET', '/webhooks/{webhook_id}/{webhook_token}/messages/{message_id}', self._get_webhook_message),
+            ('PATCH', '/webhooks/{webhook_id}/{webhook_token}/messages/{message_id}', self._edit_webhook_message),
+            ('DELETE', '/webhooks/{webhook_id}/{webhook_token}/messages/{message_id}', self._delete_webhook_message),
+        ]
+
+    async def _rest(self, request):
+        path = '/' + request.match_info['path']
+        for method, route, pattern, handler in self._routes:
+            match = pattern.match(path) if method == request.method else None
+            if match:
+                break
+        else:
+            self.unknown_routes[f"{request.method} {path}"] += 1
+            return json_response({'message': '404: Not Found', 'code': 0}, status=404)
+
+        params = match.groupdict()
+        name = f"{method} {route}"
+        self.calls[name] += 1
+
+        body, files = await self._read_body(request)
+        headers = {}
+        if (method, route) not in UNLIMITED_ROUTES:
+            # Webhook buckets are per token: every interaction gets its own followup bucket
+            major = params.get('channel_id') or params.get('guild_id') or params.get('webhook_token')
+            interaction_route = params.get('webhook_token') in self.interactions
+            allowed, headers, retry_after, is_global = self.limiter.check(
+                method, route, major, body, use_global=not interaction_route
+            )
+            if not allowed:
+                self.rate_limited[name] += 1
+                headers.update({'Via': '1.1 google', 'Retry-After': str(max(1, round(retry_after)))})
+                return json_response(
+                    {'message': 'You are being rate limited.', 'retry_after': round(retry_after, 3), 'global': is_global},
+                    status=429, headers=headers
+                )
+
+        latency = self.channel_create_latency if route == '/guilds/{guild_id}/channels' and method == 'POST' else self.rest_latency
+        await asyncio.sleep(latency * self.random.uniform(0.5, 1.5))
+
+        try:
+            result = handler(request, params, (body, files) if files else body)
+            if asyncio.iscoroutine(result):
+                result = await result
+        except FakeHTTPError as e:
+            return json_response(e.payload, status=e.status, headers=headers)
+        except KeyError:
+            return json_response({'message': 'Unknown', 'code': 10003}, status=404, headers=headers)
+
+        response = web.Response(status=204, headers=headers) if result is None else json_response(result, headers=headers)
+        if method != 'GET':
+            # Wake the drivers only once the bot has its answer (e.g. the message id
+            # its view is stored under) - a click can't come before that
+            await response.prepare(request)
+            await response.write_eof()
+            if 'after' in request:
+                request['after']()
+            await self._notify()
+        return response
+
+    @staticmethod
+    async def _read_body(request):
+        if not request.can_read_body:
+            return None, None
+        if request.content_type.startswith('multipart/'):
+            form = await request.post()
+            body = json.loads(form['payload_json']) if 'payload_json' in form else {}
+            files = [field for key, field in form.items() if key.startswith('files[')]
+            return body, files
+        return await request.json(), None
+
+    # Resources
+
+    def _get_gateway(self, request, params, body):
+        return {
+            'url': f"{self.base_url.replace('http', 'ws', 1)}/gateway", 'shards': 1,
+            'session_start_limit': {'total': 1000, 'remaining': 1000, 'reset_after': 0, 'max_concurrency': 1},
+        }
+
+    def _get_application(self, request, params, body):
+        return {
+            'id': str(self.application_id), 'name': self.bot_user['username'], 'icon': None, 'description': '',
+            'bot_public': True, 'bot_require_code_grant': False, 'owner': self.bot_user, 'team': None,
+            'verify_key': '0' * 64, 'flags': 0, 'summary': '', 'rpc_origins': [],
+        }
+
+    def _get_user(self, request, params, body):
+        user_id = int(params['user_id'])
+        for members in self.members.values():
+            if user_id in members:
+                return members[user_id]['user']
+        raise FakeHTTPError(404, 'Unknown User', 10013)
+
+    def _create_dm(self, request, params, body):
+        recipient = self._get_user(request, {'user_id': body['recipient_id']}, None)
+        channel_id = int(recipient['id']) + 1
+        self.channels.setdefault(channel_id, {'id': str(channel_id), 'type': 1, 'recipients': [recipient], 'last_message_id': None})
+        return self.channels[channel_id]
+
+    def _put_commands(self, request, params, body):
+        scope = params.get('guild_id', 'global')
+        self.commands[scope] = [
+            {'type': 1, 'default_member_permissions': None, 'dm_permission': True, 'nsfw': False, 'options': [],
+             **command, 'id': str(self.snowflake()), 'application_id': str(self.application_id), 'version': '1',
+             **({'guild_id': scope} if scope != 'global' else {})}
+            for command in body
+        ]
+        return self.commands[scope]
+
+    def _get_guild_channels(self, request, params, body):
+        return [channel for channel in self.channels.values() if channel.get('guild_id') == params['guild_id']]
+
+    async def _create_channel(self, request, params, body):
+        guild_id = int(params['guild_id'])
+        channel_id = self.snowflake()
+        channel = self.channels[channel_id] = self._channel(guild_id, channel_id, body)
+        await self.dispatch('CHANNEL_CREATE', channel)
+        return channel
+
+    def _get_member(self, request, params, body):
+        member = self.members[int(params['guild_id'])].get(int(params['user_id']))
+        if member is None:
+            raise FakeHTTPError(404, 'Unknown Member', 10007)
+        return member
+
+    def _add_member_role(self, request, params, body):
+        member = self._get_member(request, params, body)
+        if params['role_id'] not in member['roles']:
+            member['roles'].append(params['role_id'])
+
+    def _remove_member_role(self, request, params, body):
+        member = self._get_member(request, params, body)
+        if params['role_id'] in member['roles']:
+            member['roles'].remove(params['role_id'])
+
+    def _get_channel(self, request, params, body):
+        channel = self.channels.get(int(params['channel_id']))
+        if channel is None:
+            raise FakeHTTPError(404, 'Unknown Channel', 10003)
+        return channel
+
+    async def _edit_channel(self, request, params, body):
+        channel = self._get_channel(request, params, body)
+        for key in ('name', 'topic', 'position', 'permission_overwrites', 'user_limit', 'nsfw', 'rate_limit_per_user'):
+            if key in body:
+                channel[key] = body[key]
+        if 'parent_id' in body:
+            channel['parent_id'] = str(body['parent_id']) if body['parent_id'] else None
+        await self.dispatch('CHANNEL_UPDATE', channel)
+        return channel
+
+    async def _delete_channel(self, request, params, body):
+        channel = self._get_channel(request, params, body)
+        del self.channels[int(params['channel_id'])]
+        await self.dispatch('CHANNEL_DELETE', channel)
+        return channel
+
+    def _get_messages(self, request, params, body):
+        channel_id = int(self._get_channel(request, params, body)['id'])
+        limit = int(request.query.get('limit', 50))
+        before = int(request.query.get('before', 1 << 63))
+        after = int(request.query.get('after', 0))
+        messages = [m for mid, m in self.messages[channel_id].items() if after < mid < before and not m['flags'] & EPHEMERAL]
+        return sorted(messages, key=lambda m: int(m['id']), reverse=True)[:limit]
+
+    def _message(self, channel_id, body, files=None, author=None, **extra):
+        message_id = self.snowflake()
+        channel = self.channels.get(channel_id, {})
+        attachments = []
+        for index, field in enumerate(files or []):
+            content = field.file.read()
+            attachments.append({
+                'id': str(self.snowflake()), 'filename': field.filename, 'size': len(content),
+                'url': f"{self.base_url}/cdn/attachments/{channel_id}/{message_id}/{field.filename}"
+                       f"?ex={int(time.time() + 86400):x}&is={int(time.time()):x}&hm=fake",
+                'proxy_url': f"{self.base_url}/media/{channel_id}/{message_id}/{field.filename}",
+                'content_type': field.content_type, 'width': None, 'height': None,
+            })
+        message = {
+            'id': str(message_id), 'channel_id': str(channel_id), 'author': author or self.bot_user,
+            'content': body.get('content') or '', 'timestamp': datetime.now(timezone.utc).isoformat(),
+            'edited_timestamp': None, 'tts': bool(body.get('tts')), 'mention_everyone': False,
+            'mentions': [], 'mention_roles': [], 'attachments': attachments, 'embeds': body.get('embeds') or [],
+            'components': body.get('components') or [], 'pinned': False, 'type': 0,
+            'flags': body.get('flags') or 0, **extra,
+        }
+        if channel.get('guild_id'):
+            message['guild_id'] = channel['guild_id']
+        self.messages[channel_id][message_id] = message
+        if channel_id in self.channels:
+            channel['last_message_id'] = str(message_id)
+        return message
+
+    async def _create_message(self, request, params, body):
+        body, files = body if isinstance(body, tuple) else (body, None)
+        channel_id = int(params['channel_id'])
+        if channel_id not in self.channels:
+            raise FakeHTTPError(404, 'Unknown Channel', 10003)
+        return self._message(channel_id, body, files)
+
+    def _find_message(self, channel_id, message_id):
+        message = self.messages[channel_id].get(message_id)
+        if message is None:
+            raise FakeHTTPError(404, 'Unknown Message', 10008)
+        return message
+
+    def _get_message(self, request, params, body):
+        return self._find_message(int(params['channel_id']), int(params['message_id']))
+
+    async def _apply_edit(self, message, body):
+        body, files = body if isinstance(body, tuple) else (body, None)
+        for key in ('content', 'embeds', 'components', 'flags'):
+            if key in body:
+                message[key] = body[key] if body[key] is not None else ('' if key == 'content' else [])
+        if files:
+            message['attachments'] = self._message(int(message['channel_id']), {}, files)['attachments']
+        message['edited_timestamp'] = datetime.now(timezone.utc).isoformat()
+        return message
+
+    async def _edit_message(self, request, params, body):
+        return await self._apply_edit(self._find_message(int(params['channel_id']), int(params['message_id'])), body)
+
+    def _delete_message(self, request, params, body):
+        self._find_message(int(params['channel_id']), int(params['message_id']))
+        del self.messages[int(params['channel_id'])][int(params['message_id'])]
+
+    def _bulk_delete(self, request, params, body):
+        for message_id in body.get('messages', []):
+            self.messages[int(params['channel_id'])].pop(int(message_id), None)
+
+    def _get_webhooks(self, request, params, body):
+        return [webhook for webhook in self.webhooks.values() if webhook['channel_id'] == params['channel_id']]
+
+    def _create_webhook(self, request, params, body):
+        channel = self._get_channel(request, params, body)
+        webhook_id = self.snowflake()
+        self.webhooks[webhook_id] = {
+            'id': str(webhook_id), 'type': 1, 'token': f"fake-webhook-{webhook_id}", 'name': body.get('name'),
+            'avatar': None, 'channel_id': channel['id'], 'guild_id': channel.get('guild_id'),
+            'application_id': str(self.application_id), 'user': self.bot_user,
+        }
+        return self.webhooks[webhook_id]
+
+    # Interactions and webhooks
+
+    def _interaction(self, token, allow_expired=False):
+        interaction = self.interactions.get(token)
+        lifetime = FOLLOWUP_LIFETIME if allow_expired else INTERACTION_DEADLINE
+        if interaction is None or time.monotonic() - interaction.created > lifetime:
+            if interaction is not None and not allow_expired:
+                self.expired_interactions += 1
+            raise FakeHTTPError(404, 'Unknown interaction', 10062)
+        return interaction
+
+    async def _interaction_callback(self, request, params, body):
+        interaction = self._interaction(params['interaction_token'])
+        body, files = body if isinstance(body, tuple) else (body, None)
+        if interaction.acknowledged:
+            raise FakeHTTPError(400, 'Interaction has already been acknowledged.', 40060)
+        interaction.acknowledged = True
+        kind, data = body['type'], body.get('data') or {}
+
+        message = None
+        if kind == 4:
+            message = self._message(interaction.channel_id, data, files, interaction_id=str(interaction.id))
+            message['recipient_id'] = str(interaction.user_id)
+        elif kind == 7:
+            message = await self._apply_edit(interaction.data['_message'], (data, files))
+        elif kind == 5:
+            message = self._message(interaction.channel_id, {'flags': data.get('flags', 0) | (1 << 7)}, interaction_id=str(interaction.id))
+            message['recipient_id'] = str(interaction.user_id)
+        interaction.response_message = message
+        request['after'] = lambda: interaction.response.set_result((kind, data))
+
+        ephemeral = bool(message and message['flags'] & EPHEMERAL)
+        payload = {'interaction': {
+            'id': str(interaction.id), 'type': interaction.type,
+            'response_message_id': message['id'] if message else None,
+            'response_message_loading': kind == 5, 'response_message_ephemeral': ephemeral,
+        }, 'resource': {'type': kind}}
+        if message is not None:
+            payload['resource']['message'] = message
+        return payload
+
+    async def _execute_webhook(self, request, params, body):
+        body, files = body if isinstance(body, tuple) else (body, None)
+        token = params['webhook_token']
+        if token in self.interactions:
+            interaction = self._interaction(token, allow_expired=True)
+            message = self._message(interaction.channel_id, body, files, webhook_id=str(self.application_id))
+            message['recipient_id'] = str(interaction.user_id)
+            interaction.followups.append(message)
+        else:
+            webhook = self.webhooks.get(int(params['webhook_id']))
+            if webhook is None or webhook['token'] != token:
+                raise FakeHTTPError(404, 'Unknown Webhook', 10015)
+            message = self._message(int(webhook['channel_id']), body, files, webhook_id=webhook['id'])
+        return message
+
+    def _webhook_message(self, params):
+        token = params['webhook_token']
+        interaction = self._interaction(token, allow_expired=True) if token in self.interactions else None
+        if params['message_id'] == '@original':
+            if interaction is None or interaction.response_message is None:
+                raise FakeHTTPError(404, 'Unknown Message', 10008)
+            return interaction.response_message
+        channel_id = interaction.channel_id if interaction else int(self.webhooks[int(params['webhook_id'])]['channel_id'])
+        return self._find_message(channel_id, int(params['message_id']))
+
+    def _get_webhook_message(self, request, params, body):
+        return self._webhook_message(params)
+
+    async def _edit_webhook_message(self, request, params, body):
+        return await self._apply_edit(self._webhook_message(params), body)
+
+    def _delete_webhook_message(self, request, params, body):
+        message = self._webhook_message(params)
+        self.messages[int(message['channel_id'])].pop(int(message['id']), None)
+
+    # ----------------------------------------
+    # Driver
+    # ----------------------------------------
+
+    async def _notify(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def wait_for(self, predicate, timeout=10.0):
+        """Wait until ``predicate()`` returns something truthy and return it"""
+        async with self._changed:
+            return await asyncio.wait_for(self._changed.wait_for(predicate), timeout)
+
+    def channel_messages(self, channel_id, user_id=None):
+        """Messages in a channel as seen by ``user_id`` (ephemeral ones only for their recipient), oldest first"""
+        return [
+            message for message in self.messages.get(channel_id, {}).values()
+            if not message['flags'] & EPHEMERAL or (user_id is not None and message.get('recipient_id') == str(user_id))
+        ]
+
+    async def wait_for_message(self, channel_id, predicate, user_id=None, after=0, timeout=10.0):
+        """Wait for a message in ``channel_id`` newer than ``after`` matching ``predicate`` (newest match wins)"""
+        def find():
+            for message in reversed(self.channel_messages(channel_id, user_id)):
+                if int(message['id']) > after and predicate(message):
+                    return message
+            return None
+        return await self.wait_for(find, timeout)
+
+    @staticmethod
+    def buttons(message):
+        """All buttons of a message as {label: custom_id}"""
+        found = {}
+
+        def walk(components):
+            for component in components:
+                if component.get('type') == 2 and 'custom_id' in component:
+                    found[component.get('label') or ''] = component['custom_id']
+                walk(component.get('components', []))
+
+        walk(message.get('components', []))
+        return found
+
+    @classmethod
+    def find_button(cls, message, label):
+        """custom_id of the first button whose label contains ``label``, or None"""
+        return next((custom_id for text, custom_id in cls.buttons(message).items() if label in text), None)
+
+    async def _interact(self, kind, guild_id, user_id, channel_id, data, message=None):
+        member = self.members[guild_id][user_id]
+        channel = self.channels.get(channel_id) or {'id': str(channel_id), 'type': 0, 'guild_id': str(guild_id)}
+        interaction_id = self.snowflake()
+        token = f"fake-interaction-{interaction_id}-{self.random.getrandbits(64):016x}"
+        interaction = FakeInteraction(interaction_id, token, kind, user_id, guild_id, channel_id, data)
+        interaction.data['_message'] = message
+        self.interactions[token] = interaction
+        payload = {
+            'id': str(interaction_id), 'application_id': str(self.application_id), 'type': kind, 'token': token,
+            'version': 1, 'guild_id': str(guild_id), 'channel_id': str(channel_id), 'channel': channel,
+            'member': {**member, 'permissions': str(self._permissions(guild_id, member))},
+            'data': {key: value for key, value in data.items() if not key.startswith('_')},
+            'locale': 'de', 'guild_locale': 'de', 'app_permissions': str((1 << 53) - 1),
+            'entitlements': [], 'authorizing_integration_owners': {'0': str(guild_id)}, 'context': 0,
+            'attachment_size_limit': 8 * 1024 * 1024,
+        }
+        if message is not None:
+            payload['message'] = message
+        await self.dispatch('INTERACTION_CREATE', payload)
+        return interaction
+
+    async def click(self, guild_id, user_id, channel_id, custom_id, message=None):
+        """Press a button; returns the FakeInteraction (await ``.response`` for the bot's answer)"""
+        if message is None:
+            message = self._message(channel_id, {'content': ''})
+            del self.messages[channel_id][int(message['id'])]
+        return await self._interact(3, guild_id, user_id, channel_id, {'custom_id': custom_id, 'component_type': 2}, message)
+
+    async def submit_modal(self, guild_id, user_id, interaction, values):
+        """Submit the modal the bot opened for ``interaction``; ``values`` maps input labels (or order) to text"""
+        modal = interaction.modal
+        if modal is None:
+            raise ValueError("the interaction was not answered with a modal")
+        inputs = iter(values) if isinstance(values, (list, tuple)) else None
+
+        def fill(component):
+            if component.get('type') == 4:
+                value = next(inputs, '') if inputs is not None else values.get(component.get('label'), '')
+                return {'type': 4, 'custom_id': component['custom_id'], 'value': value}
+            filled = {'type': component['type']}
+            if 'components' in component:
+                filled['components'] = [fill(child) for child in component['components']]
+            if 'component' in component:
+                label = component.get('label')
+                child = {**component['component'], 'label': label}
+                filled['component'] = fill(child)
+            return filled
+
+        components = [fill(component) for component in modal.get('components', [])]
+        return await self._interact(5, guild_id, user_id, interaction.channel_id,
+                                    {'custom_id': modal['custom_id'], 'components': components}, interaction.data.get('_message'))
+
+    def stats(self):
+        return {
+            'calls': sum(self.calls.values()),
+            'rate_limited': sum(self.rate_limited.values()),
+            'unknown_routes': sum(self.unknown_routes.values()),
+            'failed_interactions': self.failed_interactions(),
+        }
+
+    def failed_interactions(self):
+        """Interactions the bot answered too late or not at all ("This interaction failed")"""
+        now = time.monotonic()
+        unanswered = sum(
+            1 for interaction in self.interactions.values()
+            if not interaction.response.done() and now - interaction.created > INTERACTION_DEADLINE
+        )
+        return self.expired_interactions + unanswered
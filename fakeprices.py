@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Haze Visuals Discord Bot - Local Price Stand-in
+Offline fake of CoinGecko's /simple/price endpoint for the crypto price cache
+"""
+
+import argparse
+import asyncio
+import json
+
+from aiohttp import web
+
+PRICE_PATH = '/api/v3/simple/price'
+
+class FakePriceServer:
+    """Local stand-in for CoinGecko's EUR quotes.
+
+    Serves ``/api/v3/simple/price`` in CoinGecko's format on the calling
+    loop. ``latency`` delays every answer, ``fail_status`` makes it answer
+    with that HTTP status instead; ``requests`` counts the calls. Point the
+    bot at it with ``CRYPTO_PRICE_URL=<url>``.
+    """
+    def __init__(self, bitcoin=95000.0, ethereum=3200.0, latency=0.0):
+        self.prices = {'bitcoin': bitcoin, 'ethereum': ethereum}
+        self.changes = {'bitcoin': 1.5, 'ethereum': -0.8}
+        self.latency = latency
+        self.fail_status = None
+        self.requests = 0
+        self.url = None
+        self._runner = None
+
+    async def start(self, host='127.0.0.1', port=0):
+        """Start serving and return the price URL"""
+        app = web.Application()
+        app.router.add_get(PRICE_PATH, self._price)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{port}{PRICE_PATH}"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _price(self, request):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail_status:
+            return web.json_response({'status': {'error_code': self.fail_status, 'error_message': "fake outage"}},
+                                     status=self.fail_status)
+        ids = [coin for coin in request.query.get('ids', '').split(',') if coin in self.prices]
+        currency = request.query.get('vs_currencies', 'eur')
+        payload = {}
+        for coin in ids:
+            payload[coin] = {currency: self.prices[coin]}
+            if request.query.get('include_24hr_change') == 'true':
+                payload[coin][f"{currency}_24h_change"] = self.changes[coin]
+        return web.Response(text=json.dumps(payload), content_type='application/json')
+
+async def serve(args):
+    server = FakePriceServer(args.bitcoin, args.ethereum, latency=args.latency)
+    url = await server.start(args.host, args.port)
+    print(f"💱 Fake-Kurse unter {url} (CRYPTO_PRICE_URL={url})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--bitcoin', type=float, default=95000.0, help="BTC-Kurs in EUR")
+    parser.add_argument('--ethereum', type=float, default=3200.0, help="ETH-Kurs in EUR")
+    parser.add_argument('--latency', type=float, default=0.0, help="Antwortzeit in Sekunden")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Haze Visuals Discord Bot - Load Test
+Lets N customers order at the same time (shop launch, giveaway rush) against the local Discord stand-in
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmark import BotHarness, StageStats, TicketJourney, embed_title, print_stages
+from fakediscord import FakeDiscord
+
+# Upper bounds (seconds) of the latency distribution columns
+DISTRIBUTION_BUCKETS = (1.0, 3.0, 10.0)
+
+class OrderJourney(TicketJourney):
+    """The complete Custom order of one customer, up to the review that closes the ticket"""
+
+    async def finish(self):
+        after = self.fake.snowflake()
+        await self.click(self.control_message, "Finished", user_id=self.harness.staff_id)
+        self.rating = await self.next_message(embed_title("⭐ Kundenbewertung"), after)
+
+    async def review(self):
+        after = self.fake.snowflake()
+        interaction = await self.click(self.rating, "5⭐")
+        await self.submit(interaction, ["Top Service, gerne wieder!"])
+        await self.next_message(embed_title("🎉 Ticket abgeschlossen"), after)
+
+    STAGES = tuple(stage for stage in TicketJourney.STAGES if stage[0] != 'close') + (
+        ('finished', finish),
+        ('review', review),
+    )
+
+def distribution(samples):
+    """Share of samples per latency bucket"""
+    counts = [0] * (len(DISTRIBUTION_BUCKETS) + 1)
+    for sample in samples:
+        counts[next((i for i, bound in enumerate(DISTRIBUTION_BUCKETS) if sample <= bound), len(DISTRIBUTION_BUCKETS))] += 1
+    return [count / len(samples) if samples else 0.0 for count in counts]
+
+async def rush(harness, customers, ramp, think_time, timeout, level):
+    """Start ``customers`` orders within ``ramp`` seconds; returns (stats, completed, seconds)"""
+    fake = harness.fake
+    stats = StageStats()
+    journeys = [
+        OrderJourney(harness, stats, f"rush{level}-{index:04d}", think_time=think_time, timeout=timeout)
+        for index in range(customers)
+    ]
+    offsets = sorted(fake.random.uniform(0, ramp) for _ in journeys)
+
+    async def one(journey, offset):
+        await asyncio.sleep(offset)
+        return await journey.run()
+
+    async def all_journeys():
+        started = time.monotonic()
+        results = await asyncio.gather(*(one(journey, offset) for journey, offset in zip(journeys, offsets)))
+        return sum(results), time.monotonic() - started
+
+    completed, seconds = await fake.run(all_journeys())
+    return stats, completed, seconds
+
+def print_level(result):
+    print(f"\n👥 {result['customers']} Kunden (Start innerhalb {result['ramp']:.0f}s): "
+          f"{result['completed']} Bestellungen komplett in {result['seconds']:.1f}s "
+          f"({result['completion_rate']:.0%}) · 429er: {result['rate_limited']} · "
+          f"fehlgeschlagene Interaktionen: {result['failed_interactions']}\n")
+    print_stages(result['stages'])
+    labels = [f"≤{bound:g}s" for bound in DISTRIBUTION_BUCKETS] + [f">{DISTRIBUTION_BUCKETS[-1]:g}s"]
+    print(f"\n{'Stage':<16}{'Fehlerrate':>11}" + "".join(f"{label:>8}" for label in labels))
+    for stage, row in result['stages'].items():
+        print(f"{stage:<16}{row['failure_rate']:>11.1%}" + "".join(f"{share:>8.0%}" for share in row['distribution']))
+    if result['breaking_stage']:
+        print(f"\n💥 Erste Stage mit Fehlern: {result['breaking_stage']}")
+
+async def load_test(args):
+    fake = FakeDiscord(seed=args.seed, rest_latency=args.rest_latency, channel_create_latency=args.channel_latency)
+    harness = BotHarness(fake)
+    await harness.start()
+    results = []
+    try:
+        for customers in args.customers:
+            limited_before, failed_before = sum(fake.rate_limited.values()), fake.failed_interactions()
+            stats, completed, seconds = await rush(harness, customers, args.ramp, args.think_time, args.timeout, len(results))
+            await harness.main.ticket_log.flush()
+
+            stages = stats.summary()
+            for name, row in stages.items():
+                row['distribution'] = distribution(stats.samples[name])
+            result = {
+                'customers': customers,
+                'ramp': args.ramp,
+                'completed': completed,
+                'completion_rate': completed / customers if customers else 0.0,
+                'seconds': seconds,
+                'rate_limited': sum(fake.rate_limited.values()) - limited_before,
+                'failed_interactions': fake.failed_interactions() - failed_before,
+                'breaking_stage': next((name for name, row in stages.items() if row['failures']), None),
+                'stages': stages,
+            }
+            results.append(result)
+            print_level(result)
+            # Let leftover work (counter renames, ticket log) settle before the next level
+            await asyncio.sleep(args.cooldown)
+    finally:
+        await harness.stop()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    return results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--customers', type=int, nargs='+', default=[50, 200],
+                        help="Kunden pro Durchlauf, mehrere Werte = mehrere Durchläufe nacheinander")
+    parser.add_argument('--ramp', type=float, default=10.0, help="Zeitraum in Sekunden, in dem alle Kunden starten")
+    parser.add_argument('--think-time', type=float, default=1.0, help="Sekunden Pause zwischen den Schritten eines Kunden")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Sekunden bis eine Stage als fehlgeschlagen gilt")
+    parser.add_argument('--cooldown', type=float, default=5.0, help="Pause zwischen den Durchläufen")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--rest-latency', type=float, default=0.03, help="Simulierte Latenz pro REST-Aufruf in Sekunden")
+    parser.add_argument('--channel-latency', type=float, default=0.25, help="Simulierte Latenz beim Kanal-Erstellen")
+    parser.add_argument('--json', metavar='DATEI', help="Ergebnisse zusätzlich als JSON speichern")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    asyncio.run(load_test(parse_args()))
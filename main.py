@@ -6,72 +6,486 @@ import json
 from datetime import datetime, timedelta
 import pytz
 import threading
-from flask import Flask, request
 import aiohttp
+from aiohttp import web
 import asyncio
 import subprocess
 import hashlib
 import random
+import copy
+import time
+import atexit
+import tempfile
+import sqlite3
+import concurrent.futures
+import collections
+import itertools
+import heapq
+import urllib.parse
+import logging
+import logging.handlers
+import queue
+import sys
+import contextvars
+import contextlib
+import functools
+import bisect
+import re
 
-# Flask app for health checks (required for Autoscale deployment)
-app = Flask(__name__)
+# ========================================
+# LOGGING
+# ========================================
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')  # e.g. "ticketbot.calendar=DEBUG,discord=WARNING"
+LOG_JSON = os.getenv('LOG_JSON', '').lower() in ('1', 'true', 'yes')
+
+log_context = contextvars.ContextVar('log_context', default={})
+
+def bind_log_context(**fields):
+    """Attach guild/ticket/user fields to all records logged later in the current task"""
+    log_context.set({**log_context.get(), **{key: value for key, value in fields.items() if value is not None}})
+
+class LogContextFilter(logging.Filter):
+    """Copies the bound context onto each record (explicit ``extra`` values win)"""
+    FIELDS = ('guild', 'ticket', 'user')
+    
+    def filter(self, record):
+        context = log_context.get()
+        for field in self.FIELDS:
+            if getattr(record, field, None) is None:
+                setattr(record, field, context.get(field))
+        return True
+
+class TextLogFormatter(logging.Formatter):
+    def format(self, record):
+        text = super().format(record)
+        fields = " ".join(f"{field}={getattr(record, field)}" for field in LogContextFilter.FIELDS if getattr(record, field, None))
+        return f"{text} [{fields}]" if fields else text
+
+class JsonLogFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in LogContextFilter.FIELDS:
+            if getattr(record, field, None) is not None:
+                entry[field] = getattr(record, field)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+def setup_logging():
+    """Send all records through a queue; a listener thread does the (possibly blocking) stdout writes"""
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonLogFormatter() if LOG_JSON else TextLogFormatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(LogContextFilter())
+    
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(LOG_LEVEL.upper())
+    for item in filter(None, (item.strip() for item in LOG_LEVELS.split(','))):
+        name, _, level = item.partition('=')
+        logging.getLogger(name.strip()).setLevel(level.strip().upper())
+    
+    listener = logging.handlers.QueueListener(log_queue, output)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+log_listener = setup_logging()
+
+logger = logging.getLogger("ticketbot")
+admin_logger = logger.getChild("admin")
+assets_logger = logger.getChild("assets")
+calendar_logger = logger.getChild("calendar")
+commands_logger = logger.getChild("commands")
+counters_logger = logger.getChild("counters")
+giveaway_logger = logger.getChild("giveaway")
+payments_logger = logger.getChild("payments")
+shop_logger = logger.getChild("shop")
+storage_logger = logger.getChild("storage")
+tickets_logger = logger.getChild("tickets")
+updater_logger = logger.getChild("updater")
+
+# ========================================
+# METRICS
+# ========================================
+
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+# Discord zeigt "Interaktion fehlgeschlagen", wenn nach 3 Sekunden keine Antwort kam
+INTERACTION_RESPONSE_DEADLINE = 3.0
+
+class MetricsRegistry:
+    """Small OpenMetrics registry: counters, histograms and gauges collected on scrape.
+
+    Samples are recorded on the event loop and on the JSON writer thread, so
+    all state sits behind one lock.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families = {}  # name -> (kind, help, buckets | collect function)
+        self._samples = {}   # name -> {labels: value | [count per bucket..., sum]}
+    
+    def counter(self, name, help):
+        self._families[name] = ('counter', help, None)
+        self._samples[name] = {}
+    
+    def histogram(self, name, help, buckets):
+        self._families[name] = ('histogram', help, tuple(sorted(buckets)))
+        self._samples[name] = {}
+    
+    def gauge(self, name, help, collect):
+        """``collect()`` yields (labels, value) pairs and is called on every scrape"""
+        self._families[name] = ('gauge', help, collect)
+    
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+    
+    def inc(self, name, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            samples = self._samples[name]
+            samples[key] = samples.get(key, 0) + amount
+    
+    def observe(self, name, value, **labels):
+        buckets = self._families[name][2]
+        key = self._key(labels)
+        with self._lock:
+            state = self._samples[name].get(key)
+            if state is None:
+                state = self._samples[name][key] = [0] * (len(buckets) + 1) + [0.0]
+            state[bisect.bisect_left(buckets, value)] += 1
+            state[-1] += value
+    
+    @contextlib.contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+    
+    def timed(self, name, **labels):
+        """Decorator observing the duration of every call of a coroutine function"""
+        def decorator(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return await fn(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    @staticmethod
+    def _labels(key, extra=()):
+        pairs = [*key, *extra]
+        if not pairs:
+            return ""
+        escape = lambda value: value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in pairs) + "}"
+    
+    def render(self):
+        """Return all metrics in the OpenMetrics text format"""
+        with self._lock:
+            families = list(self._families.items())
+            samples = {name: {key: (list(value) if isinstance(value, list) else value) for key, value in values.items()}
+                       for name, values in self._samples.items()}
+        lines = []
+        for name, (kind, help, extra) in families:
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"# HELP {name} {help}")
+            if kind == 'gauge':
+                try:
+                    collected = [(self._key(labels), value) for labels, value in extra()]
+                except Exception as e:
+                    logger.warning(f"⚠️ Metrik {name} konnte nicht erfasst werden: {e}")
+                    continue
+                lines.extend(f"{name}{self._labels(key)} {value}" for key, value in collected)
+            elif kind == 'counter':
+                lines.extend(f"{name}_total{self._labels(key)} {value}" for key, value in samples[name].items())
+            else:
+                for key, state in samples[name].items():
+                    cumulative = 0
+                    for bound, count in zip((*extra, float('inf')), state):
+                        cumulative += count
+                        le = "+Inf" if bound == float('inf') else repr(float(bound))
+                        lines.append(f"{name}_bucket{self._labels(key, [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_count{self._labels(key)} {cumulative}")
+                    lines.append(f"{name}_sum{self._labels(key)} {state[-1]}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+metrics.histogram('ticketbot_interaction_response_seconds',
+                  'Time from the creation of an interaction until its first response was accepted',
+                  (0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 2.5, 3.0, 5.0))
+metrics.counter('ticketbot_interaction_timeouts',
+                'Interactions without a response after the 3 second deadline ("Interaktion fehlgeschlagen")')
+metrics.counter('ticketbot_discord_rate_limits', 'HTTP 429 responses from Discord per route')
+metrics.histogram('ticketbot_json_store_seconds', 'Duration of JSON data file reads and writes',
+                  (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+metrics.histogram('ticketbot_background_task_seconds', 'Run time of background tasks',
+                  (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0))
+
+def instrument_interaction_responses():
+    """Time the first response of every interaction.
+
+    Every response method raises ``InteractionResponded`` once a response was
+    sent, so a call that returns normally is always the first response.
+    """
+    def wrap(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            result = await method(self, *args, **kwargs)
+            interaction = self._parent
+            latency = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+            metrics.observe('ticketbot_interaction_response_seconds', max(latency, 0.0), type=interaction.type.name)
+            return result
+        return wrapper
+    
+    for name in ('defer', 'pong', 'send_message', 'edit_message', 'send_modal', 'autocomplete', 'launch_activity'):
+        setattr(discord.InteractionResponse, name, wrap(getattr(discord.InteractionResponse, name)))
+
+instrument_interaction_responses()
+
+def watch_interaction_deadline(interaction):
+    """Count the interaction as failed if it has no response when Discord gives up on it"""
+    def check():
+        if not interaction.response.is_done():
+            metrics.inc('ticketbot_interaction_timeouts', type=interaction.type.name)
+    
+    # Measured from Discord's creation time, which is where the 3 seconds start
+    elapsed = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+    asyncio.get_running_loop().call_later(max(INTERACTION_RESPONSE_DEADLINE - elapsed, 0.0), check)
+
+def discord_route_bucket(url):
+    """Reduce a Discord API URL to its route, e.g. /channels/{id}/messages"""
+    path = re.sub(r'^/api/v\d+', '', urllib.parse.urlsplit(str(url)).path)
+    return '/'.join('{id}' if part.isdigit() else '{token}' if len(part) > 32 else part for part in path.split('/'))
+
+class RateLimitMetricsFilter(logging.Filter):
+    """Counts the 429s discord.py reports - it retries them internally, so its log is the only hook"""
+    def filter(self, record):
+        if isinstance(record.msg, str) and record.msg.startswith('We are being rate limited.') and len(record.args) >= 2:
+            method, url = record.args[:2]
+            metrics.inc('ticketbot_discord_rate_limits', method=method, route=discord_route_bucket(url))
+        return True
+
+logging.getLogger('discord.http').addFilter(RateLimitMetricsFilter())
+
+# ========================================
+# EVENT LOOP MONITOR
+# ========================================
+
+# Sekunden zwischen zwei Lag-Messungen
+LOOP_PROBE_INTERVAL = float(os.getenv('LOOP_PROBE_INTERVAL', '0.5'))
+# Callbacks, die den Event-Loop länger blockieren, werden gemeldet (0 = aus)
+LOOP_SLOW_CALLBACK = float(os.getenv('LOOP_SLOW_CALLBACK', '0.1'))
+
+def describe_callback(handle):
+    """Name the coroutine chain (or function) behind an event loop callback"""
+    callback = handle._callback
+    task = getattr(callback, '__self__', None)
+    if not isinstance(task, asyncio.Task):
+        return getattr(callback, '__qualname__', None) or repr(callback)
+    names = []
+    coro = task.get_coro()
+    while coro is not None and hasattr(coro, 'cr_await'):
+        if not names or names[-1] != coro.__qualname__:
+            names.append(coro.__qualname__)
+        coro = coro.cr_await
+    if len(names) > 4:
+        names = [names[0], '…', *names[-3:]]
+    return ' → '.join(names) or task.get_name()
+
+class LoopMonitor:
+    """Measures event loop lag and reports callbacks that block the loop.
+
+    A probe task sleeps ``interval`` seconds and records how late it wakes
+    up. Like asyncio's debug mode, every loop callback is timed; callbacks
+    running longer than ``slow_threshold`` are logged with their coroutine.
+    """
+    def __init__(self, interval, slow_threshold, window=600):
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.lags = collections.deque(maxlen=window)  # rolling window of lag samples
+        self.slow_callbacks = collections.deque(maxlen=20)  # (time, name, seconds)
+        self.slow_counts = collections.Counter()
+        self._task = None
+    
+    def start(self):
+        if self._task is not None:
+            return
+        if self.slow_threshold > 0:
+            self._instrument_callbacks()
+        self._task = asyncio.create_task(self._probe())
+    
+    def _instrument_callbacks(self):
+        run = asyncio.Handle._run
+        
+        def timed_run(handle):
+            started = time.perf_counter()
+            run(handle)
+            duration = time.perf_counter() - started
+            if duration >= self.slow_threshold:
+                self._report(handle, duration)
+        
+        asyncio.Handle._run = timed_run
+    
+    def _report(self, handle, duration):
+        name = describe_callback(handle)
+        self.slow_callbacks.append((time.time(), name, duration))
+        self.slow_counts[name] += 1
+        metrics.inc('ticketbot_slow_callbacks')
+        logger.warning(f"🐢 Event-Loop {duration * 1000:.0f} ms blockiert von {name}")
+    
+    async def _probe(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.monotonic() - expected))
+    
+    def stats(self):
+        """Rolling lag percentiles and the latest slow callbacks"""
+        samples = list(self.lags)
+        return {
+            "lag_p50_ms": round(percentile(samples, 50) * 1000, 1),
+            "lag_p99_ms": round(percentile(samples, 99) * 1000, 1),
+            "lag_max_ms": round(max(samples, default=0.0) * 1000, 1),
+            "window_s": round(len(samples) * self.interval),
+            "slow_callbacks": sum(self.slow_counts.values()),
+            "top_slow_callbacks": [{"name": name, "count": count} for name, count in self.slow_counts.most_common(3)],
+            "recent_slow_callbacks": [
+                {"at": datetime.fromtimestamp(at).isoformat(timespec='seconds'), "name": name, "ms": round(duration * 1000)}
+                for at, name, duration in list(self.slow_callbacks)[-5:]
+            ],
+        }
+
+loop_monitor = LoopMonitor(LOOP_PROBE_INTERVAL, LOOP_SLOW_CALLBACK)
+metrics.counter('ticketbot_slow_callbacks', 'Event loop callbacks that blocked the loop longer than LOOP_SLOW_CALLBACK')
+metrics.gauge('ticketbot_event_loop_lag_seconds', 'Event loop lag over the rolling probe window',
+              lambda: [({'quantile': quantile}, percentile(list(loop_monitor.lags), float(quantile) * 100))
+                       for quantile in ('0.5', '0.99')])
 
-@app.route('/')
-def health_check():
-    return {'status': 'healthy', 'service': 'discord-bot'}, 200
+# Fire-and-forget tasks; the event loop only keeps weak references to tasks
+background_tasks = set()
 
-@app.route('/health')
-def health():
-    return {'status': 'ok'}, 200
+def run_in_background(coro):
+    """Start ``coro`` as a task and keep a reference to it until it is done"""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+# ========================================
+# WEB SERVER
+# ========================================
+
+WEB_HOST = os.getenv('WEB_HOST', '0.0.0.0')
+WEB_PORT = int(os.getenv('PORT', '5000'))
+
+# Health checks (required for Autoscale deployment), metrics and the GitHub webhook
+app = web.Application()
+routes = web.RouteTableDef()
+
+@routes.get('/')
+async def health_check(request):
+    return web.json_response({'status': 'healthy', 'service': 'discord-bot'})
+
+@routes.get('/health')
+async def health(request):
+    return web.json_response({'status': 'ok', 'loop': loop_monitor.stats()})
+
+@routes.get('/metrics')
+async def metrics_endpoint(request):
+    return web.Response(body=metrics.render().encode('utf-8'), headers={'Content-Type': OPENMETRICS_CONTENT_TYPE})
 
 # GitHub Webhook für automatische Updates
-@app.route('/webhook', methods=['POST'])
-def github_webhook():
+@routes.post('/webhook')
+async def github_webhook(request):
     """GitHub Webhook Handler für automatische Updates"""
     try:
         # Verify GitHub webhook (optional - add secret validation here)
-        payload = request.get_json()
+        payload = await request.json() if request.can_read_body else None
         
         if payload and 'head_commit' in payload:
-            print(f"🔄 GitHub Update erhalten: {payload['head_commit']['message']}")
+            updater_logger.info(f"🔄 GitHub Update erhalten: {payload['head_commit']['message']}")
             
-            # Trigger bot update in background
-            threading.Thread(target=trigger_bot_update, daemon=True).start()
+            # Run the update in the background so GitHub gets its answer right away
+            run_in_background(trigger_bot_update())
             
-            return {'status': 'update_triggered'}, 200
+            return web.json_response({'status': 'update_triggered'})
         
-        return {'status': 'no_update_needed'}, 200
+        return web.json_response({'status': 'no_update_needed'})
         
     except Exception as e:
-        print(f"❌ Webhook Error: {e}")
-        return {'status': 'error'}, 500
+        updater_logger.error(f"❌ Webhook Error: {e}")
+        return web.json_response({'status': 'error'}, status=500)
+
+app.add_routes(routes)
 
-def trigger_bot_update():
+class WebServer:
+    """Serves ``app`` on the bot's event loop; started in setup_hook and stopped with the bot"""
+    def __init__(self, app, host, port):
+        self.app = app
+        self.host = host
+        self.port = port
+        self._runner = None
+    
+    async def start(self):
+        if self._runner is not None:
+            return
+        runner = web.AppRunner(self.app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except OSError:
+            await runner.cleanup()
+            raise
+        self._runner = runner
+        logger.info(f"✅ HTTP server läuft auf Port {self.port}")
+    
+    async def stop(self):
+        if self._runner is not None:
+            runner, self._runner = self._runner, None
+            await runner.cleanup()
+
+web_server = WebServer(app, WEB_HOST, WEB_PORT)
+
+async def trigger_bot_update():
     """Trigger Bot Update Process"""
     try:
-        print("🚀 Starte automatisches Bot-Update...")
+        updater_logger.info("🚀 Starte automatisches Bot-Update...")
         
         # Git pull (if in git environment)
         try:
-            subprocess.run(['git', 'pull'], check=True, capture_output=True)
-            print("✅ Code erfolgreich aktualisiert")
-        except:
-            print("⚠️ Git pull fehlgeschlagen - möglicherweise keine Git-Umgebung")
+            process = await asyncio.create_subprocess_exec(
+                'git', 'pull', stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+            await process.communicate()
+            if process.returncode != 0:
+                raise subprocess.CalledProcessError(process.returncode, 'git pull')
+            updater_logger.info("✅ Code erfolgreich aktualisiert")
+        except Exception:
+            updater_logger.warning("⚠️ Git pull fehlgeschlagen - möglicherweise keine Git-Umgebung")
         
         # Schedule Discord updates
-        if bot and hasattr(bot, 'loop'):
-            asyncio.run_coroutine_threadsafe(
-                schedule_discord_updates(), 
-                bot.loop
-            )
+        await schedule_discord_updates()
         
     except Exception as e:
-        print(f"❌ Update Error: {e}")
+        updater_logger.error(f"❌ Update Error: {e}")
 
 async def schedule_discord_updates():
     """Schedule Discord component updates"""
     try:
-        print("🔄 Starte Discord-Updates...")
+        updater_logger.info("🔄 Starte Discord-Updates...")
         
         # Update all server panels
         await update_all_ticket_panels()
@@ -79,13 +493,976 @@ async def schedule_discord_updates():
         # Notify admins about update
         await notify_admins_about_update()
         
-        print("✅ Discord-Updates abgeschlossen")
+        updater_logger.info("✅ Discord-Updates abgeschlossen")
         
     except Exception as e:
-        print(f"❌ Discord Update Error: {e}")
+        updater_logger.error(f"❌ Discord Update Error: {e}")
+
+def bind_interaction_log_context(interaction):
+    """Tag the records of this interaction with its guild, user and (if it is one) ticket channel"""
+    bind_log_context(
+        guild=interaction.guild_id,
+        user=interaction.user.id,
+        ticket=interaction.channel_id if interaction.channel_id in open_tickets else None
+    )
+
+class TicketCommandTree(discord.app_commands.CommandTree):
+    async def interaction_check(self, interaction):
+        # Runs in the task of the command itself, so the context covers the whole command
+        bind_interaction_log_context(interaction)
+        return True
+
+class TicketBot(commands.Bot):
+    """Bot with hooks for process-wide resources"""
+    
+    async def setup_hook(self):
+        # Runs once per process before the gateway connects - not again on reconnects
+        http_client.start()
+        loop_monitor.start()
+        try:
+            await web_server.start()
+        except OSError as e:
+            logger.error(f"❌ HTTP server konnte nicht gestartet werden: {e}")
+        run_in_background(sync_application_commands())
+    
+    async def close(self):
+        await web_server.stop()
+        await ticket_log.flush()
+        await super().close()
+        await http_client.close()
 
 intents = discord.Intents.default()
-bot = commands.Bot(command_prefix="!", intents=intents)
+# Join/Leave-Events und der Mitglieder-Cache (Mitgliederzähler, Welcome/Leave) brauchen den Server Members Intent
+intents.members = True
+bot = TicketBot(command_prefix="!", intents=intents, tree_cls=TicketCommandTree)
+
+# ========================================
+# HTTP CLIENT
+# ========================================
+
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '20'))
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '10'))
+
+class HttpClient:
+    """One pooled aiohttp session for all outgoing HTTP requests.
+
+    Connections and DNS lookups are reused across calls instead of paying a
+    new TCP+TLS handshake per request. Created in setup_hook and closed
+    with the bot; ``session`` also creates it on demand outside the bot.
+    """
+    def __init__(self, pool_size, timeout):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = None
+    
+    def start(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+    
+    @property
+    def session(self):
+        return self.start()
+    
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+http_client = HttpClient(HTTP_POOL_SIZE, HTTP_TIMEOUT)
+
+# ========================================
+# JSON STORAGE
+# ========================================
+
+# Einrückung der JSON-Dateien (JSON_INDENT=0 für kompakte Dateien)
+JSON_INDENT = int(os.environ.get('JSON_INDENT', '2')) or None
+# Wartezeit, in der mehrere Speichervorgänge derselben Datei zusammengefasst werden
+JSON_WRITE_DELAY = float(os.environ.get('JSON_WRITE_DELAY', '0.5'))
+
+class JsonFileWriter:
+    """Background writer for the bot's JSON data files.
+
+    Saves are snapshotted on the calling thread and written by a single worker
+    thread. Saves of the same file within ``delay`` seconds are coalesced into
+    one flush, and every flush goes to a temp file followed by ``os.replace``
+    so a crash never leaves a truncated file behind. Every snapshot carries a
+    sequence number; a snapshot older than the one already on disk is dropped,
+    so the worker and ``flush`` racing each other never write stale data last.
+    """
+    def __init__(self, delay=0.5, indent=2):
+        self.delay = delay
+        self.indent = indent
+        self._pending = {}    # path -> (data, due_time, seq)
+        self._in_flight = {}  # path -> data currently being written
+        self._signatures = {}  # path -> (mtime_ns, size) of our last write
+        self._written_seq = {}  # path -> seq of the snapshot on disk
+        self._seq = itertools.count(1)
+        self._condition = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._thread = None
+        self.flush_count = 0
+        self.coalesced_count = 0
+    
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="json-writer", daemon=True)
+            self._thread.start()
+    
+    def write(self, path, data):
+        """Queue ``data`` to be written to ``path``"""
+        snapshot = copy.deepcopy(data)
+        with self._condition:
+            if path in self._pending:
+                # Keep the original due time so a steady stream of saves still flushes
+                due_time = self._pending[path][1]
+                self.coalesced_count += 1
+            else:
+                due_time = time.monotonic() + self.delay
+            self._pending[path] = (snapshot, due_time, next(self._seq))
+            self._ensure_thread()
+            self._condition.notify()
+    
+    def read(self, path):
+        """Read ``path``, returning queued data if a write is still pending"""
+        with self._condition:
+            if path in self._pending:
+                return copy.deepcopy(self._pending[path][0])
+            if path in self._in_flight:
+                return copy.deepcopy(self._in_flight[path])
+        with metrics.timer('ticketbot_json_store_seconds', op='read', file=os.path.basename(path)):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    
+    def is_pending(self, path):
+        with self._condition:
+            return path in self._pending or path in self._in_flight
+    
+    def written_signature(self, path):
+        """Return the (mtime_ns, size) of the file as we last wrote it"""
+        with self._condition:
+            return self._signatures.get(path)
+    
+    def flush(self, path=None):
+        """Write pending data immediately on the calling thread"""
+        with self._condition:
+            paths = [path] if path is not None else list(self._pending)
+            batch = {}
+            for p in paths:
+                if p in self._pending:
+                    data, _, seq = self._pending.pop(p)
+                    batch[p] = (data, seq)
+                    self._in_flight[p] = data
+        for p, (data, seq) in batch.items():
+            self._write_now(p, data, seq)
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                now = time.monotonic()
+                next_due = min(due for _, due, _ in self._pending.values())
+                if next_due > now:
+                    self._condition.wait(next_due - now)
+                    continue
+                batch = {}
+                for p, (data, due, seq) in list(self._pending.items()):
+                    if due <= now:
+                        batch[p] = (data, seq)
+                        self._in_flight[p] = data
+                        del self._pending[p]
+            for p, (data, seq) in batch.items():
+                self._write_now(p, data, seq)
+    
+    def _write_now(self, path, data, seq):
+        with self._io_lock, metrics.timer('ticketbot_json_store_seconds', op='write', file=os.path.basename(path)):
+            try:
+                if seq <= self._written_seq.get(path, 0):
+                    # A newer snapshot was written by the other path in the meantime
+                    return
+                directory = os.path.dirname(os.path.abspath(path))
+                fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(data, f, ensure_ascii=False, indent=self.indent)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+                    raise
+                self._written_seq[path] = seq
+                stat = os.stat(path)
+                with self._condition:
+                    self._signatures[path] = (stat.st_mtime_ns, stat.st_size)
+                    self.flush_count += 1
+            except Exception as e:
+                storage_logger.error(f"❌ Fehler beim Speichern von {path}: {e}")
+            finally:
+                with self._condition:
+                    if self._in_flight.get(path) is data:
+                        del self._in_flight[path]
+
+json_writer = JsonFileWriter(delay=JSON_WRITE_DELAY, indent=JSON_INDENT)
+atexit.register(json_writer.flush)
+
+def read_json_file(path):
+    """Load a JSON data file (sees saves that are not yet flushed)"""
+    return json_writer.read(path)
+
+def write_json_file(path, data):
+    """Save a JSON data file in the background (atomic, coalesced)"""
+    json_writer.write(path, data)
+
+# ========================================
+# TICKET DATABASE (SQLite)
+# ========================================
+
+DATABASE_PATH = os.environ.get('DATABASE_PATH', 'ticketbot.db')
+
+def get_default_discount_codes():
+    """Default discount codes for a fresh installation"""
+    created_at = int(datetime.now().timestamp())
+    return {
+        code: {
+            "type": "percentage",
+            "value": 0.10,
+            "max_uses": -1,
+            "current_uses": 0,
+            "used_by": [],
+            "auto_delete": False,
+            "created_at": created_at,
+            "description": "10% Rabatt"
+        }
+        for code in ("FIJI", "CATLEEN", "STILLES")
+    }
+
+def normalize_discount_code(value):
+    """Migrate an old-format discount code (plain percentage) to the new structure"""
+    if isinstance(value, dict):
+        return value
+    return {
+        "type": "percentage",
+        "value": value,
+        "max_uses": -1,  # -1 = unlimited, 1 = single use
+        "current_uses": 0,
+        "used_by": [],
+        "auto_delete": False,  # Auto-delete after use
+        "created_at": int(datetime.now().timestamp()),
+        "description": f"{int(value * 100)}% Rabatt"
+    }
+
+def ticket_timestamp(value):
+    """Convert a stored created_at (ISO string or epoch) to epoch seconds"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = pytz.timezone('Europe/Berlin').localize(parsed)
+    return parsed.timestamp()
+
+class TicketDatabase:
+    """SQLite store for tickets, appointments, pending tickets, discount codes and ticket forms.
+
+    All queries run on one dedicated worker thread so the event loop never
+    blocks on disk I/O. The old JSON files are imported once on first start.
+    """
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS appointments (
+            guild_id INTEGER NOT NULL DEFAULT 0,
+            slot_key TEXT NOT NULL,
+            user_id INTEGER,
+            user_name TEXT,
+            ticket_name TEXT,
+            booked_at TEXT,
+            PRIMARY KEY (guild_id, slot_key)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_appointments_guild_ticket ON appointments (guild_id, ticket_name)",
+        """CREATE TABLE IF NOT EXISTS pending_tickets (
+            ticket_id TEXT PRIMARY KEY,
+            user_id INTEGER,
+            created_ts REAL,
+            needs_ping INTEGER NOT NULL DEFAULT 0,
+            pinged INTEGER NOT NULL DEFAULT 0,
+            data TEXT NOT NULL DEFAULT '{}'
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_pending_tickets_ping ON pending_tickets (needs_ping, pinged, created_ts)",
+        "CREATE INDEX IF NOT EXISTS idx_pending_tickets_user ON pending_tickets (user_id)",
+        """CREATE TABLE IF NOT EXISTS discount_codes (
+            code TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0
+        )""",
+        """CREATE TABLE IF NOT EXISTS discount_redemptions (
+            code TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            redeemed_at REAL,
+            PRIMARY KEY (code, user_id)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS ticket_forms (
+            ticket_name TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS tickets (
+            channel_id INTEGER PRIMARY KEY,
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            user_name TEXT,
+            ticket_type TEXT,
+            channel_name TEXT,
+            stage TEXT NOT NULL DEFAULT 'open',
+            created_at REAL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_tickets_guild_user ON tickets (guild_id, user_id)",
+        """CREATE TABLE IF NOT EXISTS giveaways (
+            giveaway_id TEXT PRIMARY KEY,
+            guild_id INTEGER NOT NULL,
+            end_ts REAL NOT NULL,
+            ended INTEGER NOT NULL DEFAULT 0,
+            data TEXT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS giveaway_entries (
+            giveaway_id TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            roles TEXT,
+            PRIMARY KEY (giveaway_id, user_id)
+        ) WITHOUT ROWID""",
+    )
+    
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="ticket-db")
+    
+    async def run(self, fn, *args):
+        """Run ``fn(conn, *args)`` on the database thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, fn, args)
+    
+    def _call(self, fn, args):
+        if self._conn is None:
+            self._conn = self._connect()
+        return fn(self._conn, *args)
+    
+    def _connect(self):
+        # Only ever used from the worker thread (and close() after it has stopped)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            self._partition_appointments(conn)
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            self._upgrade_schema(conn)
+        self._migrate_json_files(conn)
+        return conn
+    
+    def _partition_appointments(self, conn):
+        """Move an appointments table without guild_id aside so SCHEMA recreates it partitioned"""
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(appointments)")}
+        if columns and 'guild_id' not in columns:
+            conn.execute("DROP INDEX IF EXISTS idx_appointments_ticket_name")
+            conn.execute("ALTER TABLE appointments RENAME TO appointments_unpartitioned")
+    
+    def _upgrade_schema(self, conn):
+        """Bring databases created by older versions up to date"""
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'appointments_unpartitioned'").fetchone():
+            # Guild 0 holds appointments from before the per-guild partitioning until they are adopted
+            conn.execute(
+                "INSERT OR IGNORE INTO appointments (guild_id, slot_key, user_id, user_name, ticket_name, booked_at) "
+                "SELECT 0, slot_key, user_id, user_name, ticket_name, booked_at FROM appointments_unpartitioned"
+            )
+            conn.execute("DROP TABLE appointments_unpartitioned")
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(discount_codes)")}
+        if 'version' not in columns:
+            conn.execute("ALTER TABLE discount_codes ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(giveaway_entries)")}
+        if 'roles' not in columns:
+            conn.execute("ALTER TABLE giveaway_entries ADD COLUMN roles TEXT")
+        # Move used_by lists out of the code data into discount_redemptions
+        for row in conn.execute("SELECT code, data FROM discount_codes WHERE data LIKE '%\"used_by\"%'").fetchall():
+            self._put_discount_code(conn, row['code'], json.loads(row['data']))
+    
+    def close(self):
+        """Finish queued queries and close the connection"""
+        self._executor.shutdown(wait=True)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    # One-shot migration from the old JSON files
+    def _migrate_json_files(self, conn):
+        migrations = (
+            ('appointments.json', self._import_appointments),
+            ('pending_tickets.json', self._import_pending_tickets),
+            ('discount_codes.json', self._import_discount_codes),
+            ('ticket_forms.json', self._import_ticket_forms),
+        )
+        for filename, importer in migrations:
+            key = f"migrated:{filename}"
+            if conn.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone():
+                continue
+            try:
+                with open(filename, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                data = None
+            except json.JSONDecodeError:
+                storage_logger.error(f"❌ {filename} ist beschädigt - Migration übersprungen")
+                data = {}
+            with conn:
+                imported = importer(conn, data)
+                conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (key, datetime.now().isoformat()))
+            if imported:
+                storage_logger.info(f"✅ {imported} Einträge aus {filename} in die Datenbank übernommen")
+    
+    def _import_appointments(self, conn, data):
+        rows = [
+            (slot_key, a.get('user_id'), a.get('user_name'), a.get('ticket_name'), a.get('booked_at'))
+            for slot_key, a in (data or {}).items()
+        ]
+        conn.executemany(
+            "INSERT OR REPLACE INTO appointments (slot_key, user_id, user_name, ticket_name, booked_at) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        return len(rows)
+    
+    def _import_pending_tickets(self, conn, data):
+        for ticket_id, ticket in (data or {}).items():
+            self._put_pending_ticket(conn, ticket_id, ticket)
+        return len(data or {})
+    
+    def _import_discount_codes(self, conn, data):
+        if data is None:
+            # Fresh installation - seed the default codes
+            data = get_default_discount_codes()
+        for code, value in data.items():
+            self._put_discount_code(conn, code, normalize_discount_code(value))
+        return len(data)
+    
+    def _import_ticket_forms(self, conn, data):
+        rows = [(name, json.dumps(form, ensure_ascii=False)) for name, form in (data or {}).items()]
+        conn.executemany("INSERT OR REPLACE INTO ticket_forms VALUES (?, ?)", rows)
+        return len(rows)
+    
+    # Appointments
+    @staticmethod
+    def _appointment_dict(row):
+        return {
+            'user_id': row['user_id'],
+            'user_name': row['user_name'],
+            'ticket_name': row['ticket_name'],
+            'booked_at': row['booked_at']
+        }
+    
+    async def get_appointments(self, guild_id, start_key=None, end_key=None):
+        """Return a guild's booked appointments (slot_key -> data), optionally for a slot_key range"""
+        def _query(conn):
+            if start_key is None:
+                rows = conn.execute("SELECT * FROM appointments WHERE guild_id = ?", (guild_id,)).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT * FROM appointments WHERE guild_id = ? AND slot_key >= ? AND slot_key < ?",
+                    (guild_id, start_key, end_key)
+                ).fetchall()
+            return {row['slot_key']: self._appointment_dict(row) for row in rows}
+        return await self.run(_query)
+    
+    async def reserve_appointment(self, guild_id, slot_key, appointment):
+        """Book a slot if it is still free. Returns True if the slot was reserved."""
+        def _insert(conn):
+            with conn:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO appointments (guild_id, slot_key, user_id, user_name, ticket_name, booked_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (guild_id, slot_key, appointment['user_id'], appointment['user_name'],
+                     appointment['ticket_name'], appointment['booked_at'])
+                )
+                return cursor.rowcount == 1
+        return await self.run(_insert)
+    
+    async def free_ticket_appointments(self, guild_id, ticket_name):
+        """Delete all appointments of a ticket. Returns the freed slot_keys."""
+        def _delete(conn):
+            with conn:
+                params = (guild_id, ticket_name)
+                rows = conn.execute("SELECT slot_key FROM appointments WHERE guild_id = ? AND ticket_name = ?", params).fetchall()
+                conn.execute("DELETE FROM appointments WHERE guild_id = ? AND ticket_name = ?", params)
+                return [row['slot_key'] for row in rows]
+        return await self.run(_delete)
+    
+    async def delete_appointments_before(self, slot_key):
+        """Delete all appointments before ``slot_key``. Returns the number deleted."""
+        def _delete(conn):
+            with conn:
+                return conn.execute("DELETE FROM appointments WHERE slot_key < ?", (slot_key,)).rowcount
+        return await self.run(_delete)
+    
+    async def clear_appointments(self, guild_id):
+        def _delete(conn):
+            with conn:
+                return conn.execute("DELETE FROM appointments WHERE guild_id = ?", (guild_id,)).rowcount
+        return await self.run(_delete)
+    
+    async def adopt_legacy_appointments(self, guild_id):
+        """Move appointments from before the per-guild partitioning to ``guild_id``"""
+        def _update(conn):
+            with conn:
+                return conn.execute("UPDATE OR IGNORE appointments SET guild_id = ? WHERE guild_id = 0", (guild_id,)).rowcount
+        return await self.run(_update)
+    
+    # Pending tickets (30-minute ping system and shop tickets)
+    @staticmethod
+    def _put_pending_ticket(conn, ticket_id, ticket):
+        conn.execute(
+            "INSERT OR REPLACE INTO pending_tickets VALUES (?, ?, ?, ?, ?, ?)",
+            (str(ticket_id), ticket.get('user_id'), ticket_timestamp(ticket.get('created_at')),
+             int(bool(ticket.get('needs_ping', False))), int(bool(ticket.get('pinged', False))),
+             json.dumps(ticket, ensure_ascii=False))
+        )
+    
+    @staticmethod
+    def _pending_ticket_dict(row):
+        ticket = json.loads(row['data'])
+        ticket['needs_ping'] = bool(row['needs_ping'])
+        ticket['pinged'] = bool(row['pinged'])
+        return ticket
+    
+    async def put_pending_ticket(self, ticket_id, ticket):
+        def _put(conn):
+            with conn:
+                self._put_pending_ticket(conn, ticket_id, ticket)
+        await self.run(_put)
+    
+    async def get_pending_ticket(self, ticket_id):
+        def _query(conn):
+            row = conn.execute("SELECT * FROM pending_tickets WHERE ticket_id = ?", (str(ticket_id),)).fetchone()
+            return self._pending_ticket_dict(row) if row else None
+        return await self.run(_query)
+    
+    async def get_pending_tickets_for_user(self, user_id):
+        def _query(conn):
+            rows = conn.execute("SELECT * FROM pending_tickets WHERE user_id = ?", (user_id,)).fetchall()
+            return {row['ticket_id']: self._pending_ticket_dict(row) for row in rows}
+        return await self.run(_query)
+    
+    async def update_pending_ticket(self, ticket_id, **changes):
+        """Merge ``changes`` into a pending ticket. Returns False if it does not exist."""
+        def _update(conn):
+            with conn:
+                row = conn.execute("SELECT * FROM pending_tickets WHERE ticket_id = ?", (str(ticket_id),)).fetchone()
+                if not row:
+                    return False
+                ticket = self._pending_ticket_dict(row)
+                ticket.update(changes)
+                self._put_pending_ticket(conn, ticket_id, ticket)
+                return True
+        return await self.run(_update)
+    
+    async def get_ping_schedule(self):
+        """Return (ticket_id, created_ts) of all tickets that still need a team ping"""
+        def _query(conn):
+            rows = conn.execute(
+                "SELECT ticket_id, created_ts FROM pending_tickets WHERE needs_ping = 1 AND pinged = 0"
+            ).fetchall()
+            return [(row['ticket_id'], row['created_ts']) for row in rows]
+        return await self.run(_query)
+    
+    async def delete_pending_tickets(self, ticket_ids):
+        def _delete(conn):
+            with conn:
+                conn.executemany("DELETE FROM pending_tickets WHERE ticket_id = ?", [(str(t),) for t in ticket_ids])
+        await self.run(_delete)
+    
+    async def count_pending_tickets(self):
+        return await self.run(lambda conn: conn.execute("SELECT COUNT(*) FROM pending_tickets").fetchone()[0])
+    
+    # Discount codes
+    @staticmethod
+    def _put_discount_code(conn, code, data):
+        """Upsert a code; a ``used_by`` list in ``data`` is stored as redemption rows"""
+        data = dict(data)
+        used_by = data.pop("used_by", None)
+        conn.execute(
+            """INSERT INTO discount_codes (code, data) VALUES (?, ?)
+               ON CONFLICT (code) DO UPDATE SET data = excluded.data, version = version + 1""",
+            (code, json.dumps(data, ensure_ascii=False))
+        )
+        if used_by:
+            conn.executemany(
+                "INSERT OR IGNORE INTO discount_redemptions (code, user_id) VALUES (?, ?)",
+                [(code, user_id) for user_id in used_by]
+            )
+    
+    async def get_discount_codes(self):
+        def _query(conn):
+            rows = conn.execute("SELECT code, data FROM discount_codes").fetchall()
+            return {row['code']: json.loads(row['data']) for row in rows}
+        return await self.run(_query)
+    
+    async def get_discount_code(self, code):
+        def _query(conn):
+            row = conn.execute("SELECT data FROM discount_codes WHERE code = ?", (code,)).fetchone()
+            return json.loads(row['data']) if row else None
+        return await self.run(_query)
+    
+    async def put_discount_code(self, code, data):
+        def _put(conn):
+            with conn:
+                self._put_discount_code(conn, code, data)
+        await self.run(_put)
+    
+    async def delete_discount_code(self, code):
+        def _delete(conn):
+            with conn:
+                conn.execute("DELETE FROM discount_redemptions WHERE code = ?", (code,))
+                return conn.execute("DELETE FROM discount_codes WHERE code = ?", (code,)).rowcount == 1
+        return await self.run(_delete)
+    
+    async def replace_discount_codes(self, codes):
+        def _replace(conn):
+            with conn:
+                conn.execute("DELETE FROM discount_codes")
+                conn.execute("DELETE FROM discount_redemptions")
+                for code, data in codes.items():
+                    self._put_discount_code(conn, code, data)
+        await self.run(_replace)
+    
+    async def reset_discount_code_usage(self, code):
+        """Reset a code's usage. Returns (old_uses, old_users) or None if the code does not exist."""
+        def _reset(conn):
+            with conn:
+                row = conn.execute("SELECT data FROM discount_codes WHERE code = ?", (code,)).fetchone()
+                if not row:
+                    return None
+                data = json.loads(row['data'])
+                old_uses = data.get("current_uses", 0)
+                old_users = conn.execute("DELETE FROM discount_redemptions WHERE code = ?", (code,)).rowcount
+                data["current_uses"] = 0
+                self._put_discount_code(conn, code, data)
+                return old_uses, old_users
+        return await self.run(_reset)
+    
+    async def redeem_discount_code(self, code, user_id, max_attempts=5):
+        """Atomically check and consume one use of a discount code.
+
+        The code row is updated with compare-and-set on its version, so a
+        concurrent redemption (also from another process sharing the file)
+        makes this attempt retry instead of overwriting the other's counters.
+        Returns (status, code_data, attempts) where status is one of
+        'redeemed', 'not_found', 'exhausted', 'already_used' or 'conflict'.
+        """
+        def _redeem(conn):
+            for attempt in range(1, max_attempts + 1):
+                row = conn.execute("SELECT data, version FROM discount_codes WHERE code = ?", (code,)).fetchone()
+                if row is None:
+                    return 'not_found', None, attempt
+                data = json.loads(row['data'])
+                max_uses = data.get("max_uses", -1)
+                if max_uses != -1:  # Not unlimited
+                    if data.get("current_uses", 0) >= max_uses:
+                        return 'exhausted', data, attempt
+                    if conn.execute(
+                        "SELECT 1 FROM discount_redemptions WHERE code = ? AND user_id = ?", (code, user_id)
+                    ).fetchone():
+                        return 'already_used', data, attempt
+                
+                updated = dict(data)
+                updated["current_uses"] = data.get("current_uses", 0) + 1
+                with conn:
+                    if data.get("auto_delete", False) and max_uses == 1:
+                        cursor = conn.execute("DELETE FROM discount_codes WHERE code = ? AND version = ?", (code, row['version']))
+                        if cursor.rowcount == 1:
+                            conn.execute("DELETE FROM discount_redemptions WHERE code = ?", (code,))
+                    else:
+                        cursor = conn.execute(
+                            "UPDATE discount_codes SET data = ?, version = version + 1 WHERE code = ? AND version = ?",
+                            (json.dumps(updated, ensure_ascii=False), code, row['version'])
+                        )
+                        if cursor.rowcount == 1:
+                            conn.execute(
+                                "INSERT OR IGNORE INTO discount_redemptions VALUES (?, ?, ?)",
+                                (code, user_id, time.time())
+                            )
+                if cursor.rowcount == 1:
+                    return 'redeemed', data, attempt
+            return 'conflict', None, max_attempts
+        return await self.run(_redeem)
+    
+    async def count_discount_codes(self):
+        return await self.run(lambda conn: conn.execute("SELECT COUNT(*) FROM discount_codes").fetchone()[0])
+    
+    # Ticket forms
+    async def put_ticket_form(self, ticket_name, form_data):
+        def _put(conn):
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO ticket_forms VALUES (?, ?)", (ticket_name, json.dumps(form_data, ensure_ascii=False)))
+        await self.run(_put)
+    
+    async def get_ticket_form(self, ticket_name):
+        def _query(conn):
+            row = conn.execute("SELECT data FROM ticket_forms WHERE ticket_name = ?", (ticket_name,)).fetchone()
+            return json.loads(row['data']) if row else None
+        return await self.run(_query)
+    
+    # Open tickets (state behind the persistent ticket views)
+    TICKET_COLUMNS = ('channel_id', 'guild_id', 'user_id', 'user_name', 'ticket_type', 'channel_name', 'stage', 'created_at')
+    
+    async def put_ticket(self, ticket):
+        def _put(conn):
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO tickets VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    tuple(ticket.get(column) for column in self.TICKET_COLUMNS[:6])
+                    + (ticket.get('stage', 'open'), ticket_timestamp(ticket.get('created_at')))
+                )
+        await self.run(_put)
+    
+    async def get_ticket(self, channel_id):
+        def _query(conn):
+            row = conn.execute("SELECT * FROM tickets WHERE channel_id = ?", (channel_id,)).fetchone()
+            return dict(row) if row else None
+        return await self.run(_query)
+    
+    async def update_ticket(self, channel_id, **changes):
+        """Update columns of a ticket. Returns False if it does not exist."""
+        columns = [column for column in changes if column in self.TICKET_COLUMNS[1:]]
+        if not columns:
+            return False
+        def _update(conn):
+            with conn:
+                cursor = conn.execute(
+                    f"UPDATE tickets SET {', '.join(f'{column} = ?' for column in columns)} WHERE channel_id = ?",
+                    tuple(changes[column] for column in columns) + (channel_id,)
+                )
+                return cursor.rowcount == 1
+        return await self.run(_update)
+    
+    async def get_tickets(self):
+        def _query(conn):
+            return [dict(row) for row in conn.execute("SELECT * FROM tickets").fetchall()]
+        return await self.run(_query)
+    
+    async def delete_ticket(self, channel_id):
+        def _delete(conn):
+            with conn:
+                return conn.execute("DELETE FROM tickets WHERE channel_id = ?", (channel_id,)).rowcount == 1
+        return await self.run(_delete)
+    
+    # Giveaways
+    async def put_giveaway(self, giveaway_id, giveaway):
+        data = {key: value for key, value in giveaway.items() if key != 'participants'}
+        def _put(conn):
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO giveaways (giveaway_id, guild_id, end_ts, ended, data) VALUES (?, ?, ?, 0, ?)",
+                    (giveaway_id, giveaway['guild_id'], giveaway['end_ts'], json.dumps(data, ensure_ascii=False))
+                )
+        await self.run(_put)
+    
+    async def get_open_giveaways(self):
+        """Return running giveaways (giveaway_id -> data) with their participants (user_id -> role ids or None)"""
+        def _query(conn):
+            giveaways = {}
+            for row in conn.execute("SELECT giveaway_id, data FROM giveaways WHERE ended = 0").fetchall():
+                giveaway = json.loads(row['data'])
+                giveaway['participants'] = {
+                    entry['user_id']: json.loads(entry['roles']) if entry['roles'] is not None else None
+                    for entry in conn.execute(
+                        "SELECT user_id, roles FROM giveaway_entries WHERE giveaway_id = ?", (row['giveaway_id'],)
+                    )
+                }
+                giveaways[row['giveaway_id']] = giveaway
+            return giveaways
+        return await self.run(_query)
+    
+    async def save_giveaway_result(self, giveaway_id, **result):
+        """Merge ``result`` (e.g. seed and winners) into a giveaway's data; it stays open"""
+        await self._update_giveaway(giveaway_id, result, ended=False)
+    
+    async def set_giveaway_ended(self, giveaway_id, **result):
+        """Mark a giveaway as ended and merge ``result`` into its data"""
+        await self._update_giveaway(giveaway_id, result, ended=True)
+    
+    async def _update_giveaway(self, giveaway_id, result, ended):
+        def _update(conn):
+            with conn:
+                row = conn.execute("SELECT data FROM giveaways WHERE giveaway_id = ?", (giveaway_id,)).fetchone()
+                data = json.loads(row['data']) if row else {}
+                data.update(result)
+                conn.execute(
+                    "UPDATE giveaways SET ended = MAX(ended, ?), data = ? WHERE giveaway_id = ?",
+                    (int(ended), json.dumps(data, ensure_ascii=False), giveaway_id)
+                )
+        await self.run(_update)
+    
+    async def add_giveaway_entries(self, giveaway_id, entries):
+        """Store entries (user_id -> role ids at entry time, None if unknown)"""
+        def _insert(conn):
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO giveaway_entries (giveaway_id, user_id, roles) VALUES (?, ?, ?)",
+                    [(giveaway_id, user_id, None if roles is None else json.dumps(roles))
+                     for user_id, roles in entries.items()]
+                )
+        await self.run(_insert)
+    
+    async def remove_giveaway_entries(self, giveaway_id, user_ids):
+        def _delete(conn):
+            with conn:
+                conn.executemany(
+                    "DELETE FROM giveaway_entries WHERE giveaway_id = ? AND user_id = ?",
+                    [(giveaway_id, user_id) for user_id in user_ids]
+                )
+        await self.run(_delete)
+    
+    # Meta values (small bookkeeping entries)
+    async def get_meta(self, key):
+        def _query(conn):
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            return row['value'] if row else None
+        return await self.run(_query)
+    
+    async def set_meta(self, key, value):
+        def _put(conn):
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+        await self.run(_put)
+    
+    # Backups
+    async def backup(self, target_path):
+        """Write a consistent copy of the database to ``target_path``"""
+        def _backup(conn):
+            target = sqlite3.connect(target_path)
+            try:
+                conn.backup(target)
+            finally:
+                target.close()
+        await self.run(_backup)
+
+ticket_db = TicketDatabase(DATABASE_PATH)
+atexit.register(ticket_db.close)
+
+# ========================================
+# OPEN TICKET REGISTRY
+# ========================================
+
+class OpenTicketRegistry:
+    """In-memory index of open tickets: guild -> user -> ticket channels.
+
+    Mirrors the tickets table so the per-user limit and the ticket counter
+    are dictionary lookups instead of scans over guild.channels.
+    """
+    def __init__(self, db):
+        self.db = db
+        self._by_user = {}    # guild_id -> user_id -> {channel_id: ticket_type}
+        self._owners = {}     # channel_id -> (guild_id, user_id)
+        self._counted = {}    # guild_id -> channel_ids shown in the ticket counter
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+    
+    @staticmethod
+    def _is_counted(ticket_type, stage):
+        # Same tickets the counter used to find in the Bestellung/Support/Paid categories
+        return ticket_type != "Shop" and stage != "finished"
+    
+    async def ready(self):
+        """Load the registry from the database on first use"""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if not self._loaded:
+                for ticket in await self.db.get_tickets():
+                    self._add(ticket)
+                self._loaded = True
+    
+    def _add(self, ticket):
+        channel_id, guild_id, user_id = ticket['channel_id'], ticket['guild_id'], ticket['user_id']
+        self._remove(channel_id)
+        self._by_user.setdefault(guild_id, {}).setdefault(user_id, {})[channel_id] = ticket.get('ticket_type')
+        self._owners[channel_id] = (guild_id, user_id)
+        self.set_stage(channel_id, ticket.get('stage', 'open'))
+    
+    def _remove(self, channel_id):
+        owner = self._owners.pop(channel_id, None)
+        if owner is None:
+            return False
+        guild_id, user_id = owner
+        user_tickets = self._by_user[guild_id][user_id]
+        user_tickets.pop(channel_id, None)
+        if not user_tickets:
+            del self._by_user[guild_id][user_id]
+        self._counted.get(guild_id, set()).discard(channel_id)
+        return True
+    
+    def __contains__(self, channel_id):
+        return channel_id in self._owners
+    
+    def set_stage(self, channel_id, stage):
+        owner = self._owners.get(channel_id)
+        if owner is None:
+            return
+        guild_id, user_id = owner
+        counted = self._counted.setdefault(guild_id, set())
+        if self._is_counted(self._by_user[guild_id][user_id][channel_id], stage):
+            counted.add(channel_id)
+        else:
+            counted.discard(channel_id)
+    
+    def user_tickets(self, guild_id, user_id, ticket_type=None):
+        """Channel ids of a user's open tickets, optionally of one type"""
+        tickets = self._by_user.get(guild_id, {}).get(user_id, {})
+        return [channel_id for channel_id, t in tickets.items() if ticket_type is None or t == ticket_type]
+    
+    def count_user_tickets(self, guild_id, user_id):
+        return len(self._by_user.get(guild_id, {}).get(user_id, ()))
+    
+    def open_count(self, guild_id):
+        return len(self._counted.get(guild_id, ()))
+    
+    def guild_ticket_ids(self, guild_id):
+        return [channel_id for user_tickets in self._by_user.get(guild_id, {}).values() for channel_id in user_tickets]
+    
+    # Write-through helpers keeping the database and the index in sync
+    async def open(self, ticket):
+        await self.ready()
+        await self.db.put_ticket(ticket)
+        self._add(ticket)
+    
+    async def update_stage(self, channel_id, stage):
+        await self.ready()
+        await self.db.update_ticket(channel_id, stage=stage)
+        self.set_stage(channel_id, stage)
+    
+    async def close(self, channel_id):
+        """Forget a ticket. Returns False if it was not registered."""
+        await self.ready()
+        removed = self._remove(channel_id)
+        if removed:
+            await self.db.delete_ticket(channel_id)
+        return removed
+
+open_tickets = OpenTicketRegistry(ticket_db)
+metrics.gauge('ticketbot_open_tickets', 'Open tickets per guild',
+              lambda: [({'guild': guild.id}, open_tickets.open_count(guild.id)) for guild in list(bot.guilds)])
 
 # Preis-Datenbank - Standard-Preise
 default_preise = {
@@ -99,111 +1476,222 @@ default_preise = {
 # Lade Preise aus Datei oder verwende Standard-Preise
 def load_prices():
     try:
-        with open('prices.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_json_file('prices.json')
     except FileNotFoundError:
         return default_preise.copy()
 
 # Speichere Preise in Datei
 def save_prices(prices):
-    with open('prices.json', 'w', encoding='utf-8') as f:
-        json.dump(prices, f, ensure_ascii=False, indent=2)
+    write_json_file('prices.json', prices)
 
 preise = load_prices()
 
 # Berechtigung-Check (nur Server-Admins oder bestimmte Rollen können Preise bearbeiten)
+AUTHORIZED_ROLES = ("Admin", "Moderator", "Haze Visuals Team", "Management", "HV | Leitung")  # Anpassbar
+
 def is_authorized(user, guild):
-    print(f"🔍 Berechtigungs-Check für {user} in Guild: {guild}")
-    
+    # Debug records use lazy %-arguments - nothing is formatted unless DEBUG is enabled
     if guild is None:
-        print("❌ Guild ist None")
+        admin_logger.debug("❌ Berechtigungs-Check für %s: Guild ist None", user)
         return False
     
     member = guild.get_member(user.id)
-    print(f"🔍 Member gefunden: {member}")
-    
     if member is None:
-        print("❌ Member ist None")
+        admin_logger.debug("❌ Berechtigungs-Check für %s in %s: Member ist None", user, guild)
         return False
     
     # Prüfe ob der User Administrator-Rechte hat
-    admin_perms = member.guild_permissions.administrator
-    print(f"🔍 Administrator-Berechtigung: {admin_perms}")
-    
-    if admin_perms:
-        print("✅ User ist Administrator - Zugriff gewährt")
+    if member.guild_permissions.administrator:
+        admin_logger.debug("✅ %s ist Administrator - Zugriff gewährt", user)
         return True
     
     # Prüfe ob der User eine der erlaubten Rollen hat
-    authorized_roles = ["Admin", "Moderator", "Haze Visuals Team", "Management", "HV | Leitung"]  # Anpassbar
-    user_roles = [role.name for role in member.roles]
-    print(f"🔍 User Rollen: {user_roles}")
-    print(f"🔍 Erlaubte Rollen: {authorized_roles}")
-    
     for role in member.roles:
-        if role.name in authorized_roles:
-            print(f"✅ User hat erlaubte Rolle '{role.name}' - Zugriff gewährt")
+        if role.name in AUTHORIZED_ROLES:
+            admin_logger.debug("✅ %s hat erlaubte Rolle '%s' - Zugriff gewährt", user, role.name)
             return True
     
-    print("❌ User hat keine Berechtigung")
+    if admin_logger.isEnabledFor(logging.DEBUG):
+        admin_logger.debug("❌ %s hat keine Berechtigung (Rollen: %s)", user, [role.name for role in member.roles])
     return False
 
+# ========================================
+# SLASH COMMAND SYNC
+# ========================================
+
+COMMAND_SYNC_CONCURRENCY = int(os.getenv('COMMAND_SYNC_CONCURRENCY', '4'))
+FORCE_COMMAND_SYNC = os.getenv('FORCE_COMMAND_SYNC', '').lower() in ('1', 'true', 'yes')
+
+def command_tree_hash(guild=None):
+    """Hash of the command payload Discord would receive for a guild (or globally)"""
+    payload = [command.to_dict(bot.tree) for command in bot.tree.get_commands(guild=guild)]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+async def sync_command_scope(guild, semaphore):
+    """Sync one guild (or the global scope) unless its payload is unchanged. Returns the status."""
+    scope = str(guild.id) if guild else "global"
+    meta_key = f"command_sync:{bot.application_id}:{scope}"
+    payload_hash = command_tree_hash(guild)
+    if not FORCE_COMMAND_SYNC and await ticket_db.get_meta(meta_key) == payload_hash:
+        return "unchanged"
+    
+    async with semaphore:
+        try:
+            synced = await bot.tree.sync(guild=guild)
+        except Exception as e:
+            commands_logger.error(f"      ❌ Fehler beim Sync für {guild.name if guild else 'global'}: {e}")
+            return "failed"
+    
+    await ticket_db.set_meta(meta_key, payload_hash)
+    if guild:
+        commands_logger.info(f"      ✅ {len(synced)} Commands für Server {guild.name} synchronisiert")
+    else:
+        commands_logger.info(f"✅ {len(synced)} Globale Slash Commands synchronisiert")
+        for cmd in synced:
+            commands_logger.info(f"   - /{cmd.name}: {cmd.description}")
+    return "synced"
+
+async def sync_application_commands():
+    """Sync slash commands once per process, skipping scopes whose payload did not change"""
+    await bot.wait_until_ready()
+    started = time.monotonic()
+    
+    # Alle Commands sind global - guild-spezifische Commands werden entfernt
+    for guild in bot.guilds:
+        bot.tree.clear_commands(guild=guild)
+    
+    semaphore = asyncio.Semaphore(COMMAND_SYNC_CONCURRENCY)
+    results = await asyncio.gather(
+        sync_command_scope(None, semaphore),
+        *(sync_command_scope(guild, semaphore) for guild in bot.guilds)
+    )
+    summary = collections.Counter(results)
+    commands_logger.info(f"🔄 Command-Sync fertig in {time.monotonic() - started:.1f}s: "
+          f"{summary['synced']} synchronisiert, {summary['unchanged']} unverändert, {summary['failed']} fehlgeschlagen")
+
+# ========================================
+# STARTUP ORCHESTRATION
+# ========================================
+
+PROCESS_START_TIME = time.monotonic()
+STARTUP_CONCURRENCY = int(os.getenv('STARTUP_CONCURRENCY', '8'))
+
+class StartupOrchestrator:
+    """Runs the per-guild initialization after on_ready concurrently.
+
+    Steps registered with ``step`` run in order for each guild; guilds run
+    in parallel under a concurrency limit. Timings are kept for diagnostics.
+    """
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+        self.steps = []
+        self.guild_timings = {}   # guild_id -> seconds for all steps
+        self.failures = {}        # guild_id -> "step: error"
+        self.ready_time = None    # seconds from process start until the first run finished
+        self.last_run_time = None
+        self._running = False
+    
+    def step(self, fn):
+        """Register ``fn(guild)`` as a per-guild startup step"""
+        self.steps.append(fn)
+        return fn
+    
+    async def _init_guild(self, guild, semaphore):
+        bind_log_context(guild=guild.id)  # own task per guild (gather)
+        async with semaphore:
+            started = time.monotonic()
+            for step in self.steps:
+                try:
+                    await step(guild)
+                except Exception as e:
+                    self.failures[guild.id] = f"{step.__name__}: {e}"
+                    logger.error(f"❌ Startup-Schritt {step.__name__} für {guild.name} fehlgeschlagen: {e}")
+            self.guild_timings[guild.id] = time.monotonic() - started
+            metrics.observe('ticketbot_background_task_seconds', self.guild_timings[guild.id], task='startup_guild')
+    
+    async def run(self, guilds):
+        if self._running:
+            logger.warning("⚠️ Server-Initialisierung läuft bereits - übersprungen")
+            return
+        self._running = True
+        started = time.monotonic()
+        try:
+            # Load the ticket registry first so ticket buttons answer immediately
+            await open_tickets.ready()
+            semaphore = asyncio.Semaphore(self.concurrency)
+            await asyncio.gather(*(self._init_guild(guild, semaphore) for guild in guilds))
+        finally:
+            self._running = False
+        
+        self.last_run_time = time.monotonic() - started
+        if self.ready_time is None:
+            self.ready_time = time.monotonic() - PROCESS_START_TIME
+        slowest = max(self.guild_timings.items(), key=lambda item: item[1], default=None)
+        logger.info(f"🚀 {len(guilds)} Server in {self.last_run_time:.1f}s initialisiert "
+              f"(bereit {self.ready_time:.1f}s nach Prozessstart"
+              + (f", langsamster Server {slowest[0]}: {slowest[1]:.1f}s)" if slowest else ")"))
+
+startup = StartupOrchestrator(STARTUP_CONCURRENCY)
+
+@startup.step
+async def prune_deleted_ticket_channels_step(guild):
+    await prune_deleted_ticket_channels(guild)
+
+@startup.step
+async def seed_member_counter_step(guild):
+    if not guild.chunked:
+        await guild.chunk()
+    member_counter.seed(guild)
+
+@startup.step
+async def ensure_counter_channels_step(guild):
+    await ensure_ticket_counter_channel_exists(guild)
+    await ensure_member_counter_channel_exists(guild)
+
+@startup.step
+async def publish_calendar_step(guild):
+    if guild.get_channel(LEGACY_CALENDAR_CHANNEL_ID):
+        # Appointments from before the per-guild partitioning belong to the original server
+        adopted = await ticket_db.adopt_legacy_appointments(guild.id)
+        if adopted:
+            appointment_slots.invalidate(guild.id)
+            calendar_logger.info(f"📅 {adopted} bestehende Termine {guild.name} zugeordnet")
+    await calendar_publisher.publish(guild, force=True)
+
 # Event: Bot startet
 @bot.event
 async def on_ready():
-    print(f"✅ Eingeloggt als {bot.user}")
-    print(f"📊 Bot ist in {len(bot.guilds)} Server(n)")
+    logger.info(f"✅ Eingeloggt als {bot.user}")
+    logger.info(f"📊 Bot ist in {len(bot.guilds)} Server(n)")
     
     # Liste alle Server auf
     for guild in bot.guilds:
-        print(f"   📋 Server: {guild.name} (ID: {guild.id}) - {guild.member_count} Mitglieder")
+        logger.info(f"   📋 Server: {guild.name} (ID: {guild.id}) - {guild.member_count} Mitglieder")
         
         # Überprüfe Bot-Berechtigungen in diesem Server
         bot_member = guild.get_member(bot.user.id)
         if bot_member:
             perms = bot_member.guild_permissions
-            print(f"      🔑 Berechtigungen: use_application_commands={perms.use_application_commands}, send_messages={perms.send_messages}")
-        
-        # Versuche guild-spezifische Synchronisation (aggressiver)
-        try:
-            # Clear guild commands first to prevent conflicts
-            bot.tree.clear_commands(guild=guild)
-            synced_guild = await bot.tree.sync(guild=guild)
-            print(f"      ✅ {len(synced_guild)} Commands für Server {guild.name} synchronisiert")
-        except Exception as e:
-            print(f"      ❌ Fehler beim Server-Sync für {guild.name}: {e}")
+            logger.info(f"      🔑 Berechtigungen: use_application_commands={perms.use_application_commands}, send_messages={perms.send_messages}")
     
-    # Globale Synchronisation (aggressiver)
-    try:
-        # Force a clean sync
-        synced = await bot.tree.sync()
-        print(f"✅ {len(synced)} Globale Slash Commands synchronisiert")
-        for cmd in synced:
-            print(f"   - /{cmd.name}: {cmd.description}")
-    except Exception as e:
-        print(f"❌ Fehler beim globalen Synchronisieren: {e}")
-        # Try backup sync
-        try:
-            bot.tree.clear_commands(guild=None)
-            synced = await bot.tree.sync()
-            print(f"✅ Backup-Sync erfolgreich: {len(synced)} Commands")
-        except Exception as backup_error:
-            print(f"❌ Backup-Sync fehlgeschlagen: {backup_error}")
-    
-    # Start the background task after bot is ready
-    if not check_tickets_task.is_running():
-        check_tickets_task.start()
-        print("🔄 Ticket-Überwachung gestartet")
+    # Start the ticket ping scheduler and the giveaway timer after bot is ready
+    ticket_pings.start()
+    giveaways.start()
     
     # Start the calendar and cleanup tasks
     if not weekly_calendar_update.is_running():
         weekly_calendar_update.start()
-        print("📅 Kalender-System gestartet")
+        logger.info("📅 Kalender-System gestartet")
     
-    # Ensure ticket counter channel exists for each guild
-    for guild in bot.guilds:
-        await ensure_ticket_counter_channel_exists(guild)
-        await ensure_member_counter_channel_exists(guild)
+    if not reconcile_member_counters.is_running():
+        reconcile_member_counters.start()
+    
+    if not check_for_updates.is_running():
+        check_for_updates.start()
+        logger.info(f"🚀 Auto-Update System gestartet (Version {BOT_VERSION})")
+    
+    # Ensure ticket counter channel exists for each guild (concurrently)
+    await startup.run(bot.guilds)
 
 @bot.event
 async def on_message(message):
@@ -237,35 +1725,48 @@ async def on_message(message):
                         embed.set_footer(text="Haze Visuals • Banner System")
                         
                         await message.reply(embed=embed)
-                        print(f"🖼️ Banner updated for guild {message.guild.name} by {message.author}: {attachment.url}")
+                        logger.info(f"🖼️ Banner updated for guild {message.guild.name} by {message.author}: {attachment.url}")
                         return  # Only process first image
                         
                     except Exception as e:
-                        print(f"❌ Error setting banner: {e}")
+                        logger.error(f"❌ Error setting banner: {e}")
                         await message.reply("❌ Fehler beim Setzen des Banners. Bitte versuche es erneut.")
     
     # Process commands
     await bot.process_commands(message)
-    
-    # Clear any cached interactions to prevent "interaction failed" errors
-    print("🔄 Bot bereit - Interaktionen wurden aktualisiert")
-    
-    # Start auto-update checking
-    check_for_updates.start()
-    print(f"🚀 Auto-Update System gestartet (Version {BOT_VERSION})")
+
+# Keep the open ticket registry in sync when ticket channels are deleted
+@bot.event
+async def on_guild_channel_delete(channel):
+    await ticket_pings.forget([channel.id])
+    if await open_tickets.close(channel.id):
+        logger.info(f"🗑️ Ticket-Kanal {channel.name} gelöscht - aus der Ticket-Übersicht entfernt")
+        await update_ticket_counter_channel(channel.guild)
+
+async def prune_deleted_ticket_channels(guild):
+    """Remove tickets whose channel was deleted while the bot was offline"""
+    await open_tickets.ready()
+    removed = 0
+    for channel_id in open_tickets.guild_ticket_ids(guild.id):
+        if guild.get_channel(channel_id) is None:
+            await open_tickets.close(channel_id)
+            await ticket_pings.forget([channel_id])
+            removed += 1
+    if removed:
+        tickets_logger.info(f"🗑️ {removed} verwaiste Ticket(s) in {guild.name} entfernt")
 
 # Add error handler for interaction failures
 @bot.event
 async def on_error(event, *args, **kwargs):
     """Handle errors gracefully"""
     import traceback
-    print(f"❌ Bot Error in {event}: {traceback.format_exc()}")
+    logger.error(f"❌ Bot Error in {event}: {traceback.format_exc()}")
 
 # Handle interaction errors specifically
 @bot.tree.error
 async def on_app_command_error(interaction: discord.Interaction, error: discord.app_commands.AppCommandError):
     """Handle application command errors"""
-    print(f"❌ Command Error: {error}")
+    commands_logger.error(f"❌ Command Error: {error}")
     if not interaction.response.is_done():
         try:
             await interaction.response.send_message("❌ Ein Fehler ist aufgetreten. Bitte versuche es erneut.", ephemeral=True)
@@ -276,6 +1777,9 @@ async def on_app_command_error(interaction: discord.Interaction, error: discord.
 @bot.event
 async def on_member_join(member):
     """Send welcome message when user joins"""
+    member_counter.member_joined(member)
+    await update_member_counter_channel(member.guild)
+    
     try:
         config = get_server_config(member.guild.id)
         
@@ -289,18 +1793,18 @@ async def on_member_join(member):
             if welcome_channel:
                 welcome_msg = f"Willkommen {member.mention} auf Haze Visuals. Viel Spaß !"
                 await welcome_channel.send(welcome_msg)
-                print(f"👋 Welcome message sent for {member}")
-        
-        # Update member counter
-        await update_member_counter_channel(member.guild)
+                counters_logger.info(f"👋 Welcome message sent for {member}")
         
     except Exception as e:
-        print(f"❌ Error sending welcome message: {e}")
+        counters_logger.error(f"❌ Error sending welcome message: {e}")
 
 # Leave message when user leaves
 @bot.event
 async def on_member_remove(member):
     """Send leave message when user leaves"""
+    member_counter.member_left(member)
+    await update_member_counter_channel(member.guild)
+    
     try:
         config = get_server_config(member.guild.id)
         
@@ -314,24 +1818,21 @@ async def on_member_remove(member):
             if leave_channel:
                 leave_msg = f"{member.name} hat uns verlassen"
                 await leave_channel.send(leave_msg)
-                print(f"👋 Leave message sent for {member}")
-        
-        # Update member counter
-        await update_member_counter_channel(member.guild)
+                counters_logger.info(f"👋 Leave message sent for {member}")
         
     except Exception as e:
-        print(f"❌ Error sending leave message: {e}")
+        counters_logger.error(f"❌ Error sending leave message: {e}")
 
 # Test command with prefix (for debugging)
 @bot.command(name="test")
 async def test_cmd(ctx):
-    print(f"📌 Test command verwendet von {ctx.author} in {ctx.guild.name if ctx.guild else 'DM'}")
+    commands_logger.info(f"📌 Test command verwendet von {ctx.author} in {ctx.guild.name if ctx.guild else 'DM'}")
     await ctx.send("✅ Bot funktioniert! Versuche `/preise` zu verwenden.")
 
 # Debug command to check bot status
 @bot.command(name="debug")
 async def debug_cmd(ctx):
-    print(f"📌 Debug command verwendet von {ctx.author}")
+    commands_logger.info(f"📌 Debug command verwendet von {ctx.author}")
     embed = discord.Embed(title="🔍 Bot Debug Info", color=0x00ff00)
     embed.add_field(name="Bot User", value=f"{bot.user.name}", inline=False)
     embed.add_field(name="Server", value=ctx.guild.name if ctx.guild else "DM", inline=False)
@@ -367,7 +1868,7 @@ class PriceEditModal(Modal):
         preise[self.category_name] = self.price_input.value
         save_prices(preise)
         
-        print(f"📝 Preise für {self.category_name} geändert von {interaction.user}")
+        payments_logger.info(f"📝 Preise für {self.category_name} geändert von {interaction.user}")
         await interaction.response.send_message(
             f"✅ Preise für **{self.category_name}** wurden erfolgreich aktualisiert!", 
             ephemeral=True
@@ -376,11 +1877,10 @@ class PriceEditModal(Modal):
 # Slash Command: /edit_preise
 @bot.tree.command(name="edit_preise", description="Bearbeite die Preisliste (nur für autorisierte Benutzer)")
 async def edit_preise_cmd(interaction: discord.Interaction):
-    print(f"📝 /edit_preise command verwendet von {interaction.user}")
+    payments_logger.info(f"📝 /edit_preise command verwendet von {interaction.user}")
     
     # Vereinfachte Berechtigung-Prüfung: Nur Administratoren dürfen bearbeiten
-    print(f"🔍 User: {interaction.user}, Guild: {interaction.guild}")
-    print(f"🔍 User Guild Permissions: {interaction.user.guild_permissions}")
+    payments_logger.debug("🔍 User: %s, Guild: %s", interaction.user, interaction.guild)
     
     if not interaction.user.guild_permissions.administrator:
         await interaction.response.send_message(
@@ -389,7 +1889,7 @@ async def edit_preise_cmd(interaction: discord.Interaction):
         )
         return
     
-    print(f"✅ Administrator {interaction.user} darf Preise bearbeiten")
+    payments_logger.info(f"✅ Administrator {interaction.user} darf Preise bearbeiten")
     
     # Erstelle erweiterte Edit-View
     view = EditMainView(interaction.guild.id)
@@ -403,7 +1903,7 @@ async def edit_preise_cmd(interaction: discord.Interaction):
 # Slash Command: /clear
 @bot.tree.command(name="clear", description="Lösche eine bestimmte Anzahl von Nachrichten (nur für Administratoren)")
 async def clear_cmd(interaction: discord.Interaction, amount: int):
-    print(f"🗑️ /clear command verwendet von {interaction.user} für {amount} Nachrichten")
+    commands_logger.info(f"🗑️ /clear command verwendet von {interaction.user} für {amount} Nachrichten")
     
     # Prüfe ob der User Administrator-Rechte hat
     if not interaction.user.guild_permissions.administrator:
@@ -440,7 +1940,7 @@ async def clear_cmd(interaction: discord.Interaction, amount: int):
         # Dann Nachrichten löschen
         deleted = await interaction.channel.purge(limit=amount)
         
-        print(f"✅ {len(deleted)} Nachrichten gelöscht von {interaction.user}")
+        commands_logger.info(f"✅ {len(deleted)} Nachrichten gelöscht von {interaction.user}")
         
         # Erfolgreiche Löschung bestätigen
         await interaction.followup.send(
@@ -472,7 +1972,7 @@ async def clear_cmd(interaction: discord.Interaction, amount: int):
                 ephemeral=True
             )
     except Exception as e:
-        print(f"❌ Unerwarteter Fehler bei /clear: {e}")
+        commands_logger.error(f"❌ Unerwarteter Fehler bei /clear: {e}")
         try:
             await interaction.response.send_message(
                 "❌ Ein unerwarteter Fehler ist aufgetreten.", 
@@ -485,6 +1985,90 @@ async def clear_cmd(interaction: discord.Interaction, amount: int):
             )
 
 
+# ========================================
+# PERSISTENTE TICKET-VIEWS
+# ========================================
+
+# custom_id-Präfix -> View-Klasse, ausgewertet von on_interaction
+TICKET_VIEW_ROUTES = {}
+
+def register_ticket_view(view_class):
+    """Registriere eine Ticket-View für das custom_id-Routing"""
+    TICKET_VIEW_ROUTES[view_class.prefix] = view_class
+    return view_class
+
+class TicketStageView(View):
+    """Persistente View für eine Ticket-Phase.
+
+    Die custom_ids haben das Format ``<prefix>_<aktion>_<channel_id>``. Der
+    Zustand kommt beim Klick aus der Ticket-Datenbank, daher funktionieren
+    die Buttons auch nach einem Neustart.
+    """
+    prefix = ""
+    buttons = ()  # (aktion, label, style)
+    handlers = {}  # aktion -> async handler(interaction, ticket)
+    owner_only = None  # Fehlermeldung, wenn nur der Ticket-Ersteller klicken darf
+    
+    def __init__(self, channel_id):
+        super().__init__(timeout=None)
+        for action, label, style in self.buttons:
+            self.add_item(Button(label=label, style=style, custom_id=f"{self.prefix}_{action}_{channel_id}"))
+    
+    def is_dispatchable(self):
+        # Klicks laufen über on_interaction - discord.py muss keine Kopie pro Nachricht behalten
+        return False
+    
+    @classmethod
+    async def dispatch(cls, interaction, action, ticket):
+        handler = cls.handlers.get(action)
+        if handler is None:
+            tickets_logger.warning(f"⚠️ Unbekannte Aktion '{action}' für {cls.__name__} (Ticket {ticket['channel_id']})")
+            await interaction.response.send_message("❌ Dieser Button wird nicht mehr unterstützt.", ephemeral=True)
+            return
+        if cls.owner_only and interaction.user.id != ticket['user_id']:
+            await interaction.response.send_message(cls.owner_only, ephemeral=True)
+            return
+        await handler(interaction, ticket)
+
+async def dispatch_ticket_view(interaction, custom_id):
+    """Leite einen Klick auf eine persistente Ticket-View an ihren Handler weiter"""
+    prefix, _, rest = custom_id.partition("_")
+    action, _, channel_id = rest.rpartition("_")
+    view_class = TICKET_VIEW_ROUTES.get(prefix)
+    if view_class is None or not channel_id.isdigit():
+        return False
+    
+    ticket = await ticket_db.get_ticket(int(channel_id))
+    if ticket is None:
+        await interaction.response.send_message("❌ Dieses Ticket ist nicht mehr im System gespeichert.", ephemeral=True)
+        return True
+    
+    await view_class.dispatch(interaction, action, ticket)
+    return True
+
+async def resolve_member(guild, user_id):
+    """Hole ein Mitglied (Cache, sonst API). None wenn es den Server verlassen hat."""
+    member = guild.get_member(user_id)
+    if member is None:
+        try:
+            member = await guild.fetch_member(user_id)
+        except discord.HTTPException:
+            member = None
+    return member
+
+async def resolve_ticket_member(guild, ticket):
+    """Hole den Ticket-Ersteller (Cache, sonst API). None wenn er den Server verlassen hat."""
+    return await resolve_member(guild, ticket['user_id'])
+
+async def resolve_ticket_channel(interaction, ticket):
+    return interaction.guild.get_channel(ticket['channel_id']) or interaction.channel
+
+def customer_step(step):
+    """Handler für Kunden-Schritte mit der Signatur step(ticket_channel, user, interaction)"""
+    async def handler(interaction, ticket):
+        await step(await resolve_ticket_channel(interaction, ticket), interaction.user, interaction)
+    return handler
+
 # Review Modal
 class ReviewModal(Modal):
     def __init__(self, user, rating):
@@ -527,9 +2111,9 @@ async def post_review(interaction: discord.Interaction, user, rating, review_tex
     embed.set_footer(text=f"Haze Visuals • {datetime.now().strftime('%d.%m.%Y %H:%M')}")
     embed.set_thumbnail(url=user.avatar.url if user.avatar else user.default_avatar.url)
     
-    await review_channel.send(embed=embed)
     await interaction.response.send_message("✅ Vielen Dank für deine Bewertung!", ephemeral=True)
-    print(f"📝 Review gepostet: {user} - {rating} Sterne")
+    await review_channel.send(embed=embed)
+    tickets_logger.info(f"📝 Review gepostet: {user} - {rating} Sterne")
     
     # Log review submission
     ticket_channel = interaction.channel
@@ -549,18 +2133,19 @@ async def post_review(interaction: discord.Interaction, user, rating, review_tex
         await ticket_channel.send(embed=final_embed)
         
         # Free up any appointments associated with this ticket before closing
-        freed_appointments = await free_ticket_appointments(ticket_channel.name)
+        freed_appointments = await free_ticket_appointments(ticket_channel.guild.id, ticket_channel.name)
         if freed_appointments > 0:
-            print(f"📅 {freed_appointments} Termin(e) für {ticket_channel.name} nach Review automatisch freigegeben")
+            tickets_logger.info(f"📅 {freed_appointments} Termin(e) für {ticket_channel.name} nach Review automatisch freigegeben")
         
         # Delete the ticket channel after a short delay
         import asyncio
         await asyncio.sleep(3)  # 3 second delay so user can see the final message
         await ticket_channel.delete(reason=f"Ticket automatisch geschlossen nach Review von {user}")
-        print(f"🔒 Ticket {ticket_channel.name} automatisch geschlossen nach Review")
+        await open_tickets.close(ticket_channel.id)
+        tickets_logger.info(f"🔒 Ticket {ticket_channel.name} automatisch geschlossen nach Review")
         
     except Exception as e:
-        print(f"❌ Fehler beim automatischen Schließen des Tickets: {e}")
+        tickets_logger.error(f"❌ Fehler beim automatischen Schließen des Tickets: {e}")
 
 # New clothing order system
 async def start_clothing_selection(ticket_channel, user):
@@ -572,42 +2157,17 @@ async def start_clothing_selection(ticket_channel, user):
         )
         
         # Clothing type selection buttons
-        clothing_view = View(timeout=None)
-        options = [
-            ("🎨 Custom", "custom"),
-            ("✅ Finished", "finished"), 
-            ("❓ Fragen", "fragen")
-        ]
-        
-        def create_option_callback(option_type):
-            async def option_callback(option_interaction):
-                if option_interaction.user != user:
-                    await option_interaction.response.send_message("❌ Nur der Ticket-Ersteller kann antworten.", ephemeral=True)
-                    return
-                
-                if option_type == "custom":
-                    await start_custom_order(ticket_channel, user, option_interaction)
-                elif option_type == "finished":
-                    await show_finished_info(ticket_channel, user, option_interaction)
-                elif option_type == "fragen":
-                    await show_questions_info(ticket_channel, user, option_interaction)
-            return option_callback
-        
-        for label, option_type in options:
-            button = Button(label=label, style=discord.ButtonStyle.primary)
-            button.callback = create_option_callback(option_type)
-            clothing_view.add_item(button)
+        clothing_view = ClothingOptionsView(ticket_channel.id)
         
         # Try to send with banner, fall back to without if it fails
         try:
-            banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-            await ticket_channel.send(embed=embed, view=clothing_view, file=banner_file)
+            await ticket_channel.send(embed=embed, view=clothing_view, **await banner_attachment(ticket_channel.guild, embed))
         except Exception as banner_error:
-            print(f"⚠️ Banner loading failed, sending without banner: {banner_error}")
+            tickets_logger.warning(f"⚠️ Banner loading failed, sending without banner: {banner_error}")
             await ticket_channel.send(embed=embed, view=clothing_view)
             
     except Exception as e:
-        print(f"❌ Error in start_clothing_selection: {e}")
+        tickets_logger.error(f"❌ Error in start_clothing_selection: {e}")
         # Fallback simple message
         simple_embed = discord.Embed(
             title="👕 Clothing Bestellung",
@@ -670,31 +2230,10 @@ async def show_finished_info(ticket_channel, user, interaction):
         color=0x2ecc71
     )
     
-    finished_view = View(timeout=None)
-    finished_options = [
-        ("📦 Fertige Pakete", "finished_packages"),
-        ("🛠️ Support", "finished_support")
-    ]
+    finished_view = FinishedOptionsView(ticket_channel.id)
     
-    def create_finished_callback(option_type):
-        async def finished_callback(finished_interaction):
-            if finished_interaction.user != user:
-                await finished_interaction.response.send_message("❌ Nur der Ticket-Ersteller kann antworten.", ephemeral=True)
-                return
-            
-            if option_type == "finished_packages":
-                await start_finished_package_order(ticket_channel, user, finished_interaction)
-            elif option_type == "finished_support":
-                await show_finished_support_info(ticket_channel, user, finished_interaction)
-        return finished_callback
-    
-    for label, option_type in finished_options:
-        button = Button(label=label, style=discord.ButtonStyle.primary)
-        button.callback = create_finished_callback(option_type)
-        finished_view.add_item(button)
-    
-    await ticket_channel.send(embed=embed, view=finished_view)
     await interaction.response.send_message("✅ Optionen angezeigt!", ephemeral=True)
+    await ticket_channel.send(embed=embed, view=finished_view)
 
 async def show_questions_info(ticket_channel, user, interaction):
     embed = discord.Embed(
@@ -703,8 +2242,8 @@ async def show_questions_info(ticket_channel, user, interaction):
         color=0xe67e22
     )
     
-    await ticket_channel.send(embed=embed)
     await interaction.response.send_message("✅ Anfrage gesendet!", ephemeral=True)
+    await ticket_channel.send(embed=embed)
 
 # Finished Package Modal for collecting faction and package choice
 class FinishedPackageModal(Modal):
@@ -751,8 +2290,38 @@ async def show_finished_support_info(ticket_channel, user, interaction):
         color=0xe67e22
     )
     
-    await ticket_channel.send(embed=embed)
     await interaction.response.send_message("✅ Support-Anfrage gesendet!", ephemeral=True)
+    await ticket_channel.send(embed=embed)
+
+@register_ticket_view
+class ClothingOptionsView(TicketStageView):
+    """Custom / Finished / Fragen Auswahl in Bestell-Tickets"""
+    prefix = "ticketorder"
+    buttons = (
+        ("custom", "🎨 Custom", discord.ButtonStyle.primary),
+        ("finished", "✅ Finished", discord.ButtonStyle.primary),
+        ("fragen", "❓ Fragen", discord.ButtonStyle.primary),
+    )
+    handlers = {
+        "custom": customer_step(start_custom_order),
+        "finished": customer_step(show_finished_info),
+        "fragen": customer_step(show_questions_info),
+    }
+    owner_only = "❌ Nur der Ticket-Ersteller kann antworten."
+
+@register_ticket_view
+class FinishedOptionsView(TicketStageView):
+    """Fertige Pakete / Support Auswahl nach Finished"""
+    prefix = "ticketfinished"
+    buttons = (
+        ("packages", "📦 Fertige Pakete", discord.ButtonStyle.primary),
+        ("support", "🛠️ Support", discord.ButtonStyle.primary),
+    )
+    handlers = {
+        "packages": customer_step(start_finished_package_order),
+        "support": customer_step(show_finished_support_info),
+    }
+    owner_only = "❌ Nur der Ticket-Ersteller kann antworten."
 
 async def show_finished_package_selection(ticket_channel, user, order_data):
     embed = discord.Embed(
@@ -834,28 +2403,25 @@ class DiscountCodeModal(Modal):
         self.add_item(self.discount_code)
     
     async def on_submit(self, interaction: discord.Interaction):
-        # Load discount codes from JSON file
-        valid_codes = load_discount_codes()
-        
         # Check if code was entered
         if not self.discount_code.value.strip():
             # No code entered, continue without discount
             self.order_data['discount'] = 0
             self.order_data['discount_text'] = ""
-            await interaction.response.send_message("✅ Weiter ohne Code!", ephemeral=True)
-            await show_delivery_options(self.ticket_channel, self.user, self.order_data)
+            await show_delivery_options(self.ticket_channel, self.user, self.order_data, interaction)
             return
         
         # Check if code is valid
-        if self.discount_code.value.upper() in valid_codes:
-            discount = valid_codes[self.discount_code.value.upper()]
+        result = await discount_redemptions.redeem(self.discount_code.value.upper(), self.user.id)
+        if result['status'] == 'redeemed':
+            code_data = result['code_data']
+            discount = code_data.get("value", 0) if code_data.get("type", "percentage") == "percentage" else 0
             discount_text = f"\n✅ **Discount Code:** {self.discount_code.value.upper()} (-{int(discount*100)}%)"
             
             self.order_data['discount'] = discount
             self.order_data['discount_text'] = discount_text
             
-            await interaction.response.send_message("✅ Code erfolgreich angewendet!", ephemeral=True)
-            await show_delivery_options(self.ticket_channel, self.user, self.order_data)
+            await show_delivery_options(self.ticket_channel, self.user, self.order_data, interaction)
         else:
             # Invalid code - give options
             await show_invalid_code_options(self.ticket_channel, self.user, self.order_data, self.discount_code.value, interaction)
@@ -894,16 +2460,15 @@ async def show_invalid_code_options(ticket_channel, user, order_data, invalid_co
         order_data['discount'] = 0
         order_data['discount_text'] = ""
         
-        await continue_interaction.response.send_message("✅ Ohne Discount Code fortfahren!", ephemeral=True)
-        await show_delivery_options(ticket_channel, user, order_data)
+        await show_delivery_options(ticket_channel, user, order_data, continue_interaction)
     
     continue_button.callback = continue_callback
     
     options_view.add_item(retry_button)
     options_view.add_item(continue_button)
     
-    await ticket_channel.send(embed=embed, view=options_view)
     await interaction.response.send_message("❌ Code ungültig - wähle eine Option!", ephemeral=True)
+    await ticket_channel.send(embed=embed, view=options_view)
 
 # Show discount choice - optional selection
 async def show_discount_choice(ticket_channel, user, order_data, interaction):
@@ -943,16 +2508,15 @@ async def show_discount_choice(ticket_channel, user, order_data, interaction):
         order_data['discount'] = 0
         order_data['discount_text'] = ""
         
-        await skip_interaction.response.send_message("✅ Weiter ohne Code!", ephemeral=True)
-        await show_delivery_options(ticket_channel, user, order_data)
+        await show_delivery_options(ticket_channel, user, order_data, skip_interaction)
     
     skip_code_button.callback = skip_code_callback
     
     choice_view.add_item(use_code_button)
     choice_view.add_item(skip_code_button)
     
-    await ticket_channel.send(embed=embed, view=choice_view)
     await interaction.response.send_message("✅ Produkt ausgewählt!", ephemeral=True)
+    await ticket_channel.send(embed=embed, view=choice_view)
 
 # Show discount code input modal (when user chooses to use a code)
 async def show_discount_input(ticket_channel, user, order_data, interaction):
@@ -994,19 +2558,18 @@ async def show_invalid_code_options(ticket_channel, user, order_data, invalid_co
         order_data['discount'] = 0
         order_data['discount_text'] = ""
         
-        await continue_interaction.response.send_message("✅ Weiter ohne Discount Code!", ephemeral=True)
-        await show_delivery_options(ticket_channel, user, order_data)
+        await show_delivery_options(ticket_channel, user, order_data, continue_interaction)
     
     continue_button.callback = continue_callback
     
     invalid_code_view.add_item(try_again_button)
     invalid_code_view.add_item(continue_button)
     
-    await ticket_channel.send(embed=embed, view=invalid_code_view)
     await interaction.response.send_message("❌ Code ungültig - bitte wähle eine Option!", ephemeral=True)
+    await ticket_channel.send(embed=embed, view=invalid_code_view)
 
 # Delivery options selection
-async def show_delivery_options(ticket_channel, user, order_data):
+async def show_delivery_options(ticket_channel, user, order_data, interaction):
     base_price = order_data['base_price']
     discount = order_data.get('discount', 0)
     discounted_price = base_price * (1 - discount)
@@ -1040,7 +2603,9 @@ async def show_delivery_options(ticket_channel, user, order_data):
         button.callback = create_delivery_callback(delivery_type, multiplier)
         delivery_view.add_item(button)
     
-    await ticket_channel.send(embed=embed, view=delivery_view)
+    # Answer the interaction with the step itself: one call instead of an
+    # ack plus a channel send, and it stays out of the channel's 5/5s bucket
+    await interaction.response.send_message(embed=embed, view=delivery_view)
 
 # Final payment selection with total calculation
 async def show_final_payment(ticket_channel, user, order_data, interaction):
@@ -1085,7 +2650,6 @@ Wähle deine Zahlungsmethode:"""
         description=summary,
         color=0x27ae60
     )
-    embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
     
     payment_view = View(timeout=None)
     
@@ -1143,9 +2707,8 @@ Wähle deine Zahlungsmethode:"""
         button.callback = create_final_payment_callback(payment_type)
         payment_view.add_item(button)
     
-    banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-    await ticket_channel.send(embed=embed, view=payment_view, file=banner_file)
-    await interaction.response.send_message("✅ Bestellung zusammengefasst!", ephemeral=True)
+    # Posted as the interaction response, like the delivery step
+    await interaction.response.send_message(embed=embed, view=payment_view, **await banner_attachment(ticket_channel.guild, embed))
 
 # Handle final payment selection
 async def handle_final_payment(interaction, ticket_channel, user, order_data, final_price, payment_type):
@@ -1165,7 +2728,6 @@ async def handle_final_payment(interaction, ticket_channel, user, order_data, fi
             description=f"**PayPal Email:** `hazeevisuals@gmail.com`\n**Betrag:** {final_price:.2f}€\n**Verwendungszweck:** `{purpose_of_use}`\n\n✅ Bitte sende deine Zahlung an diese Email-Adresse mit dem Verwendungszweck.",
             color=0x0070ba
         )
-        embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
         
         # Add payment confirmation button
         payment_confirm_view = View(timeout=None)
@@ -1180,17 +2742,13 @@ async def handle_final_payment(interaction, ticket_channel, user, order_data, fi
         confirm_button.callback = payment_sent_callback
         payment_confirm_view.add_item(confirm_button)
         
-        banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-        await ticket_channel.send(embed=embed, view=payment_confirm_view, file=banner_file)
-        
-        # Safe interaction response with timeout handling
+        # Post the details as the interaction response so the confirm button
+        # is live right away; fall back to the channel if the token expired
         try:
-            if not interaction.response.is_done():
-                await interaction.response.send_message("✅ PayPal Details gesendet!", ephemeral=True)
-            else:
-                await interaction.followup.send("✅ PayPal Details gesendet!", ephemeral=True)
+            await interaction.response.send_message(embed=embed, view=payment_confirm_view, **await banner_attachment(ticket_channel.guild, embed))
         except discord.errors.NotFound:
-            print("⚠️ Interaction expired - PayPal details sent successfully anyway")
+            payments_logger.warning("⚠️ Interaction expired - sending PayPal details to the channel")
+            await ticket_channel.send(embed=embed, view=payment_confirm_view, **await banner_attachment(ticket_channel.guild, embed))
         
     elif payment_type == "bank":
         # Hole Bank-Details aus Server-Konfiguration
@@ -1214,13 +2772,13 @@ async def handle_final_payment(interaction, ticket_channel, user, order_data, fi
                 description=f"**Betrag:** {final_price:.2f}€\n**Verwendungszweck:** `{purpose_of_use}`\n\n💬 Unser Support-Team wird sich bezüglich der Bankdaten bei dir melden.\n\n⚠️ **Wichtig:** Verwende den oben genannten Verwendungszweck bei der Überweisung!",
                 color=0x34495e
             )
-        embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
         
         # Ping HV | Team role with purpose info (nur wenn Bank-Details nicht konfiguriert)
         if bank_iban == "Wird vom Team mitgeteilt":
             hv_team_role = discord.utils.get(interaction.guild.roles, name="HV | Team")
             ping_text = f"{hv_team_role.mention if hv_team_role else '@HV | Team'} - Bank Transfer Anfrage von {user.mention}\n**Verwendungszweck:** `{purpose_of_use}`"
-            await ticket_channel.send(ping_text)
+        else:
+            ping_text = None
         
         # Add payment confirmation button
         payment_confirm_view = View(timeout=None)
@@ -1235,17 +2793,14 @@ async def handle_final_payment(interaction, ticket_channel, user, order_data, fi
         confirm_button.callback = bank_payment_sent_callback
         payment_confirm_view.add_item(confirm_button)
         
-        banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-        await ticket_channel.send(embed=embed, view=payment_confirm_view, file=banner_file)
-        
-        # Safe interaction response with timeout handling
+        # Same as PayPal: details first as the interaction response, then the team ping
         try:
-            if not interaction.response.is_done():
-                await interaction.response.send_message("✅ Team benachrichtigt!", ephemeral=True)
-            else:
-                await interaction.followup.send("✅ Team benachrichtigt!", ephemeral=True)
+            await interaction.response.send_message(embed=embed, view=payment_confirm_view, **await banner_attachment(ticket_channel.guild, embed))
         except discord.errors.NotFound:
-            print("⚠️ Interaction expired - Team notification sent successfully anyway")
+            payments_logger.warning("⚠️ Interaction expired - sending bank details to the channel")
+            await ticket_channel.send(embed=embed, view=payment_confirm_view, **await banner_attachment(ticket_channel.guild, embed))
+        if ping_text:
+            await ticket_channel.send(ping_text)
         
     elif payment_type == "paysafe":
         modal = FinalPaysafecardModal(ticket_channel, final_price, user)
@@ -1287,7 +2842,6 @@ class FinalPaysafecardModal(Modal):
             description=f"**Code:** `{self.paysafe_code.value}`\n**Betrag:** {self.final_price:.2f}€\n\n✅ Dein Paysafecard Code wurde an unser Team weitergeleitet.",
             color=0x00ff00
         )
-        embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
         
         # Add payment confirmation button
         payment_confirm_view = View(timeout=None)
@@ -1302,9 +2856,8 @@ class FinalPaysafecardModal(Modal):
         confirm_button.callback = paysafe_sent_callback
         payment_confirm_view.add_item(confirm_button)
         
-        banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-        await self.ticket_channel.send(embed=embed, view=payment_confirm_view, file=banner_file)
         await interaction.response.send_message("✅ Paysafecard Code übermittelt!", ephemeral=True)
+        await self.ticket_channel.send(embed=embed, view=payment_confirm_view, **await banner_attachment(self.ticket_channel.guild, embed))
 
 # Payment loading state
 async def show_payment_loading(ticket_channel, user, final_price, payment_method, interaction):
@@ -1313,21 +2866,116 @@ async def show_payment_loading(ticket_channel, user, final_price, payment_method
         description=f"**Zahlungsmethode:** {payment_method}\n**Betrag:** {final_price:.2f}€\n\n🔄 Unser Team überprüft deine Zahlung...\n\n⏳ Bitte warte, bis ein Teammitglied deine Zahlung bestätigt hat.",
         color=0xf39c12
     )
-    embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
     
-    banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-    await ticket_channel.send(embed=embed, file=banner_file)
     await interaction.response.send_message("✅ Zahlung gemeldet!", ephemeral=True)
+    await ticket_channel.send(embed=embed, **await banner_attachment(ticket_channel.guild, embed))
     
     # Log payment confirmation
     await log_ticket_event(ticket_channel.guild, "payment_confirmed", user, ticket_channel.name, f"{payment_method} - {final_price:.2f}€")
 
 # Ticket logging system
+TICKET_LOG_CHANNEL_ID = 1413668472059199558  # Default log channel of the original server
+TICKET_LOG_FLUSH_INTERVAL = float(os.getenv('TICKET_LOG_FLUSH_INTERVAL', '2'))
+
+def resolve_ticket_log_channel(guild):
+    """Ticket log channel of a guild from its server config"""
+    channel_id = get_server_config(guild.id).get("channels", {}).get("ticket_log_channel", TICKET_LOG_CHANNEL_ID)
+    return guild.get_channel(channel_id) if channel_id else None
+
+class TicketLogSink:
+    """Queues ticket log embeds and posts them in batches through a webhook.
+
+    ``emit`` only appends to a per-guild queue, so logging never waits on
+    Discord in the user-facing flow. A background task flushes a guild once
+    it has ``batch_size`` embeds (one message carries up to 10) or after
+    ``flush_interval`` seconds. Messages go through a webhook of the log
+    channel, which has its own rate limit instead of sharing the bot's; if
+    the bot may not manage webhooks it falls back to a normal send.
+    """
+    WEBHOOK_NAME = "Haze Visuals Logs"
+    
+    def __init__(self, db, flush_interval, batch_size=10):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending = collections.defaultdict(list)   # guild_id -> [embed]
+        self._webhooks = {}                             # channel_id -> discord.Webhook or None
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.counters = collections.Counter()
+    
+    def emit(self, guild, embed):
+        self._pending[guild.id].append(embed)
+        self.counters['events'] += 1
+        if len(self._pending[guild.id]) >= self.batch_size:
+            self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def _run(self):
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+    
+    @metrics.timed('ticketbot_background_task_seconds', task='ticket_log_flush')
+    async def flush(self):
+        """Send everything that is queued"""
+        pending, self._pending = self._pending, collections.defaultdict(list)
+        for guild_id, embeds in pending.items():
+            guild = bot.get_guild(guild_id)
+            channel = guild and resolve_ticket_log_channel(guild)
+            if not channel:
+                continue
+            for start in range(0, len(embeds), self.batch_size):
+                try:
+                    await self._send(channel, embeds[start:start + self.batch_size])
+                except Exception as e:
+                    self.counters['errors'] += 1
+                    tickets_logger.error(f"❌ Ticket-Log konnte nicht gesendet werden: {e}")
+    
+    async def _webhook(self, channel):
+        if channel.id in self._webhooks:
+            return self._webhooks[channel.id]
+        webhook = None
+        stored = await self.db.get_meta(f"webhook:{channel.id}")
+        if stored:
+            webhook_id, token = json.loads(stored)
+            webhook = discord.Webhook.partial(webhook_id, token, session=http_client.session)
+        else:
+            try:
+                created = await channel.create_webhook(name=self.WEBHOOK_NAME, reason="Ticket-Log")
+                await self.db.set_meta(f"webhook:{channel.id}", json.dumps([created.id, created.token]))
+                webhook = discord.Webhook.partial(created.id, created.token, session=http_client.session)
+            except discord.Forbidden:
+                tickets_logger.warning(f"⚠️ Keine Webhook-Berechtigung in #{channel.name} - Ticket-Log wird direkt gesendet")
+        self._webhooks[channel.id] = webhook
+        return webhook
+    
+    async def _send(self, channel, embeds):
+        webhook = await self._webhook(channel)
+        if webhook is None:
+            await channel.send(embeds=embeds)
+            self.counters['channel_sends'] += 1
+            return
+        try:
+            await webhook.send(embeds=embeds, username=self.WEBHOOK_NAME)
+        except discord.NotFound:
+            # Webhook was deleted - create a new one next time
+            self._webhooks.pop(channel.id, None)
+            await self.db.set_meta(f"webhook:{channel.id}", "")
+            await channel.send(embeds=embeds)
+            self.counters['channel_sends'] += 1
+            return
+        self.counters['webhook_sends'] += 1
+
+ticket_log = TicketLogSink(ticket_db, TICKET_LOG_FLUSH_INTERVAL)
+
 async def log_ticket_event(guild, event_type, user, ticket_name, details=""):
-    log_channel = guild.get_channel(1413668472059199558)
-    if not log_channel:
-        return
-    
+    """Queue a ticket event for the guild's ticket log (returns immediately)"""
     # Event type specific formatting
     if event_type == "opened":
         embed = discord.Embed(
@@ -1369,34 +3017,142 @@ async def log_ticket_event(guild, event_type, user, ticket_name, details=""):
         )
         embed.add_field(name="Bewertung", value=details, inline=False)
     
+    else:
+        return
+    
     embed.set_footer(text="Haze Visuals • Ticket System")
-    await log_channel.send(embed=embed)
+    ticket_log.emit(guild, embed)
 
 # Appointment Management Functions
-def load_appointments():
-    """Load booked appointments from JSON file"""
-    try:
-        with open('appointments.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-    except json.JSONDecodeError:
-        print("❌ Fehler beim Laden der Termine")
-        return {}
+APPOINTMENT_OPENING_HOURS = os.getenv('APPOINTMENT_OPENING_HOURS', '18:00-22:00')
+APPOINTMENT_SLOT_MINUTES = int(os.getenv('APPOINTMENT_SLOT_MINUTES', '30'))
+
+class AppointmentSlotIndex:
+    """In-memory availability index of the appointment slots.
+
+    The daily slot grid is built once from the opening hours. Bookings are
+    kept per guild as ``{date: {time: user_name}}`` (loaded from the database
+    on first use and written through afterwards), so availability checks are
+    dict lookups. ``reserve`` claims a slot in memory before the insert, so
+    two customers can never get the same slot; the primary key of the
+    appointments table stays the final arbiter.
+    """
+    def __init__(self, db, opening_hours, slot_minutes):
+        self.db = db
+        opens, closes = (self._minutes(part) for part in opening_hours.split('-'))
+        self.slot_minutes = slot_minutes
+        self.hours_label = f"{self._time(opens)} - {self._time(closes)}"
+        # (time, minutes after midnight) of every bookable slot of a day
+        self.grid = tuple((self._time(minute), minute) for minute in range(opens, closes, slot_minutes))
+        self.slot_times = tuple(time_slot for time_slot, _ in self.grid)
+        self._slot_set = frozenset(self.slot_times)
+        self._booked = {}        # guild_id -> {date_str: {time: user_name}}
+        self._locks = collections.defaultdict(asyncio.Lock)
+    
+    @staticmethod
+    def _minutes(value):
+        hours, minutes = value.strip().split(':')
+        return int(hours) * 60 + int(minutes)
+    
+    @staticmethod
+    def _time(minutes):
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+    
+    async def _days(self, guild_id):
+        if guild_id not in self._booked:
+            async with self._locks[guild_id]:
+                if guild_id not in self._booked:
+                    days = {}
+                    for slot_key, appointment in (await load_appointments(guild_id)).items():
+                        date_str, time_slot = slot_key.split('_')
+                        days.setdefault(date_str, {})[time_slot] = appointment['user_name']
+                    self._booked[guild_id] = days
+        return self._booked[guild_id]
+    
+    async def booked_day(self, guild_id, date_str):
+        """Booked times of one day (time -> user_name)"""
+        return (await self._days(guild_id)).get(date_str, {})
+    
+    async def available(self, guild_id, now, days=7, lead=timedelta(minutes=30)):
+        """Free slots of the next ``days`` days that start later than ``now + lead``"""
+        booked = await self._days(guild_id)
+        cutoff = now + lead
+        cutoff_date, cutoff_minute = cutoff.strftime('%Y-%m-%d'), cutoff.hour * 60 + cutoff.minute
+        
+        available_slots = {}
+        for day_offset in range(days):
+            date = now + timedelta(days=day_offset)
+            date_str = date.strftime('%Y-%m-%d')
+            if date_str < cutoff_date:
+                continue
+            weekday = date.strftime('%A')  # Monday, Tuesday, etc.
+            prefix = f"{weekday} {date.strftime('%d.%m')} - "
+            day_booked = booked.get(date_str, {})
+            day_slots = [
+                {'time': time_slot, 'slot_key': f"{date_str}_{time_slot}", 'display': prefix + time_slot}
+                for time_slot, minute in self.grid
+                if time_slot not in day_booked and (date_str > cutoff_date or minute > cutoff_minute)
+            ]
+            if day_slots:
+                available_slots[date_str] = {
+                    'weekday': weekday,
+                    'date_display': date.strftime('%d.%m.%Y'),
+                    'slots': day_slots
+                }
+        return available_slots
+    
+    async def reserve(self, guild_id, slot_key, appointment):
+        """Atomically check and book a slot. Returns True if it was reserved."""
+        date_str, _, time_slot = slot_key.partition('_')
+        if time_slot not in self._slot_set:
+            return False
+        day = (await self._days(guild_id)).setdefault(date_str, {})
+        if time_slot in day:
+            return False
+        # Claimed before the first await - concurrent bookings see the slot as taken
+        day[time_slot] = appointment['user_name']
+        try:
+            reserved = await self.db.reserve_appointment(guild_id, slot_key, appointment)
+        except Exception:
+            day.pop(time_slot, None)
+            raise
+        if not reserved:
+            # Taken outside this index - reload the guild on next use
+            self.invalidate(guild_id)
+        return reserved
+    
+    def release(self, guild_id, slot_keys):
+        days = self._booked.get(guild_id)
+        if days is None:
+            return
+        for slot_key in slot_keys:
+            date_str, _, time_slot = slot_key.partition('_')
+            days.get(date_str, {}).pop(time_slot, None)
+    
+    def clear(self, guild_id):
+        self._booked[guild_id] = {}
+    
+    def prune(self, before_date):
+        """Drop the days before ``before_date`` (YYYY-MM-DD) of all guilds"""
+        for days in self._booked.values():
+            for date_str in [date_str for date_str in days if date_str < before_date]:
+                del days[date_str]
+    
+    def invalidate(self, guild_id):
+        self._booked.pop(guild_id, None)
 
-def save_appointments(appointments):
-    """Save appointments to JSON file"""
+appointment_slots = AppointmentSlotIndex(ticket_db, APPOINTMENT_OPENING_HOURS, APPOINTMENT_SLOT_MINUTES)
+
+async def load_appointments(guild_id, start_key=None, end_key=None):
+    """Load a guild's booked appointments from the database"""
     try:
-        with open('appointments.json', 'w') as f:
-            json.dump(appointments, f, indent=4)
+        return await ticket_db.get_appointments(guild_id, start_key, end_key)
     except Exception as e:
-        print(f"❌ Fehler beim Speichern der Termine: {e}")
+        calendar_logger.error(f"❌ Fehler beim Laden der Termine: {e}")
+        return {}
 
-def get_available_time_slots(ticket_created_at=None):
+async def get_available_time_slots(guild_id, ticket_created_at=None):
     """Get available appointment slots for the next 7 days"""
-    from datetime import datetime, timedelta
-    import pytz
-    
     berlin_tz = pytz.timezone('Europe/Berlin')
     now = datetime.now(berlin_tz)
     
@@ -1406,252 +3162,282 @@ def get_available_time_slots(ticket_created_at=None):
         if now < min_booking_time:
             return {}  # No slots available yet
     
-    available_slots = {}
-    booked_appointments = load_appointments()
-    
-    # Generate slots for next 7 days
-    for day_offset in range(7):
-        date = now + timedelta(days=day_offset)
-        date_str = date.strftime('%Y-%m-%d')
-        weekday = date.strftime('%A')  # Monday, Tuesday, etc.
-        
-        # Generate time slots from 18:00 to 22:00 (every 30 minutes)
-        day_slots = []
-        for hour in range(18, 22):
-            for minute in [0, 30]:
-                # Create datetime object for this specific slot
-                slot_datetime = date.replace(hour=hour, minute=minute, second=0, microsecond=0)
-                
-                # Skip if this slot is in the past (add 30 minute buffer for booking)
-                if slot_datetime <= now + timedelta(minutes=30):
-                    continue
-                
-                slot_time = f"{hour:02d}:{minute:02d}"
-                slot_key = f"{date_str}_{slot_time}"
-                
-                # Check if slot is available (not booked)
-                if slot_key not in booked_appointments:
-                    day_slots.append({
-                        'time': slot_time,
-                        'slot_key': slot_key,
-                        'display': f"{weekday} {date.strftime('%d.%m')} - {slot_time}"
-                    })
-        
-        if day_slots:
-            available_slots[date_str] = {
-                'weekday': weekday,
-                'date_display': date.strftime('%d.%m.%Y'),
-                'slots': day_slots
-            }
-    
-    return available_slots
+    return await appointment_slots.available(guild_id, now)
 
-async def book_appointment(slot_key, user_id, user_name, ticket_name, bot):
+async def book_appointment(guild_id, slot_key, user_id, user_name, ticket_name, bot):
     """Book an appointment slot"""
-    appointments = load_appointments()
-    
-    # Check if slot is still available
-    if slot_key in appointments:
-        # Log unavailable appointment attempt
-        await log_unavailable_appointment(slot_key, user_name, bot)
-        return False, "Dieser Termin ist bereits vergeben."
-    
-    # Book the slot
-    appointments[slot_key] = {
+    # Check and book the slot in one step
+    reserved = await appointment_slots.reserve(guild_id, slot_key, {
         'user_id': user_id,
         'user_name': user_name,
         'ticket_name': ticket_name,
         'booked_at': datetime.now().isoformat()
-    }
+    })
     
-    save_appointments(appointments)
+    if not reserved:
+        # Log unavailable appointment attempt
+        await log_unavailable_appointment(guild_id, slot_key, user_name, bot)
+        return False, "Dieser Termin ist bereits vergeben."
     
-    # Update calendar display after booking
-    try:
-        await update_calendar_display()
-        print(f"📅 Kalender nach Terminbuchung aktualisiert")
-    except Exception as e:
-        print(f"❌ Fehler beim Aktualisieren des Kalenders nach Buchung: {e}")
+    # Update calendar display after booking (debounced, only this day is re-rendered)
+    calendar_publisher.mark_dirty(guild_id, [slot_key])
     
     return True, "Termin erfolgreich gebucht!"
 
-async def free_ticket_appointments(ticket_name):
+async def free_ticket_appointments(guild_id, ticket_name):
     """Free up all appointments associated with a specific ticket"""
     try:
-        appointments = load_appointments()
-        appointments_freed = 0
-        
-        # Find and remove appointments for this ticket
-        appointments_to_remove = []
-        for slot_key, appointment_data in appointments.items():
-            if appointment_data.get('ticket_name') == ticket_name:
-                appointments_to_remove.append(slot_key)
-        
-        # Remove the appointments
-        for slot_key in appointments_to_remove:
-            del appointments[slot_key]
-            appointments_freed += 1
+        # Find and remove appointments for this ticket (indexed by guild and ticket_name)
+        freed_slots = await ticket_db.free_ticket_appointments(guild_id, ticket_name)
+        appointment_slots.release(guild_id, freed_slots)
+        appointments_freed = len(freed_slots)
         
         if appointments_freed > 0:
-            # Save updated appointments
-            save_appointments(appointments)
-            
             # Update calendar display
-            await update_calendar_display()
-            print(f"📅 {appointments_freed} Termin(e) für Ticket {ticket_name} freigegeben")
+            calendar_publisher.mark_dirty(guild_id, freed_slots)
+            calendar_logger.info(f"📅 {appointments_freed} Termin(e) für Ticket {ticket_name} freigegeben")
             
         return appointments_freed
         
     except Exception as e:
-        print(f"❌ Fehler beim Freigeben der Termine für Ticket {ticket_name}: {e}")
+        calendar_logger.error(f"❌ Fehler beim Freigeben der Termine für Ticket {ticket_name}: {e}")
         return 0
 
-async def clear_all_appointments():
-    """Clear all booked appointments and update calendar"""
+async def clear_all_appointments(guild_id):
+    """Clear all booked appointments of a guild and update its calendar"""
     try:
-        appointments = load_appointments()
-        total_cleared = len(appointments)
-        
         # Clear all appointments
-        appointments.clear()
-        
-        # Save empty appointments file
-        save_appointments(appointments)
+        total_cleared = await ticket_db.clear_appointments(guild_id)
+        appointment_slots.clear(guild_id)
         
         # Update calendar display
-        await update_calendar_display()
+        calendar_publisher.mark_dirty(guild_id)
         
-        print(f"📅 Alle {total_cleared} Termine wurden gelöscht")
+        calendar_logger.info(f"📅 Alle {total_cleared} Termine wurden gelöscht")
         return total_cleared
         
     except Exception as e:
-        print(f"❌ Fehler beim Löschen aller Termine: {e}")
+        calendar_logger.error(f"❌ Fehler beim Löschen aller Termine: {e}")
         return 0
 
 # Ticket form data storage functions
-def load_ticket_forms():
-    """Load ticket form data from JSON file"""
+async def store_ticket_form_data(ticket_name, form_data):
+    """Store form data for a specific ticket"""
     try:
-        with open('ticket_forms.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-    except json.JSONDecodeError:
-        print("❌ Fehler beim Laden der Ticket-Formulardaten")
-        return {}
+        await ticket_db.put_ticket_form(ticket_name, form_data)
+    except Exception as e:
+        tickets_logger.error(f"❌ Fehler beim Speichern der Ticket-Formulardaten: {e}")
 
-def save_ticket_forms(ticket_forms):
-    """Save ticket form data to JSON file"""
+async def get_ticket_form_data(ticket_name):
+    """Get form data for a specific ticket"""
     try:
-        with open('ticket_forms.json', 'w', encoding='utf-8') as f:
-            json.dump(ticket_forms, f, ensure_ascii=False, indent=2)
+        return await ticket_db.get_ticket_form(ticket_name) or {}
     except Exception as e:
-        print(f"❌ Fehler beim Speichern der Ticket-Formulardaten: {e}")
+        tickets_logger.error(f"❌ Fehler beim Laden der Ticket-Formulardaten: {e}")
+        return {}
 
-def store_ticket_form_data(ticket_name, form_data):
-    """Store form data for a specific ticket"""
-    ticket_forms = load_ticket_forms()
-    ticket_forms[ticket_name] = form_data
-    save_ticket_forms(ticket_forms)
+# ========================================
+# COUNTER CHANNELS
+# ========================================
 
-def get_ticket_form_data(ticket_name):
-    """Get form data for a specific ticket"""
-    ticket_forms = load_ticket_forms()
-    return ticket_forms.get(ticket_name, {})
+COUNTER_CATEGORY_ID = 1413674754409238549
+# Discord allows 2 renames per channel every 10 minutes
+COUNTER_RENAME_INTERVAL = float(os.getenv('COUNTER_RENAME_INTERVAL', '300'))
 
-# Open tickets counter functions
-async def count_open_tickets(guild):
-    """Count all open tickets in the guild"""
-    open_count = 0
+def find_counter_channel(guild, keyword):
+    """Find a counter voice channel by a keyword in its name"""
+    counter_category = guild.get_channel(COUNTER_CATEGORY_ID)
+    if not counter_category:
+        return None
+    for channel in counter_category.channels:
+        if isinstance(channel, discord.VoiceChannel) and keyword in channel.name.lower():
+            return channel
+    return None
+
+class CounterChannelScheduler:
+    """Coalescing renamer for the counter voice channels.
+
+    Every (guild, counter) keeps only the latest wanted name. A single worker
+    task per counter renames the channel at most once per ``interval``;
+    values replaced while waiting for the next slot are dropped.
+    """
+    COUNTERS = {
+        "tickets": "offene tickets",
+        "members": "mitglieder"
+    }
     
-    # Define ticket categories to check
-    ticket_category_ids = [
-        1413669641062055976,  # Bestellung
-        1413669733957636156,  # Support
-        1413892803162800178,  # Paid
-    ]
+    def __init__(self, interval):
+        self.interval = interval
+        self._states = {}   # (guild_id, counter) -> state dict
+        self._tasks = {}
+    
+    def request(self, guild, counter, name):
+        """Set the wanted channel name; the worker applies it when allowed"""
+        key = (guild.id, counter)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = {
+                "desired": None, "applied": None, "last_rename": None, "blocked_until": 0.0,
+                "renames": 0, "dropped": 0, "rate_limited": 0, "last_error": None
+            }
+        if state["desired"] not in (None, name, state["applied"]):
+            state["dropped"] += 1
+        state["desired"] = name
+        
+        task = self._tasks.get(key)
+        if task is None or task.done():
+            self._tasks[key] = asyncio.create_task(self._run(key))
+    
+    def _next_slot(self, state):
+        earliest = state["blocked_until"]
+        if state["last_rename"] is not None:
+            earliest = max(earliest, state["last_rename"] + self.interval)
+        return earliest
+    
+    async def _run(self, key):
+        guild_id, counter = key
+        state = self._states[key]
+        while True:
+            name = state["desired"]
+            guild = bot.get_guild(guild_id)
+            channel = find_counter_channel(guild, self.COUNTERS[counter]) if guild else None
+            if channel is None:
+                return
+            if channel.name == name:
+                state["applied"] = name
+                return
+            
+            wait = self._next_slot(state) - time.monotonic()
+            if wait > 0:
+                # Sleep until the next slot, then rename to whatever is wanted by then
+                await asyncio.sleep(wait)
+                continue
+            
+            try:
+                with metrics.timer('ticketbot_background_task_seconds', task='counter_rename'):
+                    await channel.edit(name=name)
+                state["applied"] = name
+                state["last_rename"] = time.monotonic()
+                state["renames"] += 1
+                counters_logger.info(f"📊 Counter updated: {name}")
+            except discord.RateLimited as e:
+                state["rate_limited"] += 1
+                state["blocked_until"] = time.monotonic() + max(e.retry_after, self.interval)
+                counters_logger.warning(f"⚠️ Counter rename rate limited - nächster Versuch in {int(max(e.retry_after, self.interval))}s")
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    state["rate_limited"] += 1
+                    state["blocked_until"] = time.monotonic() + self.interval
+                    counters_logger.warning(f"⚠️ Counter rename rate limited - backing off")
+                else:
+                    state["last_error"] = str(e)
+                    counters_logger.error(f"❌ Error updating counter channel: {e}")
+                    return
+    
+    def status(self, guild_id=None):
+        """Pending and applied counter values for diagnostics"""
+        now = time.monotonic()
+        result = []
+        for (state_guild_id, counter), state in self._states.items():
+            if guild_id is not None and state_guild_id != guild_id:
+                continue
+            result.append({
+                "guild_id": state_guild_id,
+                "counter": counter,
+                "desired": state["desired"],
+                "applied": state["applied"],
+                "pending": state["desired"] != state["applied"],
+                "next_rename_in": max(0.0, self._next_slot(state) - now),
+                "renames": state["renames"],
+                "dropped": state["dropped"],
+                "rate_limited": state["rate_limited"],
+                "last_error": state["last_error"]
+            })
+        return result
+
+counter_scheduler = CounterChannelScheduler(COUNTER_RENAME_INTERVAL)
+
+class HumanMemberCounter:
+    """Per-guild count of non-bot members.
+
+    Seeded once per guild from the member cache (members intent, chunked on
+    startup) and adjusted on join/leave, so the member counter never walks
+    guild.members on the hot path. ``reconcile`` recounts to correct drift
+    from missed events.
+    """
+    def __init__(self):
+        self._counts = {}
+    
+    @staticmethod
+    def _count(guild):
+        return sum(1 for member in guild.members if not member.bot)
+    
+    def seed(self, guild):
+        self._counts[guild.id] = self._count(guild)
+        return self._counts[guild.id]
+    
+    def get(self, guild):
+        if guild.id not in self._counts:
+            return self.seed(guild)
+        return self._counts[guild.id]
     
-    for category_id in ticket_category_ids:
-        category = guild.get_channel(category_id)
-        if category:
-            for channel in category.channels:
-                if isinstance(channel, discord.TextChannel):
-                    # Count channels that look like tickets
-                    if any(prefix in channel.name for prefix in ['clothing-', 'support-', 'bug-', 'vorschlag-', 'ticket-']):
-                        open_count += 1
+    def member_joined(self, member):
+        if member.bot:
+            return
+        if member.guild.id in self._counts:
+            self._counts[member.guild.id] += 1
+        else:
+            # The new member is already in the cache
+            self.seed(member.guild)
+    
+    def member_left(self, member):
+        if member.bot:
+            return
+        if member.guild.id in self._counts:
+            self._counts[member.guild.id] = max(0, self._counts[member.guild.id] - 1)
+        else:
+            self.seed(member.guild)
     
-    return open_count
+    def reconcile(self, guild):
+        """Recount a guild. Returns the drift that was corrected."""
+        old = self._counts.get(guild.id)
+        new = self.seed(guild)
+        return 0 if old is None else new - old
+
+member_counter = HumanMemberCounter()
 
-async def delayed_counter_update(guild, delay_seconds):
-    """Update ticket counter after a delay to prevent rate limiting"""
-    import asyncio
-    await asyncio.sleep(delay_seconds)
-    await update_ticket_counter_channel(guild)
+# Open tickets counter functions
+async def count_open_tickets(guild):
+    """Count all open tickets in the guild"""
+    await open_tickets.ready()
+    return open_tickets.open_count(guild.id)
 
 async def update_ticket_counter_channel(guild):
-    """Update the ticket counter channel name with rate limiting protection"""
+    """Queue a rename of the ticket counter channel to the current count"""
     try:
-        # Rate limiting protection: only update every 5 seconds per guild
-        import time
-        current_time = time.time()
-        guild_id = guild.id
-        
-        # Check if we updated this guild's counter recently
-        if hasattr(update_ticket_counter_channel, 'last_updates'):
-            if guild_id in update_ticket_counter_channel.last_updates:
-                if current_time - update_ticket_counter_channel.last_updates[guild_id] < 5:
-                    print(f"⚠️ Skipping counter update for guild {guild.name} - too recent")
-                    return
-        else:
-            update_ticket_counter_channel.last_updates = {}
-        
-        # Find the ticket counter channel in category 1413674754409238549
-        counter_category = guild.get_channel(1413674754409238549)
-        if not counter_category:
-            print("❌ Ticket counter category not found")
+        if not guild.get_channel(COUNTER_CATEGORY_ID):
+            counters_logger.error("❌ Ticket counter category not found")
             return
         
-        # Look for existing counter channel (voice channel)
-        counter_channel = None
-        for channel in counter_category.channels:
-            if isinstance(channel, discord.VoiceChannel) and "offene tickets" in channel.name.lower():
-                counter_channel = channel
-                break
+        # If channel doesn't exist, create it
+        if not find_counter_channel(guild, "offene tickets"):
+            await create_ticket_counter_channel(guild)
+            return
         
         # Count open tickets
         open_count = await count_open_tickets(guild)
-        
-        # Update channel name
-        new_name = f"📊 Offene Tickets: {open_count}"
-        
-        if counter_channel:
-            if counter_channel.name != new_name:
-                try:
-                    await counter_channel.edit(name=new_name)
-                    print(f"📊 Ticket counter updated: {new_name}")
-                    # Record successful update time
-                    update_ticket_counter_channel.last_updates[guild_id] = current_time
-                except discord.errors.HTTPException as e:
-                    if e.status == 429:  # Rate limited
-                        print(f"⚠️ Ticket counter update rate limited - backing off")
-                        # Set longer backoff time on rate limit
-                        update_ticket_counter_channel.last_updates[guild_id] = current_time + 30
-                    else:
-                        print(f"❌ Error updating ticket counter: {e}")
-        else:
-            # If channel doesn't exist, create it
-            await create_ticket_counter_channel(guild)
+        counter_scheduler.request(guild, "tickets", f"📊 Offene Tickets: {open_count}")
     
     except Exception as e:
-        print(f"❌ Error updating ticket counter: {e}")
+        counters_logger.error(f"❌ Error updating ticket counter: {e}")
 
 async def create_ticket_counter_channel(guild):
     """Create the ticket counter voice channel"""
     try:
         # Get the category
-        counter_category = guild.get_channel(1413674754409238549)
+        counter_category = guild.get_channel(COUNTER_CATEGORY_ID)
         if not counter_category:
-            print("❌ Category 1413674754409238549 not found")
+            counters_logger.error(f"❌ Category {COUNTER_CATEGORY_ID} not found")
             return
         
         # Count current open tickets
@@ -1678,106 +3464,51 @@ async def create_ticket_counter_channel(guild):
             overwrites=overwrites
         )
         
-        print(f"✅ Ticket counter voice channel created: {channel_name}")
+        counters_logger.info(f"✅ Ticket counter voice channel created: {channel_name}")
         
         return counter_channel
         
     except Exception as e:
-        print(f"❌ Error creating ticket counter voice channel: {e}")
+        counters_logger.error(f"❌ Error creating ticket counter voice channel: {e}")
         return None
 
 async def ensure_ticket_counter_channel_exists(guild):
     """Ensure the ticket counter channel exists, create it if not"""
     try:
-        # Find the ticket counter channel in category 1413674754409238549
-        counter_category = guild.get_channel(1413674754409238549)
-        if not counter_category:
-            print("❌ Ticket counter category not found")
-            return
-        
-        # Look for existing counter channel
-        counter_channel = None
-        for channel in counter_category.channels:
-            if isinstance(channel, discord.TextChannel) and "offene-tickets" in channel.name.lower():
-                counter_channel = channel
-                break
-        
-        # If channel doesn't exist, create it
-        if not counter_channel:
-            await create_ticket_counter_channel(guild)
-        else:
-            # Update existing channel to ensure correct count
-            await update_ticket_counter_channel(guild)
-            
+        # update_ticket_counter_channel creates the channel if it is missing
+        await update_ticket_counter_channel(guild)
     except Exception as e:
-        print(f"❌ Error ensuring ticket counter channel exists: {e}")
+        counters_logger.error(f"❌ Error ensuring ticket counter channel exists: {e}")
 
 async def update_member_counter_channel(guild):
-    """Update the member counter channel name with rate limiting protection"""
+    """Queue a rename of the member counter channel to the current count"""
     try:
-        # Rate limiting protection: only update every 5 seconds per guild
-        import time
-        current_time = time.time()
-        guild_id = guild.id
-        
-        # Check if we updated this guild's counter recently
-        if hasattr(update_member_counter_channel, 'last_updates'):
-            if guild_id in update_member_counter_channel.last_updates:
-                if current_time - update_member_counter_channel.last_updates[guild_id] < 5:
-                    return
-        else:
-            update_member_counter_channel.last_updates = {}
-        
-        # Find the member counter channel in category 1413674754409238549
-        counter_category = guild.get_channel(1413674754409238549)
-        if not counter_category:
+        if not guild.get_channel(COUNTER_CATEGORY_ID):
             return
         
-        # Look for existing counter channel (voice channel)
-        counter_channel = None
-        for channel in counter_category.channels:
-            if isinstance(channel, discord.VoiceChannel) and "mitglieder" in channel.name.lower():
-                counter_channel = channel
-                break
+        # If channel doesn't exist, create it
+        if not find_counter_channel(guild, "mitglieder"):
+            await create_member_counter_channel(guild)
+            return
         
         # Count members (excluding bots)
-        member_count = len([m for m in guild.members if not m.bot])
-        
-        # Update channel name
-        new_name = f"👥 Mitglieder: {member_count}"
-        
-        if counter_channel:
-            if counter_channel.name != new_name:
-                try:
-                    await counter_channel.edit(name=new_name)
-                    print(f"👥 Member counter updated: {new_name}")
-                    # Record successful update time
-                    update_member_counter_channel.last_updates[guild_id] = current_time
-                except discord.errors.HTTPException as e:
-                    if e.status == 429:  # Rate limited
-                        print(f"⚠️ Member counter update rate limited - backing off")
-                        # Set longer backoff time on rate limit
-                        update_member_counter_channel.last_updates[guild_id] = current_time + 30
-                    else:
-                        print(f"❌ Error updating member counter: {e}")
-        else:
-            # If channel doesn't exist, create it
-            await create_member_counter_channel(guild)
+        member_count = member_counter.get(guild)
+        counter_scheduler.request(guild, "members", f"👥 Mitglieder: {member_count}")
     
     except Exception as e:
-        print(f"❌ Error updating member counter: {e}")
+        counters_logger.error(f"❌ Error updating member counter: {e}")
 
 async def create_member_counter_channel(guild):
     """Create the member counter voice channel"""
     try:
         # Get the category
-        counter_category = guild.get_channel(1413674754409238549)
+        counter_category = guild.get_channel(COUNTER_CATEGORY_ID)
         if not counter_category:
-            print("❌ Category 1413674754409238549 not found")
+            counters_logger.error(f"❌ Category {COUNTER_CATEGORY_ID} not found")
             return
         
         # Count current members (excluding bots)
-        member_count = len([m for m in guild.members if not m.bot])
+        member_count = member_counter.get(guild)
         
         # Set up permissions for voice channel
         overwrites = {
@@ -1800,69 +3531,281 @@ async def create_member_counter_channel(guild):
             overwrites=overwrites
         )
         
-        print(f"✅ Member counter voice channel created: {channel_name}")
+        counters_logger.info(f"✅ Member counter voice channel created: {channel_name}")
         
         return counter_channel
         
     except Exception as e:
-        print(f"❌ Error creating member counter voice channel: {e}")
+        counters_logger.error(f"❌ Error creating member counter voice channel: {e}")
         return None
 
 async def ensure_member_counter_channel_exists(guild):
     """Ensure the member counter channel exists, create it if not"""
     try:
-        # Find the member counter channel in category 1413674754409238549
-        counter_category = guild.get_channel(1413674754409238549)
-        if not counter_category:
-            return
-        
-        # Look for existing counter channel
-        counter_channel = None
-        for channel in counter_category.channels:
-            if isinstance(channel, discord.VoiceChannel) and "mitglieder" in channel.name.lower():
-                counter_channel = channel
-                break
-        
-        # If channel doesn't exist, create it
-        if not counter_channel:
-            await create_member_counter_channel(guild)
-        else:
-            # Update existing channel to ensure correct count
-            await update_member_counter_channel(guild)
-            
+        # update_member_counter_channel creates the channel if it is missing
+        await update_member_counter_channel(guild)
     except Exception as e:
-        print(f"❌ Error ensuring member counter channel exists: {e}")
+        counters_logger.error(f"❌ Error ensuring member counter channel exists: {e}")
 
 # Server configuration storage functions
+SERVER_CONFIGS_FILE = 'server_configs.json'
+
+class ServerConfigStore:
+    """Process-wide cache for server_configs.json.
+
+    The file is parsed once and served from memory. Saves go through the JSON
+    writer, and the file is re-read only when it was changed by someone else.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._configs = None
+        self._signature = None
+        self._lock = threading.Lock()
+    
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+    
+    def _read_file(self):
+        try:
+            return read_json_file(self.path)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError:
+            admin_logger.error("❌ Fehler beim Laden der Server-Konfigurationen")
+            return {}
+    
+    def _ensure_loaded(self):
+        if self._configs is not None and json_writer.is_pending(self.path):
+            # Our own unsaved changes are newer than the file
+            return
+        signature = self._file_signature()
+        if self._configs is not None and signature == self._signature:
+            return
+        if self._configs is None or signature != json_writer.written_signature(self.path):
+            self._configs = self._read_file()
+        self._signature = signature
+    
+    def get_all(self):
+        """Return a copy of all server configurations"""
+        with self._lock:
+            self._ensure_loaded()
+            return copy.deepcopy(self._configs)
+    
+    def get(self, guild_id):
+        """Return a copy of one server's configuration, or None"""
+        with self._lock:
+            self._ensure_loaded()
+            config = self._configs.get(str(guild_id))
+            return copy.deepcopy(config) if config is not None else None
+    
+    def set(self, guild_id, config):
+        """Store one server's configuration and persist it"""
+        with self._lock:
+            self._ensure_loaded()
+            self._configs[str(guild_id)] = copy.deepcopy(config)
+            write_json_file(self.path, self._configs)
+    
+    def replace_all(self, configs):
+        """Replace all server configurations and persist them"""
+        with self._lock:
+            self._configs = copy.deepcopy(configs)
+            write_json_file(self.path, self._configs)
+    
+    def invalidate(self):
+        """Force the next lookup to re-read the file"""
+        with self._lock:
+            self._configs = None
+            self._signature = None
+
+server_config_store = ServerConfigStore(SERVER_CONFIGS_FILE)
+
 def load_server_configs():
-    """Load server configurations from JSON file"""
-    try:
-        with open('server_configs.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-    except json.JSONDecodeError:
-        print("❌ Fehler beim Laden der Server-Konfigurationen")
-        return {}
+    """Load server configurations (served from the in-memory config store)"""
+    return server_config_store.get_all()
 
 def save_server_configs(server_configs):
     """Save server configurations to JSON file"""
-    try:
-        with open('server_configs.json', 'w', encoding='utf-8') as f:
-            json.dump(server_configs, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print(f"❌ Fehler beim Speichern der Server-Konfigurationen: {e}")
+    server_config_store.replace_all(server_configs)
 
 def get_server_config(guild_id):
     """Get configuration for a specific server"""
-    server_configs = load_server_configs()
-    return server_configs.get(str(guild_id), get_default_config())
+    config = server_config_store.get(guild_id)
+    return config if config is not None else get_default_config()
 
 def save_server_config(guild_id, config):
     """Save configuration for a specific server"""
-    server_configs = load_server_configs()
-    server_configs[str(guild_id)] = config
-    save_server_configs(server_configs)
+    server_config_store.set(guild_id, config)
+
+# ========================================
+# BANNER ASSETS
+# ========================================
+
+# Lokale Banner-GIFs (nicht im Repository - pro Installation unter attached_assets/ ablegen)
+DEFAULT_BANNER_PATH = os.getenv('BANNER_PATH', "attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
+PANEL_BANNER_PATH = os.getenv('PANEL_BANNER_PATH', "attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757177441437.gif")
+
+class BannerAssetCache:
+    """Uploads each local banner once per guild and reuses its CDN URL.
+
+    Entries are keyed by the SHA-256 of the file, so a changed file is
+    uploaded again; the file is only re-read when its size or mtime change.
+    Uploads go to the server's configured asset channel
+    (``channels.asset_channel``, set under /admin → Branding → Banner) and
+    run in the background - until a URL is known, or if no asset channel is
+    configured, the banner is attached to the message as before. Discord
+    signs attachment URLs with an expiry, so expiring URLs are renewed by
+    re-fetching the storage message instead of uploading again.
+    """
+    REFRESH_BEFORE_EXPIRY = 3600
+    
+    def __init__(self, db):
+        self.db = db
+        self._hashes = {}    # path -> ((mtime_ns, size), sha256)
+        self._entries = {}   # (guild_id, sha256) -> {"channel_id", "message_id", "url"}
+        self._looked_up = set()
+        self._uploads = {}   # (guild_id, sha256) -> task
+        self._unconfigured = set()  # guild ids already warned about a missing asset channel
+        self.counters = collections.Counter()
+    
+    def file_hash(self, path):
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._hashes.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self._hashes[path] = (signature, digest)
+        return digest
+    
+    @staticmethod
+    def _expires_at(url):
+        """Expiry of a signed Discord CDN URL (``ex`` parameter), None if unsigned"""
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(url).query)
+        try:
+            return int(query['ex'][0], 16)
+        except (KeyError, ValueError):
+            return None
+    
+    async def cached_url(self, guild, path):
+        """Return the CDN URL of a banner or None (and start an upload) if there is none yet"""
+        digest = self.file_hash(path)
+        key = (guild.id, digest)
+        if key not in self._looked_up:
+            raw = await self.db.get_meta(f"asset:{guild.id}:{digest}")
+            if raw:
+                self._entries[key] = json.loads(raw)
+            self._looked_up.add(key)
+        
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at = self._expires_at(entry['url'])
+            remaining = None if expires_at is None else expires_at - time.time()
+            if remaining is None or remaining > self.REFRESH_BEFORE_EXPIRY:
+                self.counters['hits'] += 1
+                return entry['url']
+            if remaining > 0:
+                # Still valid - renew it in the background
+                self.counters['hits'] += 1
+                self._start_upload(guild, path, digest)
+                return entry['url']
+        
+        self.counters['misses'] += 1
+        self._start_upload(guild, path, digest)
+        return None
+    
+    def _start_upload(self, guild, path, digest):
+        key = (guild.id, digest)
+        if self._storage_channel(guild) is None:
+            self.counters['unconfigured'] += 1
+            if guild.id not in self._unconfigured:
+                self._unconfigured.add(guild.id)
+                assets_logger.warning(f"⚠️ Kein Asset-Kanal für {guild.name} - Banner werden an jede Nachricht angehängt (/admin → Branding → Banner → Asset-Kanal)")
+            return
+        if key not in self._uploads:
+            self._uploads[key] = asyncio.create_task(self._upload(guild, path, digest))
+    
+    async def _upload(self, guild, path, digest):
+        key = (guild.id, digest)
+        try:
+            entry = self._entries.get(key)
+            if entry is not None:
+                # Renew the signed URL from the existing storage message
+                channel = guild.get_channel(entry['channel_id'])
+                if channel is not None:
+                    try:
+                        message = await channel.fetch_message(entry['message_id'])
+                        if message.attachments:
+                            await self._remember(key, message)
+                            self.counters['refreshes'] += 1
+                            return
+                    except discord.NotFound:
+                        pass
+            
+            channel = self._storage_channel(guild)
+            if channel is None:
+                return
+            message = await channel.send(
+                f"🖼️ `{os.path.basename(path)}` ({digest[:12]})",
+                file=discord.File(path, filename=os.path.basename(path))
+            )
+            await self._remember(key, message)
+            self.counters['uploads'] += 1
+            assets_logger.info(f"🖼️ Banner {os.path.basename(path)} für {guild.name} hochgeladen")
+        except Exception as e:
+            self.counters['errors'] += 1
+            assets_logger.warning(f"⚠️ Banner-Upload für {guild.name} fehlgeschlagen: {e}")
+        finally:
+            self._uploads.pop(key, None)
+    
+    async def _remember(self, key, message):
+        entry = {"channel_id": message.channel.id, "message_id": message.id, "url": message.attachments[0].url}
+        self._entries[key] = entry
+        await self.db.set_meta(f"asset:{key[0]}:{key[1]}", json.dumps(entry))
+    
+    @staticmethod
+    def _storage_channel(guild):
+        """The server's configured asset channel, None if there is none"""
+        channel_id = get_server_config(guild.id).get("channels", {}).get("asset_channel")
+        return guild.get_channel(channel_id) if channel_id else None
+    
+    def stats(self):
+        return dict(self.counters, cached=len(self._entries), uploading=len(self._uploads))
+
+banner_assets = BannerAssetCache(ticket_db)
+missing_banner_paths = set()
+
+async def banner_attachment(guild, embed, path=DEFAULT_BANNER_PATH):
+    """Set a local banner as embed image and return the extra send() kwargs.
+
+    Uses the cached CDN URL when there is one (no upload); otherwise the file
+    is attached to this message while the cache uploads it in the background.
+    Without the local file the server's online banner is used, if it has one.
+    """
+    if not os.path.exists(path):
+        if path not in missing_banner_paths:
+            missing_banner_paths.add(path)
+            assets_logger.warning(f"⚠️ Banner-Datei {path} fehlt - Embeds nutzen das Online-Banner des Servers oder keins")
+        banner_url = get_server_banner_url(guild.id) if guild is not None else ""
+        if banner_url.startswith("http"):
+            embed.set_image(url=banner_url)
+        return {}
+    if guild is not None:
+        try:
+            url = await banner_assets.cached_url(guild, path)
+        except Exception as e:
+            assets_logger.warning(f"⚠️ Banner-Cache Fehler: {e}")
+            url = None
+        if url:
+            embed.set_image(url=url)
+            return {}
+    filename = os.path.basename(path)
+    embed.set_image(url=f"attachment://{filename}")
+    return {"file": discord.File(path, filename=filename)}
 
 def get_server_banner_url(guild_id):
     """Get custom banner URL for server, fallback to default"""
@@ -1879,7 +3822,7 @@ def get_server_banner_url(guild_id):
         return banner_url
     
     # Default banner
-    return "attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif"
+    return DEFAULT_BANNER_PATH
 
 def set_server_banner_url(guild_id, banner_url):
     """Set custom banner URL for server"""
@@ -1891,17 +3834,8 @@ def set_server_banner_url(guild_id, banner_url):
     
     server_config["ticket_customization"]["banner_url"] = banner_url
     save_server_config(guild_id, server_config)
-    print(f"🖼️ Banner URL updated for guild {guild_id}: {banner_url}")
+    assets_logger.info(f"🖼️ Banner URL updated for guild {guild_id}: {banner_url}")
     
-def get_banner_filename_from_url(banner_url):
-    """Extract filename from banner URL for attachment reference"""
-    if banner_url.startswith("http"):
-        # Online image, use as direct URL
-        return None
-    else:
-        # Local file, extract filename
-        return banner_url.split("/")[-1]
-
 async def send_embed_with_banner(channel, embed, view=None, guild_id=None):
     """Send embed with custom banner for the server"""
     try:
@@ -1916,21 +3850,15 @@ async def send_embed_with_banner(channel, embed, view=None, guild_id=None):
                 embed.set_image(url=banner_url)
                 await channel.send(embed=embed, view=view)
             else:
-                # Local file - send as attachment
-                filename = get_banner_filename_from_url(banner_url)
-                if filename:
-                    embed.set_image(url=f"attachment://{filename}")
-                    banner_file = discord.File(banner_url, filename=filename)
-                    await channel.send(embed=embed, view=view, file=banner_file)
-                else:
-                    # Fallback without banner
-                    await channel.send(embed=embed, view=view)
+                # Local file - uploaded once, then sent by URL
+                guild = bot.get_guild(guild_id) or getattr(channel, 'guild', None)
+                await channel.send(embed=embed, view=view, **await banner_attachment(guild, embed, banner_url))
         else:
             # No guild context, send without banner
             await channel.send(embed=embed, view=view)
             
     except Exception as e:
-        print(f"⚠️ Banner loading failed, sending without banner: {e}")
+        assets_logger.warning(f"⚠️ Banner loading failed, sending without banner: {e}")
         # Remove image from embed if it was set
         if embed.image and embed.image.url:
             embed.set_image(url="")
@@ -1973,7 +3901,7 @@ Klicke auf einen der Buttons unten, um ein Ticket zu erstellen:
 • Ein Ticket pro Person zur gleichen Zeit
 • Unser Team antwortet so schnell wie möglich
 • Verwende die richtige Kategorie für dein Anliegen""",
-            "banner_url": "attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757177441437.gif",
+            "banner_url": PANEL_BANNER_PATH,
             "footer_text": "Haze Visuals • Ticket System"
         },
         "commands_enabled": {
@@ -2008,7 +3936,9 @@ Klicke auf einen der Buttons unten, um ein Ticket zu erstellen:
             "leave_channel": 1413665534930587650,
             "calendar_channel": 1413668409853345792,
             "review_channel": 1413668548399726602,
-            "music_channel": None
+            "ticket_log_channel": 1413668472059199558,
+            "music_channel": None,
+            "asset_channel": None
         },
         "roles": {
             "staff_role": "HV | Team",
@@ -2029,113 +3959,138 @@ Klicke auf einen der Buttons unten, um ein Ticket zu erstellen:
     }
 
 # Ticket Ping System Functions
-def load_pending_tickets():
-    """Load pending tickets from JSON file"""
-    try:
-        with open('pending_tickets.json', 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-    except json.JSONDecodeError:
-        print("❌ Fehler beim Laden der pending tickets")
-        return {}
+TICKET_PING_DELAY = 30 * 60  # seconds without a team answer before the team is pinged
 
-def save_pending_tickets(tickets):
-    """Save pending tickets to JSON file"""
-    try:
-        with open('pending_tickets.json', 'w') as f:
-            json.dump(tickets, f, indent=4)
-    except Exception as e:
-        print(f"❌ Fehler beim Speichern der pending tickets: {e}")
+class TicketPingScheduler:
+    """Pings the team in tickets that got no answer within ``delay`` seconds.
+
+    Deadlines are kept in a min-heap and the worker sleeps exactly until the
+    next one; scheduling an earlier deadline wakes it up. The pending_tickets
+    table is the persistent copy, so pings that were due while the bot was
+    offline are sent after a restart. Cancelled tickets are dropped lazily
+    when they reach the top of the heap.
+    """
+    def __init__(self, db, delay):
+        self.db = db
+        self.delay = delay
+        self._heap = []          # (deadline_ts, ticket_id)
+        self._deadlines = {}     # ticket_id -> deadline_ts of live entries
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.counters = collections.Counter()
+    
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    def _push(self, ticket_id, deadline):
+        self._deadlines[ticket_id] = deadline
+        heapq.heappush(self._heap, (deadline, ticket_id))
+        if self._heap[0] == (deadline, ticket_id):
+            self._wakeup.set()
+    
+    async def schedule(self, ticket_id, user_id, created_at):
+        """Persist a new ticket and schedule its ping"""
+        ticket_id = str(ticket_id)
+        await self.db.put_pending_ticket(ticket_id, {
+            'user_id': user_id,
+            'created_at': created_at.isoformat(),
+            'needs_ping': True,
+            'pinged': False
+        })
+        self._push(ticket_id, created_at.timestamp() + self.delay)
+    
+    async def cancel(self, ticket_id):
+        """The team answered - no ping needed"""
+        ticket_id = str(ticket_id)
+        self._deadlines.pop(ticket_id, None)
+        await self.db.update_pending_ticket(ticket_id, needs_ping=False)
+    
+    async def forget(self, ticket_ids):
+        """Tickets are gone - drop their pings and pending entries"""
+        ticket_ids = [str(ticket_id) for ticket_id in ticket_ids]
+        for ticket_id in ticket_ids:
+            self._deadlines.pop(ticket_id, None)
+        await self.db.delete_pending_tickets(ticket_ids)
+    
+    async def _run(self):
+        await bot.wait_until_ready()
+        for ticket_id, created_ts in await self.db.get_ping_schedule():
+            self._push(ticket_id, (created_ts or time.time()) + self.delay)
+        tickets_logger.info(f"⏰ {len(self._deadlines)} Ticket-Erinnerung(en) geplant")
+        
+        while True:
+            # Drop cancelled or rescheduled entries
+            while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            if timeout is None or timeout > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            _, ticket_id = heapq.heappop(self._heap)
+            del self._deadlines[ticket_id]
+            try:
+                await ping_unresponded_ticket(ticket_id)
+                self.counters['pings'] += 1
+            except Exception as e:
+                tickets_logger.error(f"❌ Fehler beim Pingen für Ticket {ticket_id}: {e}")
+                await self.db.delete_pending_tickets([ticket_id])
+
+ticket_pings = TicketPingScheduler(ticket_db, TICKET_PING_DELAY)
 
 async def store_ticket_for_ping_system(ticket_id, user_id, created_at):
     """Store ticket for 30-minute ping system"""
-    pending_tickets = load_pending_tickets()
-    
-    ticket_key = str(ticket_id)
-    pending_tickets[ticket_key] = {
-        'user_id': user_id,
-        'created_at': created_at.isoformat(),
-        'needs_ping': True,
-        'pinged': False
-    }
-    
-    save_pending_tickets(pending_tickets)
+    await ticket_pings.schedule(ticket_id, user_id, created_at)
 
 async def mark_ticket_responded(ticket_id):
     """Mark ticket as responded to by team"""
-    pending_tickets = load_pending_tickets()
-    ticket_key = str(ticket_id)
-    
-    if ticket_key in pending_tickets:
-        pending_tickets[ticket_key]['needs_ping'] = False
-        save_pending_tickets(pending_tickets)
+    await ticket_pings.cancel(ticket_id)
 
-async def check_and_ping_unresponded_tickets(bot):
-    """Check for tickets that need team ping after 30 minutes"""
-    from datetime import datetime, timedelta
-    import pytz
-    
-    pending_tickets = load_pending_tickets()
+@metrics.timed('ticketbot_background_task_seconds', task='ticket_ping')
+async def ping_unresponded_ticket(ticket_id):
+    """Ping the team in a ticket that got no answer after 30 minutes"""
     berlin_tz = pytz.timezone('Europe/Berlin')
     now = datetime.now(berlin_tz)
     
-    tickets_to_remove = []
-    
-    for ticket_id, ticket_data in pending_tickets.items():
-        if not ticket_data['needs_ping'] or ticket_data['pinged']:
-            continue
-            
-        # Parse creation time
-        try:
-            created_at = datetime.fromisoformat(ticket_data['created_at'])
-            if created_at.tzinfo is None:
-                created_at = created_at.replace(tzinfo=berlin_tz)
-            
-            # Check if 30 minutes have passed
-            time_diff = now - created_at
-            if time_diff >= timedelta(minutes=30):
-                # Find the ticket channel
-                try:
-                    ticket_channel = bot.get_channel(int(ticket_id))
-                    if ticket_channel:
-                        # Get HV | Team role
-                        hv_team_role = discord.utils.get(ticket_channel.guild.roles, name="HV | Team")
-                        if hv_team_role:
-                            embed = discord.Embed(
-                                title="⏰ Team-Erinnerung",
-                                description=f"{hv_team_role.mention}\n\nDieses Ticket wartet seit **30 Minuten** auf eine Antwort vom Team.",
-                                color=0xff9500,
-                                timestamp=now
-                            )
-                            embed.set_footer(text="Haze Visuals • Automatische Erinnerung")
-                            
-                            await ticket_channel.send(embed=embed)
-                            
-                            # Mark as pinged
-                            pending_tickets[ticket_id]['pinged'] = True
-                            print(f"📨 Team gepingt für Ticket {ticket_channel.name}")
-                    else:
-                        # Ticket doesn't exist anymore, remove from tracking
-                        tickets_to_remove.append(ticket_id)
-                except Exception as e:
-                    print(f"❌ Fehler beim Pingen für Ticket {ticket_id}: {e}")
-                    tickets_to_remove.append(ticket_id)
-        except Exception as e:
-            print(f"❌ Fehler beim Parsen der Zeit für Ticket {ticket_id}: {e}")
-            tickets_to_remove.append(ticket_id)
-    
-    # Remove non-existent tickets
-    for ticket_id in tickets_to_remove:
-        if ticket_id in pending_tickets:
-            del pending_tickets[ticket_id]
+    # Find the ticket channel
+    ticket_channel = bot.get_channel(int(ticket_id))
+    if not ticket_channel:
+        # Ticket doesn't exist anymore, remove from tracking
+        await ticket_db.delete_pending_tickets([ticket_id])
+        return
     
-    save_pending_tickets(pending_tickets)
+    # Get HV | Team role
+    hv_team_role = discord.utils.get(ticket_channel.guild.roles, name="HV | Team")
+    if hv_team_role:
+        embed = discord.Embed(
+            title="⏰ Team-Erinnerung",
+            description=f"{hv_team_role.mention}\n\nDieses Ticket wartet seit **30 Minuten** auf eine Antwort vom Team.",
+            color=0xff9500,
+            timestamp=now
+        )
+        embed.set_footer(text="Haze Visuals • Automatische Erinnerung")
+        
+        await ticket_channel.send(embed=embed)
+        
+        # Mark as pinged
+        await ticket_db.update_pending_ticket(ticket_id, pinged=True)
+        tickets_logger.info(f"📨 Team gepingt für Ticket {ticket_channel.name}")
+    else:
+        # Without the role there is nobody to ping - clear the flag so a restart does not reschedule it
+        await ticket_db.update_pending_ticket(ticket_id, needs_ping=False)
+        tickets_logger.warning(f"⚠️ Rolle 'HV | Team' fehlt auf {ticket_channel.guild.name} - Erinnerung für {ticket_channel.name} verworfen")
 
-async def log_unavailable_appointment(slot_key, user_name, bot):
+async def log_unavailable_appointment(guild_id, slot_key, user_name, bot):
     """Log when a user tries to book an unavailable appointment"""
     try:
-        log_channel = bot.get_channel(1413668409853345792)
+        guild = bot.get_guild(guild_id)
+        log_channel = resolve_calendar_channel(guild) if guild else None
         if log_channel:
             # Parse slot info
             date_part, time_part = slot_key.split('_')
@@ -2154,7 +4109,7 @@ async def log_unavailable_appointment(slot_key, user_name, bot):
             
             await log_channel.send(embed=embed)
     except Exception as e:
-        print(f"❌ Fehler beim Loggen des unavailable appointments: {e}")
+        calendar_logger.error(f"❌ Fehler beim Loggen des unavailable appointments: {e}")
 
 # Appointment Selection UI
 async def show_appointment_selection(ticket_channel, user, ticket_name, ticket_created_at=None):
@@ -2183,11 +4138,11 @@ async def show_appointment_selection(ticket_channel, user, ticket_name, ticket_c
     
     embed = discord.Embed(
         title="📅 Termin buchen",
-        description=f"Hallo {user.mention}! 🎉\n\nDeine Zahlung wurde bestätigt! Jetzt kannst du einen Termin für die Bearbeitung deiner Bestellung buchen.\n\n⏰ **Verfügbare Zeiten:** Täglich 18:00 - 22:00 Uhr (Berlin Zeit)\n🕐 **Dauer:** 30 Minuten pro Termin",
+        description=f"Hallo {user.mention}! 🎉\n\nDeine Zahlung wurde bestätigt! Jetzt kannst du einen Termin für die Bearbeitung deiner Bestellung buchen.\n\n⏰ **Verfügbare Zeiten:** Täglich {appointment_slots.hours_label} Uhr (Berlin Zeit)\n🕐 **Dauer:** {appointment_slots.slot_minutes} Minuten pro Termin",
         color=0x00ff00
     )
     # Get available slots
-    available_slots = get_available_time_slots(ticket_created_at)
+    available_slots = await get_available_time_slots(ticket_channel.guild.id, ticket_created_at)
     
     if not available_slots:
         embed.add_field(
@@ -2256,8 +4211,8 @@ class AppointmentTimeView(View):
         self.ticket_name = ticket_name
         self.selected_date = selected_date
         
-        # Add time slot buttons
-        for slot in slots:
+        # Add time slot buttons (a view holds at most 25 components)
+        for slot in slots[:25]:
             button = Button(
                 label=slot['time'], 
                 style=discord.ButtonStyle.success,
@@ -2276,7 +4231,7 @@ class AppointmentTimeView(View):
         
         # Book the appointment
         bot = interaction.client
-        success, message = await book_appointment(slot_key, self.user.id, self.user.display_name, self.ticket_name, bot)
+        success, message = await book_appointment(interaction.guild_id, slot_key, self.user.id, self.user.display_name, self.ticket_name, bot)
         
         if success:
             # Parse slot info for display
@@ -2309,115 +4264,106 @@ class AppointmentTimeView(View):
                 description=f"Dein Termin ist am **{weekday}, {date_display} um {time_part} Uhr**.\n\nBitte mache dir bis dahin Gedanken wie deine Kleidung aussehen soll und sammele ggf. Beispiele die du dem Designer im Design Prozess direkt zeigen kannst, damit es keine unnötigen Verzögerungen gibt.\n\n**Wenn du ein Logo hast, sende es bitte ins Ticket rein!**",
                 color=0x9b59b6
             )
-            prep_embed.set_footer(text="Haze Visuals • Design Vorbereitung")
-            await interaction.followup.send(embed=prep_embed)
-            
-        else:
-            await interaction.response.send_message(f"❌ {message}", ephemeral=True)
-
-# Discount Code Management Functions
-def load_discount_codes():
-    """Load discount codes from JSON file with enhanced structure"""
-    try:
-        with open('discount_codes.json', 'r') as f:
-            codes = json.load(f)
-            
-            # Migrate old format to new format if needed
-            migrated_codes = {}
-            for code, value in codes.items():
-                if isinstance(value, dict):
-                    # Already new format
-                    migrated_codes[code] = value
-                else:
-                    # Old format - migrate to new structure
-                    migrated_codes[code] = {
-                        "type": "percentage",
-                        "value": value,
-                        "max_uses": -1,  # -1 = unlimited, 1 = single use
-                        "current_uses": 0,
-                        "used_by": [],
-                        "auto_delete": False,  # Auto-delete after use
-                        "created_at": int(datetime.now().timestamp()),
-                        "description": f"{int(value * 100)}% Rabatt"
-                    }
-            
-            # Save migrated format
-            if codes != migrated_codes:
-                save_discount_codes(migrated_codes)
-                print("✅ Discount codes migrated to new format")
-            
-            return migrated_codes
-            
-    except FileNotFoundError:
-        # Return default codes in new format
-        default_codes = {
-            "FIJI": {
-                "type": "percentage",
-                "value": 0.10,
-                "max_uses": -1,
-                "current_uses": 0,
-                "used_by": [],
-                "auto_delete": False,
-                "created_at": int(datetime.now().timestamp()),
-                "description": "10% Rabatt"
-            },
-            "CATLEEN": {
-                "type": "percentage", 
-                "value": 0.10,
-                "max_uses": -1,
-                "current_uses": 0,
-                "used_by": [],
-                "auto_delete": False,
-                "created_at": int(datetime.now().timestamp()),
-                "description": "10% Rabatt"
-            },
-            "STILLES": {
-                "type": "percentage",
-                "value": 0.10,
-                "max_uses": -1,
-                "current_uses": 0,
-                "used_by": [],
-                "auto_delete": False,
-                "created_at": int(datetime.now().timestamp()),
-                "description": "10% Rabatt"
-            }
-        }
-        save_discount_codes(default_codes)
-        return default_codes
-    except json.JSONDecodeError:
-        print("❌ Fehler beim Laden der Discount Codes")
+            prep_embed.set_footer(text="Haze Visuals • Design Vorbereitung")
+            await interaction.followup.send(embed=prep_embed)
+            
+        else:
+            await interaction.response.send_message(f"❌ {message}", ephemeral=True)
+
+# Discount Code Management Functions
+async def load_discount_codes():
+    """Load all discount codes from the database"""
+    try:
+        return await ticket_db.get_discount_codes()
+    except Exception as e:
+        payments_logger.error(f"❌ Fehler beim Laden der Discount Codes: {e}")
         return {}
 
-def save_discount_codes(codes):
-    """Save discount codes to JSON file with enhanced structure"""
+async def save_discount_codes(codes):
+    """Replace all discount codes in the database"""
+    try:
+        await ticket_db.replace_discount_codes({code: normalize_discount_code(value) for code, value in codes.items()})
+    except Exception as e:
+        payments_logger.error(f"❌ Fehler beim Speichern der Discount Codes: {e}")
+
+async def save_discount_code(code, code_data):
+    """Create or update a single discount code"""
     try:
-        with open('discount_codes.json', 'w', encoding='utf-8') as f:
-            json.dump(codes, f, indent=2, ensure_ascii=False)
+        await ticket_db.put_discount_code(code, normalize_discount_code(code_data))
     except Exception as e:
-        print(f"❌ Fehler beim Speichern der Discount Codes: {e}")
+        payments_logger.error(f"❌ Fehler beim Speichern des Discount Codes {code}: {e}")
+
+def percentile(samples, pct):
+    """Return the pct-th percentile (0-100) of a list of numbers"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+class DiscountRedemptionEngine:
+    """Redeems discount codes atomically and keeps redemption latency metrics"""
+    def __init__(self, db, sample_size=1000):
+        self.db = db
+        self.latencies_ms = collections.deque(maxlen=sample_size)
+        self.outcomes = collections.Counter()
+        self.retries = 0
+    
+    async def redeem(self, code, user_id):
+        """Consume one use of ``code`` for ``user_id``.
+
+        Returns a dict with status, code_data (as it was before this use),
+        attempts and latency_ms.
+        """
+        started = time.perf_counter()
+        status, code_data, attempts = await self.db.redeem_discount_code(code, user_id)
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.latencies_ms.append(latency_ms)
+        self.outcomes[status] += 1
+        self.retries += attempts - 1
+        return {
+            'status': status,
+            'code_data': code_data,
+            'attempts': attempts,
+            'latency_ms': latency_ms
+        }
+    
+    def stats(self):
+        """Aggregated redemption metrics"""
+        samples = list(self.latencies_ms)
+        return {
+            'total': sum(self.outcomes.values()),
+            'outcomes': dict(self.outcomes),
+            'retries': self.retries,
+            'p50_ms': percentile(samples, 50),
+            'p99_ms': percentile(samples, 99),
+            'max_ms': max(samples) if samples else 0.0
+        }
 
-def validate_and_use_discount_code(code, user_id, price_str):
+discount_redemptions = DiscountRedemptionEngine(ticket_db)
+
+async def validate_and_use_discount_code(code, user_id, price_str):
     """Validate discount code and calculate discount. Returns (success, new_price, discount_text, message)"""
     try:
         # Parse price (remove € and convert to float)
         base_price = float(price_str.replace('€', '').replace(',', '.'))
         
-        discount_codes = load_discount_codes()
         code_upper = code.upper()
         
-        if code_upper not in discount_codes:
-            return False, price_str, "", f"❌ Discount Code '{code}' nicht gefunden."
-        
-        code_data = discount_codes[code_upper]
+        # Check and consume one use atomically
+        result = await discount_redemptions.redeem(code_upper, user_id)
+        status = result['status']
+        code_data = result['code_data']
         
-        # Check if code has usage limit
-        if code_data.get("max_uses", -1) != -1:  # Not unlimited
-            if code_data.get("current_uses", 0) >= code_data.get("max_uses", 0):
-                return False, price_str, "", f"❌ Discount Code '{code}' wurde bereits verwendet und ist nicht mehr gültig."
-            
-            # Check if user already used this code
-            if user_id in code_data.get("used_by", []):
-                return False, price_str, "", f"❌ Du hast den Discount Code '{code}' bereits verwendet."
+        if status == 'not_found':
+            return False, price_str, "", f"❌ Discount Code '{code}' nicht gefunden."
+        if status == 'exhausted':
+            return False, price_str, "", f"❌ Discount Code '{code}' wurde bereits verwendet und ist nicht mehr gültig."
+        if status == 'already_used':
+            return False, price_str, "", f"❌ Du hast den Discount Code '{code}' bereits verwendet."
+        if status != 'redeemed':
+            payments_logger.warning(f"⚠️ Discount Code '{code_upper}' konnte nach {result['attempts']} Versuchen nicht eingelöst werden")
+            return False, price_str, "", "❌ Der Code wird gerade verwendet. Bitte versuche es erneut."
         
         # Calculate discount
         discount_type = code_data.get("type", "percentage")
@@ -2435,34 +4381,24 @@ def validate_and_use_discount_code(code, user_id, price_str):
         # Ensure price doesn't go negative
         new_price = max(0, new_price)
         
-        # Update usage statistics
-        code_data["current_uses"] = code_data.get("current_uses", 0) + 1
-        if user_id not in code_data.get("used_by", []):
-            code_data.setdefault("used_by", []).append(user_id)
-        
-        # Check if code should be auto-deleted after use
+        # Check if code was auto-deleted after use
         auto_delete = code_data.get("auto_delete", False)
         is_single_use = code_data.get("max_uses", -1) == 1
         
         success_message = f"✅ Discount Code '{code}' angewendet!"
         
         if auto_delete and is_single_use:
-            # Delete the code completely after first use
-            del discount_codes[code_upper]
             success_message += f" (Code wurde automatisch gelöscht)"
-            print(f"🗑️ Auto-delete: Code '{code_upper}' wurde nach Verwendung gelöscht")
+            payments_logger.info(f"🗑️ Auto-delete: Code '{code_upper}' wurde nach Verwendung gelöscht")
         elif is_single_use:
             success_message += f" (Einmalig verwendbar - jetzt deaktiviert)"
         
-        # Save updated codes
-        save_discount_codes(discount_codes)
-        
         return True, f"{new_price:.2f}€", discount_text, success_message
         
     except ValueError:
         return False, price_str, "", "❌ Fehler beim Berechnen des Rabatts."
     except Exception as e:
-        print(f"❌ Fehler bei Discount Code Validierung: {e}")
+        payments_logger.error(f"❌ Fehler bei Discount Code Validierung: {e}")
         return False, price_str, "", "❌ Ein Fehler ist aufgetreten."
 
 
@@ -2491,22 +4427,16 @@ async def add_discount_cmd(interaction: discord.Interaction, code: str, percenta
         )
         return
     
-    # Load existing codes
-    discount_codes = load_discount_codes()
-    
     # Add new code
     code_upper = code.upper()
     discount_value = percentage / 100
-    discount_codes[code_upper] = discount_value
-    
-    # Save updated codes
-    save_discount_codes(discount_codes)
+    await save_discount_code(code_upper, discount_value)
     
     await interaction.response.send_message(
         f"✅ Discount Code `{code_upper}` wurde hinzugefügt mit {percentage}% Rabatt!", 
         ephemeral=True
     )
-    print(f"➕ Discount Code hinzugefügt: {code_upper} - {percentage}% von {interaction.user}")
+    payments_logger.info(f"➕ Discount Code hinzugefügt: {code_upper} - {percentage}% von {interaction.user}")
 
 # Slash Command: /discountremove
 @bot.tree.command(name="discountremove", description="Entferne einen Discount Code (nur für Administratoren)")
@@ -2523,29 +4453,20 @@ async def remove_discount_cmd(interaction: discord.Interaction, code: str):
             )
             return
     
-    # Load existing codes
-    discount_codes = load_discount_codes()
-    
-    # Check if code exists
+    # Remove code
     code_upper = code.upper()
-    if code_upper not in discount_codes:
+    if not await ticket_db.delete_discount_code(code_upper):
         await interaction.response.send_message(
             f"❌ Discount Code `{code_upper}` wurde nicht gefunden.", 
             ephemeral=True
         )
         return
     
-    # Remove code
-    del discount_codes[code_upper]
-    
-    # Save updated codes
-    save_discount_codes(discount_codes)
-    
     await interaction.response.send_message(
         f"✅ Discount Code `{code_upper}` wurde erfolgreich entfernt!", 
         ephemeral=True
     )
-    print(f"➖ Discount Code entfernt: {code_upper} von {interaction.user}")
+    payments_logger.info(f"➖ Discount Code entfernt: {code_upper} von {interaction.user}")
 
 # Slash Command: /discountlist (bonus command to view all codes)
 @bot.tree.command(name="discountlist", description="Zeige alle verfügbaren Discount Codes (nur für Administratoren)")
@@ -2563,7 +4484,7 @@ async def list_discount_cmd(interaction: discord.Interaction):
             return
     
     # Load existing codes
-    discount_codes = load_discount_codes()
+    discount_codes = await load_discount_codes()
     
     if not discount_codes:
         await interaction.response.send_message("📋 Keine Discount Codes vorhanden.", ephemeral=True)
@@ -2590,6 +4511,170 @@ async def list_discount_cmd(interaction: discord.Interaction):
 async def create_ticket(interaction: discord.Interaction, ticket_type: str):
     await create_ticket_with_form(interaction, ticket_type, None)
 
+# Ticket Management Buttons (Claim / Paid / Finished / Close)
+def has_ticket_staff_role(interaction, role_name):
+    staff_role = discord.utils.get(interaction.guild.roles, name=role_name)
+    return staff_role in interaction.user.roles or interaction.user.guild_permissions.administrator
+
+async def handle_ticket_claim(interaction, ticket):
+    # Prüfe HV | Team Rolle
+    server_config = get_server_config(interaction.guild.id)
+    if not has_ticket_staff_role(interaction, server_config["roles"]["staff_role"]):
+        await interaction.response.send_message("❌ Nur HV | Team kann Tickets claimen.", ephemeral=True)
+        return
+    
+    await interaction.response.send_message(f"✅ Ticket wurde von {interaction.user.mention} übernommen!")
+    tickets_logger.info(f"🏷️ Ticket {ticket['channel_name']} wurde von {interaction.user} geclaimed")
+    
+    # Mark ticket as responded to
+    await mark_ticket_responded(ticket['channel_id'])
+    
+    # Log ticket claim
+    await log_ticket_event(interaction.guild, "claimed", interaction.user, ticket['channel_name'])
+
+async def handle_ticket_paid(interaction, ticket):
+    guild = interaction.guild
+    
+    # Prüfe HV | Team Rolle
+    server_config = get_server_config(guild.id)
+    if not has_ticket_staff_role(interaction, server_config["roles"]["staff_role"]):
+        await interaction.response.send_message("❌ Nur HV | Team kann Tickets als bezahlt markieren.", ephemeral=True)
+        return
+    
+    # Role assignment and the rate-limited channel rename can take longer than Discord's 3 seconds
+    await interaction.response.defer()
+    
+    ticket_channel = await resolve_ticket_channel(interaction, ticket)
+    user = await resolve_ticket_member(guild, ticket)
+    
+    # Get form data to extract faction name
+    form_data = await get_ticket_form_data(ticket['channel_name'])
+    faction_name = form_data.get('faction', 'unknown')
+    
+    # Assign Customer role to ticket creator (with enhanced error handling)
+    try:
+        customer_role_name = server_config["roles"]["customer_role"]
+        customer_role = discord.utils.get(guild.roles, name=customer_role_name)
+        if user is None:
+            tickets_logger.warning(f"⚠️ Cannot assign Customer role: {ticket['user_name']} is no longer on the server")
+        elif customer_role:
+            # Check if bot has permission to assign roles
+            bot_member = guild.get_member(bot.user.id)
+            if bot_member and bot_member.guild_permissions.manage_roles:
+                # Check if bot's highest role is higher than customer role
+                if bot_member.top_role > customer_role:
+                    await user.add_roles(customer_role)
+                    tickets_logger.info(f"✅ Customer role assigned to {user}")
+                else:
+                    tickets_logger.warning(f"⚠️ Cannot assign Customer role: Bot role is not high enough in hierarchy")
+            else:
+                tickets_logger.warning(f"⚠️ Cannot assign Customer role: Bot missing 'Manage Roles' permission")
+        else:
+            tickets_logger.error(f"❌ Customer role '{customer_role_name}' not found in guild")
+    except discord.errors.Forbidden:
+        tickets_logger.warning(f"⚠️ Cannot assign Customer role: Missing permissions or role hierarchy issue")
+    except Exception as e:
+        tickets_logger.error(f"❌ Error assigning Customer role: {e}")
+    
+    # Move to paid category and rename with faction name
+    paid_category_id = server_config.get("categories", {}).get("paid", 1413892803162800178)
+    paid_category = guild.get_channel(paid_category_id)
+    if paid_category:
+        # Format: Faction-paid-username (e.g., Zakura-paid-haze219)
+        new_name = f"{faction_name.lower()}-paid-{ticket['user_name'].lower()}"
+        await ticket_channel.edit(name=new_name, category=paid_category)
+        await open_tickets.update_stage(ticket['channel_id'], "paid")
+        
+        response_message = f"💰 Ticket als bezahlt markiert und verschoben!\n👤 Customer Rolle zugewiesen\n🏷️ Umbenannt zu: {new_name}"
+        await interaction.followup.send(response_message)
+        tickets_logger.info(f"💰 Ticket zu {new_name} umbenannt und in Paid-Kategorie verschoben")
+        
+        # Trigger appointment selection for the customer
+        if user is not None:
+            await show_appointment_selection(ticket_channel, user, ticket['channel_name'], None)
+    else:
+        await interaction.followup.send("❌ Paid-Kategorie nicht gefunden.", ephemeral=True)
+
+async def handle_ticket_finished(interaction, ticket):
+    guild = interaction.guild
+    
+    # Prüfe HV | Team Rolle
+    server_config = get_server_config(guild.id)
+    if not has_ticket_staff_role(interaction, server_config["roles"]["staff_role"]):
+        await interaction.response.send_message("❌ Nur HV | Team kann Tickets als fertig markieren.", ephemeral=True)
+        return
+    
+    # The channel rename is rate limited and can take longer than Discord's 3 seconds
+    await interaction.response.defer()
+    
+    # Move to review category and rename
+    try:
+        review_category_id = server_config.get("categories", {}).get("finished", 1413893025620299837)
+        review_category = guild.get_channel(review_category_id)
+        if not review_category:
+            await interaction.followup.send(f"❌ Review-Kategorie ({review_category_id}) nicht gefunden.", ephemeral=True)
+            tickets_logger.error(f"❌ Review-Kategorie mit ID {review_category_id} nicht gefunden")
+            return
+        
+        ticket_channel = await resolve_ticket_channel(interaction, ticket)
+        new_name = f"clothing-review-{ticket['user_name'].lower()}"
+        await ticket_channel.edit(name=new_name, category=review_category)
+        await open_tickets.update_stage(ticket['channel_id'], "finished")
+        
+        await interaction.followup.send("✅ Ticket als fertig markiert! Review-System wird gestartet...")
+        
+        # Log ticket finished
+        await log_ticket_event(guild, "finished", interaction.user, new_name)
+        
+        # Start review system automatically
+        user = await resolve_ticket_member(guild, ticket)
+        if user is not None:
+            await start_review_system(ticket_channel, user)
+        tickets_logger.info(f"✅ Ticket zu {new_name} umbenannt und in Review-Kategorie verschoben")
+        
+    except Exception as e:
+        tickets_logger.error(f"❌ Fehler beim Verschieben des Tickets: {e}")
+        await interaction.followup.send("❌ Fehler beim Verschieben des Tickets.", ephemeral=True)
+
+async def handle_ticket_close(interaction, ticket):
+    # Prüfe HV | Team Rolle
+    if not has_ticket_staff_role(interaction, "HV | Team"):
+        await interaction.response.send_message("❌ Nur HV | Team kann Tickets schließen.", ephemeral=True)
+        return
+    
+    # Free up any appointments associated with this ticket
+    freed_appointments = await free_ticket_appointments(ticket['guild_id'], ticket['channel_name'])
+    
+    close_message = "🔒 Ticket wird geschlossen..."
+    if freed_appointments > 0:
+        close_message += f"\n📅 {freed_appointments} Termin(e) wurden automatisch freigegeben."
+    
+    ticket_channel = await resolve_ticket_channel(interaction, ticket)
+    await interaction.response.send_message(close_message)
+    await ticket_channel.delete(reason=f"Ticket geschlossen von {interaction.user}")
+    await open_tickets.close(ticket['channel_id'])
+    tickets_logger.info(f"🔒 Ticket {ticket['channel_name']} geschlossen von {interaction.user}")
+    
+    # Update ticket counter after closing ticket
+    await update_ticket_counter_channel(interaction.guild)
+
+@register_ticket_view
+class TicketControlView(TicketStageView):
+    """Ticket Management Buttons (nur für HV | Team)"""
+    prefix = "ticketctl"
+    buttons = (
+        ("claim", "🏷️ Claim", discord.ButtonStyle.success),
+        ("paid", "💰 Paid", discord.ButtonStyle.primary),
+        ("finished", "✅ Finished", discord.ButtonStyle.success),
+        ("close", "🔒 Close", discord.ButtonStyle.danger),
+    )
+    handlers = {
+        "claim": handle_ticket_claim,
+        "paid": handle_ticket_paid,
+        "finished": handle_ticket_finished,
+        "close": handle_ticket_close,
+    }
+
 async def create_ticket_with_form(interaction: discord.Interaction, ticket_type: str, form_data=None):
     guild = interaction.guild
     user = interaction.user
@@ -2630,21 +4715,12 @@ async def create_ticket_with_form(interaction: discord.Interaction, ticket_type:
     category_id = config["category_id"]
     
     # Prüfe Ticket-Limit (maximal 10 offene Tickets pro User)
-    user_tickets = []
-    username_lower = user.name.lower()
-    
-    # Zähle alle Tickets des Users (in allen Kategorien)
-    for channel in guild.channels:
-        if isinstance(channel, discord.TextChannel):
-            # Prüfe auf Ticket-Pattern: ticket-typ-username oder username-status-typ
-            channel_name_lower = channel.name.lower()
-            if (username_lower in channel_name_lower and 
-                any(pattern in channel_name_lower for pattern in ['clothing-', 'support-', 'bug-', 'vorschlag-', 'ticket-', f'-{username_lower}'])):
-                user_tickets.append(channel)
+    await open_tickets.ready()
+    user_tickets = open_tickets.user_tickets(guild.id, user.id)
     
     # Limit von 10 Tickets pro User
     if len(user_tickets) >= 10:
-        ticket_list = "\n".join([f"• {ticket.mention}" for ticket in user_tickets[:5]])
+        ticket_list = "\n".join([f"• <#{channel_id}>" for channel_id in user_tickets[:5]])
         if len(user_tickets) > 5:
             ticket_list += f"\n• ... und {len(user_tickets) - 5} weitere"
         
@@ -2713,155 +4789,22 @@ async def create_ticket_with_form(interaction: discord.Interaction, ticket_type:
             embed.add_field(name="Deine Angaben", value=form_text, inline=False)
             
             # Store form data for later use (when ticket is marked as paid)
-            store_ticket_form_data(channel_name, form_data)
-            print(f"📋 Form data gespeichert für Ticket: {channel_name}")
+            await store_ticket_form_data(channel_name, form_data)
+            tickets_logger.info(f"📋 Form data gespeichert für Ticket: {channel_name}")
         
         embed.set_footer(text="Haze Visuals • Ticket System")
         
-        # Ticket Management Buttons (nur für HV | Team)
-        ticket_view = View(timeout=None)
-        
-        claim_button = Button(label="🏷️ Claim", style=discord.ButtonStyle.success)
-        paid_button = Button(label="💰 Paid", style=discord.ButtonStyle.primary)
-        finished_button = Button(label="✅ Finished", style=discord.ButtonStyle.success)
-        close_button = Button(label="🔒 Close", style=discord.ButtonStyle.danger)
-        
-        async def claim_ticket_callback(claim_interaction):
-            # Prüfe HV | Team Rolle
-            server_config = get_server_config(guild.id)
-            staff_role_name = server_config["roles"]["staff_role"]
-            hv_team_role = discord.utils.get(claim_interaction.guild.roles, name=staff_role_name)
-            if hv_team_role not in claim_interaction.user.roles and not claim_interaction.user.guild_permissions.administrator:
-                await claim_interaction.response.send_message("❌ Nur HV | Team kann Tickets claimen.", ephemeral=True)
-                return
-            
-            await claim_interaction.response.send_message(f"✅ Ticket wurde von {claim_interaction.user.mention} übernommen!")
-            print(f"🏷️ Ticket {channel_name} wurde von {claim_interaction.user} geclaimed")
-            
-            # Mark ticket as responded to
-            await mark_ticket_responded(ticket_channel.id)
-            
-            # Log ticket claim
-            await log_ticket_event(guild, "claimed", claim_interaction.user, channel_name)
-        
-        async def paid_ticket_callback(paid_interaction):
-            # Prüfe HV | Team Rolle
-            server_config = get_server_config(guild.id)
-            staff_role_name = server_config["roles"]["staff_role"]
-            hv_team_role = discord.utils.get(paid_interaction.guild.roles, name=staff_role_name)
-            if hv_team_role not in paid_interaction.user.roles and not paid_interaction.user.guild_permissions.administrator:
-                await paid_interaction.response.send_message("❌ Nur HV | Team kann Tickets als bezahlt markieren.", ephemeral=True)
-                return
-            
-            # Get form data to extract faction name
-            form_data = get_ticket_form_data(channel_name)
-            faction_name = form_data.get('faction', 'unknown')
-            
-            # Assign Customer role to ticket creator (with enhanced error handling)
-            try:
-                customer_role_name = server_config["roles"]["customer_role"]
-                customer_role = discord.utils.get(guild.roles, name=customer_role_name)
-                if customer_role:
-                    # Check if bot has permission to assign roles
-                    bot_member = guild.get_member(bot.user.id)
-                    if bot_member and bot_member.guild_permissions.manage_roles:
-                        # Check if bot's highest role is higher than customer role
-                        if bot_member.top_role > customer_role:
-                            await user.add_roles(customer_role)
-                            print(f"✅ Customer role assigned to {user}")
-                        else:
-                            print(f"⚠️ Cannot assign Customer role: Bot role is not high enough in hierarchy")
-                    else:
-                        print(f"⚠️ Cannot assign Customer role: Bot missing 'Manage Roles' permission")
-                else:
-                    print(f"❌ Customer role '{customer_role_name}' not found in guild")
-            except discord.errors.Forbidden:
-                print(f"⚠️ Cannot assign Customer role: Missing permissions or role hierarchy issue")
-            except Exception as e:
-                print(f"❌ Error assigning Customer role: {e}")
-            
-            # Move to paid category and rename with faction name
-            paid_category_id = server_config.get("categories", {}).get("paid", 1413892803162800178)
-            paid_category = guild.get_channel(paid_category_id)
-            if paid_category:
-                # Format: Faction-paid-username (e.g., Zakura-paid-haze219)
-                new_name = f"{faction_name.lower()}-paid-{user.name.lower()}"
-                await ticket_channel.edit(name=new_name, category=paid_category)
-                
-                response_message = f"💰 Ticket als bezahlt markiert und verschoben!\n👤 Customer Rolle zugewiesen\n🏷️ Umbenannt zu: {new_name}"
-                await paid_interaction.response.send_message(response_message)
-                print(f"💰 Ticket zu {new_name} umbenannt und in Paid-Kategorie verschoben")
-                
-                # Trigger appointment selection for the customer (need to get ticket creation time)
-                # For now, we'll use None - in future we could store ticket creation time
-                await show_appointment_selection(ticket_channel, user, channel_name, None)
-            else:
-                await paid_interaction.response.send_message("❌ Paid-Kategorie nicht gefunden.", ephemeral=True)
-        
-        async def finished_ticket_callback(finished_interaction):
-            # Prüfe HV | Team Rolle
-            server_config = get_server_config(guild.id)
-            staff_role_name = server_config["roles"]["staff_role"]
-            hv_team_role = discord.utils.get(finished_interaction.guild.roles, name=staff_role_name)
-            if hv_team_role not in finished_interaction.user.roles and not finished_interaction.user.guild_permissions.administrator:
-                await finished_interaction.response.send_message("❌ Nur HV | Team kann Tickets als fertig markieren.", ephemeral=True)
-                return
-            
-            # Move to review category and rename
-            try:
-                review_category_id = server_config.get("categories", {}).get("finished", 1413893025620299837)
-                review_category = guild.get_channel(review_category_id)
-                if not review_category:
-                    await finished_interaction.response.send_message(f"❌ Review-Kategorie ({review_category_id}) nicht gefunden.", ephemeral=True)
-                    print(f"❌ Review-Kategorie mit ID {review_category_id} nicht gefunden")
-                    return
-                
-                new_name = f"clothing-review-{user.name.lower()}"
-                await ticket_channel.edit(name=new_name, category=review_category)
-                
-                await finished_interaction.response.send_message("✅ Ticket als fertig markiert! Review-System wird gestartet...")
-                
-                # Log ticket finished
-                await log_ticket_event(guild, "finished", finished_interaction.user, new_name)
-                
-                # Start review system automatically
-                await start_review_system(ticket_channel, user)
-                print(f"✅ Ticket zu {new_name} umbenannt und in Review-Kategorie verschoben")
-                
-            except Exception as e:
-                print(f"❌ Fehler beim Verschieben des Tickets: {e}")
-                await finished_interaction.response.send_message("❌ Fehler beim Verschieben des Tickets.", ephemeral=True)
-        
-        async def close_ticket_callback(close_interaction):
-            # Prüfe HV | Team Rolle
-            hv_team_role = discord.utils.get(close_interaction.guild.roles, name="HV | Team")
-            if hv_team_role not in close_interaction.user.roles and not close_interaction.user.guild_permissions.administrator:
-                await close_interaction.response.send_message("❌ Nur HV | Team kann Tickets schließen.", ephemeral=True)
-                return
-            
-            # Free up any appointments associated with this ticket
-            freed_appointments = await free_ticket_appointments(channel_name)
-            
-            close_message = "🔒 Ticket wird geschlossen..."
-            if freed_appointments > 0:
-                close_message += f"\n📅 {freed_appointments} Termin(e) wurden automatisch freigegeben."
-                
-            await close_interaction.response.send_message(close_message)
-            await ticket_channel.delete(reason=f"Ticket geschlossen von {close_interaction.user}")
-            print(f"🔒 Ticket {channel_name} geschlossen von {close_interaction.user}")
-            
-            # Update ticket counter after closing ticket
-            await update_ticket_counter_channel(guild)
-        
-        claim_button.callback = claim_ticket_callback
-        paid_button.callback = paid_ticket_callback
-        finished_button.callback = finished_ticket_callback
-        close_button.callback = close_ticket_callback
-        
-        ticket_view.add_item(claim_button)
-        ticket_view.add_item(paid_button)
-        ticket_view.add_item(finished_button)
-        ticket_view.add_item(close_button)
+        # Ticket Management Buttons (nur für HV | Team) - Zustand liegt in der Datenbank
+        await open_tickets.open({
+            "channel_id": ticket_channel.id,
+            "guild_id": guild.id,
+            "user_id": user.id,
+            "user_name": user.name,
+            "ticket_type": ticket_type,
+            "channel_name": channel_name,
+            "created_at": interaction.created_at.timestamp()
+        })
+        ticket_view = TicketControlView(ticket_channel.id)
         
         # Send initial message and clothing selection in one optimized call
         await ticket_channel.send(embed=embed, view=ticket_view)
@@ -2881,40 +4824,16 @@ async def create_ticket_with_form(interaction: discord.Interaction, ticket_type:
                 )
                 
                 # Create clothing selection buttons
-                clothing_view = View(timeout=None)
-                options = [
-                    ("🎨 Custom", "custom"),
-                    ("✅ Finished", "finished"), 
-                    ("❓ Fragen", "fragen")
-                ]
-                
-                def create_option_callback(option_type):
-                    async def option_callback(option_interaction):
-                        if option_interaction.user != user:
-                            await option_interaction.response.send_message("❌ Nur der Ticket-Ersteller kann antworten.", ephemeral=True)
-                            return
-                        
-                        if option_type == "custom":
-                            await start_custom_order(ticket_channel, user, option_interaction)
-                        elif option_type == "finished":
-                            await show_finished_info(ticket_channel, user, option_interaction)
-                        elif option_type == "fragen":
-                            await show_questions_info(ticket_channel, user, option_interaction)
-                    return option_callback
-                
-                for label, option_type in options:
-                    button = Button(label=label, style=discord.ButtonStyle.primary)
-                    button.callback = create_option_callback(option_type)
-                    clothing_view.add_item(button)
+                clothing_view = ClothingOptionsView(ticket_channel.id)
                 
                 # Send clothing selection (no banner to reduce API calls)
                 await ticket_channel.send(embed=clothing_embed, view=clothing_view)
-                print(f"✅ Optimized clothing selection started for ticket: {channel_name}")
+                tickets_logger.info(f"✅ Optimized clothing selection started for ticket: {channel_name}")
                 
             except Exception as e:
-                print(f"❌ Fehler beim Starten der Clothing Selection: {e}")
+                tickets_logger.error(f"❌ Fehler beim Starten der Clothing Selection: {e}")
                 # Simple fallback without additional API calls
-                print(f"⚠️ Fallback: User kann manuell mit Team chatten in {channel_name}")
+                tickets_logger.warning(f"⚠️ Fallback: User kann manuell mit Team chatten in {channel_name}")
         
         # Minimal delay to prevent rate limiting
         await asyncio.sleep(0.3)
@@ -2933,11 +4852,11 @@ async def create_ticket_with_form(interaction: discord.Interaction, ticket_type:
                 ephemeral=True
             )
             
-            # Update counter AFTER everything else is done (with longer delay)
-            asyncio.create_task(delayed_counter_update(guild, 3.0))
+            # Update counter AFTER everything else is done (renames are coalesced)
+            await update_ticket_counter_channel(guild)
         except discord.errors.HTTPException as http_error:
             if http_error.status == 429:  # Rate limited
-                print(f"⚠️ Rate limited during final operations - ticket still created successfully")
+                tickets_logger.warning(f"⚠️ Rate limited during final operations - ticket still created successfully")
                 await asyncio.sleep(2.0)  # Wait longer on rate limit
                 try:
                     await interaction.followup.send(
@@ -2945,11 +4864,11 @@ async def create_ticket_with_form(interaction: discord.Interaction, ticket_type:
                         ephemeral=True
                     )
                 except:
-                    print(f"✅ Ticket {channel_name} created successfully (confirmation delayed due to rate limits)")
+                    tickets_logger.info(f"✅ Ticket {channel_name} created successfully (confirmation delayed due to rate limits)")
             else:
-                print(f"⚠️ HTTP error in final ticket operations: {http_error}")
+                tickets_logger.warning(f"⚠️ HTTP error in final ticket operations: {http_error}")
         except Exception as final_error:
-            print(f"⚠️ Non-critical error in final ticket operations: {final_error}")
+            tickets_logger.warning(f"⚠️ Non-critical error in final ticket operations: {final_error}")
             # Still confirm ticket creation even if logging fails
             try:
                 await interaction.followup.send(
@@ -2957,18 +4876,29 @@ async def create_ticket_with_form(interaction: discord.Interaction, ticket_type:
                     ephemeral=True
                 )
             except:
-                print(f"✅ Ticket {channel_name} created successfully (confirmation failed due to rate limits)")
+                tickets_logger.info(f"✅ Ticket {channel_name} created successfully (confirmation failed due to rate limits)")
         
-        print(f"🎫 Neues Ticket erstellt: {channel_name} von {user} (Typ: {ticket_type})")
+        tickets_logger.info(f"🎫 Neues Ticket erstellt: {channel_name} von {user} (Typ: {ticket_type})")
         
     except Exception as e:
-        print(f"❌ Fehler beim Erstellen des Tickets: {e}")
+        tickets_logger.error(f"❌ Fehler beim Erstellen des Tickets: {e}")
         await interaction.followup.send(
             "❌ Fehler beim Erstellen des Tickets. Bitte kontaktiere einen Administrator.", 
             ephemeral=True
         )
 
 # Review system
+async def open_review_modal(interaction, ticket, rating):
+    await interaction.response.send_modal(ReviewModal(interaction.user, rating))
+
+@register_ticket_view
+class ReviewRatingView(TicketStageView):
+    """Sterne-Bewertung 1-5 am Ende eines Tickets"""
+    prefix = "ticketreview"
+    buttons = tuple((str(rating), f"{rating}⭐", discord.ButtonStyle.secondary) for rating in range(1, 6))
+    handlers = {str(rating): functools.partial(open_review_modal, rating=rating) for rating in range(1, 6)}
+    owner_only = "❌ Nur der Kunde kann eine Bewertung abgeben."
+
 async def start_review_system(ticket_channel, user):
     embed = discord.Embed(
         title="⭐ Kundenbewertung",
@@ -2976,40 +4906,15 @@ async def start_review_system(ticket_channel, user):
         color=0xffd700
     )
     
-    review_view = View(timeout=None)
-    
-    # Create star rating buttons 1-5
-    star_buttons = [
-        ("1⭐", 1),
-        ("2⭐", 2), 
-        ("3⭐", 3),
-        ("4⭐", 4),
-        ("5⭐", 5)
-    ]
-    
-    def create_rating_callback(rating_value):
-        async def rating_callback(rating_interaction):
-            if rating_interaction.user.id != user.id:
-                await rating_interaction.response.send_message("❌ Nur der Kunde kann eine Bewertung abgeben.", ephemeral=True)
-                return
-            
-            # Open review modal
-            modal = ReviewModal(user, rating_value)
-            await rating_interaction.response.send_modal(modal)
-        return rating_callback
-    
-    for label, rating in star_buttons:
-        button = Button(label=label, style=discord.ButtonStyle.secondary)
-        button.callback = create_rating_callback(rating)
-        review_view.add_item(button)
+    review_view = ReviewRatingView(ticket_channel.id)
     
     await ticket_channel.send(embed=embed, view=review_view)
-    print(f"⭐ Review-System gestartet für {user} in {ticket_channel.name}")
+    tickets_logger.info(f"⭐ Review-System gestartet für {user} in {ticket_channel.name}")
 
 # Slash Command: /ticket_panel
 @bot.tree.command(name="ticket_panel", description="Erstelle das Ticket-Panel (nur für Administratoren)")
 async def ticket_panel_cmd(interaction: discord.Interaction):
-    print(f"🎫 /ticket_panel command verwendet von {interaction.user}")
+    commands_logger.info(f"🎫 /ticket_panel command verwendet von {interaction.user}")
     
     # Nur Administratoren können das Panel erstellen
     if not interaction.user.guild_permissions.administrator:
@@ -3045,7 +4950,6 @@ Klicke auf einen der Buttons unten, um ein Ticket zu erstellen:
         """,
         color=0x7289da
     )
-    embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757177441437.gif")
     embed.set_footer(text="Haze Visuals • Ticket System")
     
     # Ticket-Buttons
@@ -3071,22 +4975,21 @@ Klicke auf einen der Buttons unten, um ein Ticket zu erstellen:
         )
         view.add_item(button)
     
-    # Sende Banner als Datei mit
-    banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757177441437.gif", 
-                              filename="bannergif-ezgif.com-video-to-gif-converter_1757177441437.gif")
+    # Banner als Embed-Bild (einmal hochgeladen, danach per URL)
+    banner = await banner_attachment(interaction.guild, embed, PANEL_BANNER_PATH)
     
-    await interaction.response.send_message(embed=embed, view=view, file=banner_file)
-    print("✅ Ticket-Panel erfolgreich erstellt")
+    await interaction.response.send_message(embed=embed, view=view, **banner)
+    logger.info("✅ Ticket-Panel erfolgreich erstellt")
 
 # Helper function to create button callback
 def create_button_callback(kategorie_name):
     async def button_callback(interaction):
-        print(f"📌 Button geklickt: {kategorie_name} von {interaction.user}")
+        logger.info(f"📌 Button geklickt: {kategorie_name} von {interaction.user}")
         try:
             await interaction.response.send_message(f"**Preise für {kategorie_name}:**\n{preise[kategorie_name]}", ephemeral=True)
-            print(f"✅ Preis-Info für {kategorie_name} erfolgreich gesendet an {interaction.user}")
+            logger.info(f"✅ Preis-Info für {kategorie_name} erfolgreich gesendet an {interaction.user}")
         except Exception as e:
-            print(f"❌ Fehler beim Senden der Preis-Info für {kategorie_name}: {e}")
+            logger.error(f"❌ Fehler beim Senden der Preis-Info für {kategorie_name}: {e}")
             try:
                 await interaction.response.send_message("❌ Fehler beim Laden der Preisinformationen.", ephemeral=True)
             except:
@@ -3096,7 +4999,7 @@ def create_button_callback(kategorie_name):
 # Slash Command: /terminerefresh
 @bot.tree.command(name="terminerefresh", description="Lösche alle gebuchten Termine (nur für HV | Team)")
 async def termine_refresh_cmd(interaction: discord.Interaction):
-    print(f"📅 /terminerefresh command verwendet von {interaction.user}")
+    calendar_logger.info(f"📅 /terminerefresh command verwendet von {interaction.user}")
     
     # Check HV | Team role permission
     if not interaction.user.guild_permissions.administrator:
@@ -3110,23 +5013,23 @@ async def termine_refresh_cmd(interaction: discord.Interaction):
     
     try:
         # Clear all appointments
-        cleared_count = await clear_all_appointments()
+        cleared_count = await clear_all_appointments(interaction.guild.id)
         
         if cleared_count > 0:
             await interaction.response.send_message(
                 f"✅ **Termine erfolgreich gelöscht!**\n\n📅 **{cleared_count} Termine** wurden freigegeben und der Kalender wurde aktualisiert.\n\n🔄 Alle Terminslots sind jetzt wieder verfügbar.", 
                 ephemeral=True
             )
-            print(f"✅ {cleared_count} Termine von {interaction.user} gelöscht")
+            calendar_logger.info(f"✅ {cleared_count} Termine von {interaction.user} gelöscht")
         else:
             await interaction.response.send_message(
                 "ℹ️ Es waren keine Termine zum Löschen vorhanden.\n\nDer Kalender ist bereits vollständig frei.", 
                 ephemeral=True
             )
-            print(f"ℹ️ Keine Termine zum Löschen gefunden (angefragt von {interaction.user})")
+            calendar_logger.info(f"ℹ️ Keine Termine zum Löschen gefunden (angefragt von {interaction.user})")
             
     except Exception as e:
-        print(f"❌ Fehler in /terminerefresh command: {e}")
+        calendar_logger.error(f"❌ Fehler in /terminerefresh command: {e}")
         await interaction.response.send_message(
             "❌ Ein Fehler ist beim Löschen der Termine aufgetreten. Bitte kontaktiere einen Administrator.", 
             ephemeral=True
@@ -3520,10 +5423,18 @@ class ChannelsModal(Modal):
             max_length=20
         )
         
+        self.ticket_log_channel = TextInput(
+            label="Ticket-Log Kanal ID",
+            placeholder="ID des Kanals für das Ticket-Log...",
+            required=False,
+            max_length=20
+        )
+        
         self.add_item(self.welcome_channel)
         self.add_item(self.leave_channel)
         self.add_item(self.calendar_channel)
         self.add_item(self.review_channel)
+        self.add_item(self.ticket_log_channel)
     
     async def on_submit(self, interaction: discord.Interaction):
         config = get_server_config(self.guild_id)
@@ -3537,6 +5448,8 @@ class ChannelsModal(Modal):
             config["channels"]["calendar_channel"] = int(self.calendar_channel.value)
         if self.review_channel.value:
             config["channels"]["review_channel"] = int(self.review_channel.value)
+        if self.ticket_log_channel.value:
+            config["channels"]["ticket_log_channel"] = int(self.ticket_log_channel.value)
         
         save_server_config(self.guild_id, config)
         
@@ -3640,7 +5553,7 @@ class SetupView(View):
 # Slash Command: /setup
 @bot.tree.command(name="setup", description="Bot Setup für neue Server (nur für Administratoren)")
 async def setup_cmd(interaction: discord.Interaction):
-    print(f"⚙️ /setup command verwendet von {interaction.user} in {interaction.guild.name}")
+    commands_logger.info(f"⚙️ /setup command verwendet von {interaction.user} in {interaction.guild.name}")
     
     # Only administrators can use setup
     if not interaction.user.guild_permissions.administrator:
@@ -3700,8 +5613,10 @@ class PersistentPricesView(View):
 @bot.event
 async def on_interaction(interaction):
     """Globaler Handler für persistente Button-Interaktionen"""
+    watch_interaction_deadline(interaction)
     if interaction.type != discord.InteractionType.component:
         return
+    bind_interaction_log_context(interaction)
     
     custom_id = interaction.data.get("custom_id", "")
     
@@ -3722,6 +5637,11 @@ async def on_interaction(interaction):
         await interaction.response.send_message("❌ Kategorie nicht gefunden.", ephemeral=True)
         return
     
+    # Handle persistente Ticket-Views (Claim/Paid/Finished/Close, Bestelloptionen, Reviews)
+    elif custom_id.partition("_")[0] in TICKET_VIEW_ROUTES:
+        await dispatch_ticket_view(interaction, custom_id)
+        return
+    
     # Handle Ticket Buttons
     elif custom_id.startswith("ticket_"):
         ticket_types = {
@@ -3767,7 +5687,7 @@ async def on_interaction(interaction):
 
 @bot.tree.command(name="preise", description="Zeigt die Preisliste an")
 async def preise_cmd(interaction: discord.Interaction):
-    print(f"📌 /preise command verwendet von {interaction.user}")
+    payments_logger.info(f"📌 /preise command verwendet von {interaction.user}")
     try:
         # Persistente View (funktioniert nach Bot-Neustart)
         view = PersistentPricesView()
@@ -3788,9 +5708,9 @@ async def preise_cmd(interaction: discord.Interaction):
         """
         
         await interaction.response.send_message(banner, view=view)
-        print("✅ Preise message erfolgreich gesendet")
+        logger.info("✅ Preise message erfolgreich gesendet")
     except Exception as e:
-        print(f"❌ Fehler in /preise command: {e}")
+        logger.error(f"❌ Fehler in /preise command: {e}")
         try:
             await interaction.response.send_message("❌ Ein Fehler ist aufgetreten.", ephemeral=True)
         except:
@@ -4095,7 +6015,7 @@ async def show_discount_config(interaction):
         return
     
     # Load current discount codes
-    discount_codes = load_discount_codes()
+    discount_codes = await load_discount_codes()
     
     embed = discord.Embed(
         title="🎟️ Discount Codes Konfiguration",
@@ -5003,8 +6923,7 @@ async def show_pricing_categories_modal(interaction):
     
     try:
         # Lade aktuelle Preis-Daten
-        with open('prices.json', 'r', encoding='utf-8') as f:
-            current_prices = json.load(f)
+        current_prices = read_json_file('prices.json')
     except FileNotFoundError:
         current_prices = {}
     
@@ -5072,8 +6991,7 @@ async def show_add_category_modal(interaction):
 async def show_edit_category_modal(interaction):
     """Interface für Kategorie bearbeiten"""
     try:
-        with open('prices.json', 'r', encoding='utf-8') as f:
-            current_prices = json.load(f)
+        current_prices = read_json_file('prices.json')
     except FileNotFoundError:
         await interaction.response.send_message("❌ Keine Preisdaten gefunden!", ephemeral=True)
         return
@@ -5115,8 +7033,7 @@ async def show_edit_category_modal(interaction):
 async def edit_category_items(interaction, category_name):
     """Bearbeite Items einer Kategorie"""
     try:
-        with open('prices.json', 'r', encoding='utf-8') as f:
-            current_prices = json.load(f)
+        current_prices = read_json_file('prices.json')
     except FileNotFoundError:
         await interaction.response.send_message("❌ Preisdaten nicht gefunden!", ephemeral=True)
         return
@@ -5199,8 +7116,7 @@ async def setup_default_categories(interaction):
     
     # Speichere Standard-Kategorien
     try:
-        with open('prices.json', 'w', encoding='utf-8') as f:
-            json.dump(default_categories, f, indent=2, ensure_ascii=False)
+        write_json_file('prices.json', default_categories)
         
         embed = discord.Embed(
             title="✅ Standard-Setup abgeschlossen",
@@ -5219,7 +7135,7 @@ async def setup_default_categories(interaction):
             inline=False
         )
         
-        print("✅ Standard-Preiskategorien eingerichtet")
+        admin_logger.info("✅ Standard-Preiskategorien eingerichtet")
         
     except Exception as e:
         embed = discord.Embed(
@@ -5227,7 +7143,7 @@ async def setup_default_categories(interaction):
             description=f"Es gab einen Fehler beim Einrichten: {str(e)}",
             color=0xff0000
         )
-        print(f"❌ Fehler beim Standard-Setup: {e}")
+        admin_logger.error(f"❌ Fehler beim Standard-Setup: {e}")
     
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
@@ -5262,21 +7178,19 @@ async def confirm_delete_category(interaction, category_name):
 async def delete_category_confirmed(interaction, category_name):
     """Kategorie tatsächlich löschen"""
     try:
-        with open('prices.json', 'r', encoding='utf-8') as f:
-            current_prices = json.load(f)
+        current_prices = read_json_file('prices.json')
         
         if category_name in current_prices:
             del current_prices[category_name]
             
-            with open('prices.json', 'w', encoding='utf-8') as f:
-                json.dump(current_prices, f, indent=2, ensure_ascii=False)
+            write_json_file('prices.json', current_prices)
             
             embed = discord.Embed(
                 title="✅ Kategorie gelöscht",
                 description=f"Kategorie **{category_name}** wurde erfolgreich entfernt.",
                 color=0x00ff00
             )
-            print(f"✅ Kategorie gelöscht: {category_name}")
+            shop_logger.info(f"✅ Kategorie gelöscht: {category_name}")
         else:
             embed = discord.Embed(
                 title="❌ Fehler",
@@ -5289,7 +7203,7 @@ async def delete_category_confirmed(interaction, category_name):
             description=f"Fehler: {str(e)}",
             color=0xff0000
         )
-        print(f"❌ Fehler beim Löschen der Kategorie: {e}")
+        shop_logger.error(f"❌ Fehler beim Löschen der Kategorie: {e}")
     
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
@@ -5327,8 +7241,7 @@ class AddCategoryModal(Modal):
         try:
             # Lade aktuelle Preise
             try:
-                with open('prices.json', 'r', encoding='utf-8') as f:
-                    current_prices = json.load(f)
+                current_prices = read_json_file('prices.json')
             except FileNotFoundError:
                 current_prices = {}
             
@@ -5352,8 +7265,7 @@ class AddCategoryModal(Modal):
                 current_prices[category_name][item_name] = price_value
             
             # Speichere Änderungen
-            with open('prices.json', 'w', encoding='utf-8') as f:
-                json.dump(current_prices, f, indent=2, ensure_ascii=False)
+            write_json_file('prices.json', current_prices)
             
             embed = discord.Embed(
                 title="✅ Kategorie hinzugefügt",
@@ -5368,7 +7280,7 @@ class AddCategoryModal(Modal):
                     inline=False
                 )
             
-            print(f"✅ Neue Kategorie erstellt: {category_name}")
+            shop_logger.info(f"✅ Neue Kategorie erstellt: {category_name}")
             
         except Exception as e:
             embed = discord.Embed(
@@ -5376,7 +7288,7 @@ class AddCategoryModal(Modal):
                 description=f"Fehler beim Erstellen der Kategorie: {str(e)}",
                 color=0xff0000
             )
-            print(f"❌ Fehler beim Erstellen der Kategorie: {e}")
+            shop_logger.error(f"❌ Fehler beim Erstellen der Kategorie: {e}")
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
@@ -5415,8 +7327,7 @@ class AddItemToCategoryModal(Modal):
     async def on_submit(self, interaction: discord.Interaction):
         try:
             # Lade aktuelle Preise
-            with open('prices.json', 'r', encoding='utf-8') as f:
-                current_prices = json.load(f)
+            current_prices = read_json_file('prices.json')
             
             if self.category_name not in current_prices:
                 await interaction.response.send_message(
@@ -5440,8 +7351,7 @@ class AddItemToCategoryModal(Modal):
             current_prices[self.category_name][item_name] = price_value
             
             # Speichere Änderungen
-            with open('prices.json', 'w', encoding='utf-8') as f:
-                json.dump(current_prices, f, indent=2, ensure_ascii=False)
+            write_json_file('prices.json', current_prices)
             
             embed = discord.Embed(
                 title="✅ Produkt hinzugefügt",
@@ -5462,7 +7372,7 @@ class AddItemToCategoryModal(Modal):
                     inline=False
                 )
             
-            print(f"✅ Neues Produkt hinzugefügt: {item_name} in {self.category_name}")
+            shop_logger.info(f"✅ Neues Produkt hinzugefügt: {item_name} in {self.category_name}")
             
         except Exception as e:
             embed = discord.Embed(
@@ -5470,7 +7380,7 @@ class AddItemToCategoryModal(Modal):
                 description=f"Fehler beim Hinzufügen des Produkts: {str(e)}",
                 color=0xff0000
             )
-            print(f"❌ Fehler beim Hinzufügen des Produkts: {e}")
+            shop_logger.error(f"❌ Fehler beim Hinzufügen des Produkts: {e}")
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
@@ -5485,7 +7395,7 @@ async def show_add_discount_modal(interaction):
 
 async def show_remove_discount_modal(interaction):
     """Zeige Discount entfernen Interface"""
-    discount_codes = load_discount_codes()
+    discount_codes = await load_discount_codes()
     
     if not discount_codes:
         await interaction.response.send_message(
@@ -5541,7 +7451,7 @@ async def show_bulk_discount_modal(interaction):
         color=0x0099ff
     )
     
-    discount_codes = load_discount_codes()
+    discount_codes = await load_discount_codes()
     
     embed.add_field(
         name="📊 Statistiken:",
@@ -5636,9 +7546,9 @@ class AddDiscountModal(Modal):
                     return
             
             # Code erstellen
-            discount_codes = load_discount_codes()
+            existing_code = await ticket_db.get_discount_code(code)
             
-            if code in discount_codes:
+            if existing_code is not None:
                 await interaction.response.send_message(
                     f"❌ Code **{code}** existiert bereits!",
                     ephemeral=True
@@ -5646,16 +7556,14 @@ class AddDiscountModal(Modal):
                 return
             
             # Neuen Code hinzufügen
-            discount_codes[code] = {
+            await save_discount_code(code, {
                 'discount': discount,
                 'uses': 0,
                 'max_uses': max_uses,
                 'description': self.description.value.strip(),
                 'created_at': datetime.now().isoformat(),
                 'created_by': interaction.user.id
-            }
-            
-            save_discount_codes(discount_codes)
+            })
             
             embed = discord.Embed(
                 title="✅ Discount-Code erstellt!",
@@ -5702,12 +7610,7 @@ async def confirm_remove_discount(interaction, code):
 
 async def delete_discount_confirmed(interaction, code):
     """Discount-Code tatsächlich löschen"""
-    discount_codes = load_discount_codes()
-    
-    if code in discount_codes:
-        del discount_codes[code]
-        save_discount_codes(discount_codes)
-        
+    if await ticket_db.delete_discount_code(code):
         embed = discord.Embed(
             title="✅ Code gelöscht",
             description=f"**{code}** wurde erfolgreich entfernt.",
@@ -5745,7 +7648,7 @@ async def bulk_disable_discounts(interaction):
 
 async def confirm_bulk_disable(interaction):
     """Alle Codes tatsächlich löschen"""
-    save_discount_codes({})  # Leeres Dictionary = alle Codes gelöscht
+    await save_discount_codes({})  # Leeres Dictionary = alle Codes gelöscht
     
     embed = discord.Embed(
         title="✅ Alle Codes gelöscht",
@@ -5757,7 +7660,7 @@ async def confirm_bulk_disable(interaction):
 
 async def bulk_reset_uses(interaction):
     """Nutzungszähler aller Codes zurücksetzen"""
-    discount_codes = load_discount_codes()
+    discount_codes = await load_discount_codes()
     
     if not discount_codes:
         await interaction.response.send_message(
@@ -5770,7 +7673,7 @@ async def bulk_reset_uses(interaction):
     for code in discount_codes:
         discount_codes[code]['uses'] = 0
     
-    save_discount_codes(discount_codes)
+    await save_discount_codes(discount_codes)
     
     embed = discord.Embed(
         title="✅ Nutzungen zurückgesetzt",
@@ -5782,7 +7685,7 @@ async def bulk_reset_uses(interaction):
 
 async def export_discount_codes(interaction):
     """Discount-Codes exportieren"""
-    discount_codes = load_discount_codes()
+    discount_codes = await load_discount_codes()
     
     if not discount_codes:
         await interaction.response.send_message(
@@ -6594,6 +8497,7 @@ BOT_VERSION = "2.5.0"  # Update this when making changes
 LAST_UPDATE_HASH = None
 
 @tasks.loop(hours=1)  # Check for updates every hour
+@metrics.timed('ticketbot_background_task_seconds', task='check_for_updates')
 async def check_for_updates():
     """Check for bot updates automatically"""
     try:
@@ -6606,7 +8510,7 @@ async def check_for_updates():
             return
         
         if current_hash != LAST_UPDATE_HASH:
-            print(f"🔄 Bot-Update erkannt! Neue Version: {BOT_VERSION}")
+            updater_logger.info(f"🔄 Bot-Update erkannt! Neue Version: {BOT_VERSION}")
             
             # Update all Discord components
             await update_all_ticket_panels()
@@ -6615,7 +8519,7 @@ async def check_for_updates():
             LAST_UPDATE_HASH = current_hash
             
     except Exception as e:
-        print(f"⚠️ Update-Check Fehler: {e}")
+        updater_logger.warning(f"⚠️ Update-Check Fehler: {e}")
 
 def get_bot_file_hash():
     """Get hash of main bot file to detect changes"""
@@ -6651,15 +8555,15 @@ async def update_all_ticket_panels():
                         await create_ticket_panel_in_channel(channel)
                         updated_servers += 1
                         
-                        print(f"✅ Ticket-Panel aktualisiert für: {guild.name}")
+                        updater_logger.info(f"✅ Ticket-Panel aktualisiert für: {guild.name}")
                         
             except Exception as e:
-                print(f"⚠️ Panel-Update Fehler für {guild.name}: {e}")
+                updater_logger.warning(f"⚠️ Panel-Update Fehler für {guild.name}: {e}")
         
-        print(f"🎯 {updated_servers} Server-Panels erfolgreich aktualisiert")
+        updater_logger.info(f"🎯 {updated_servers} Server-Panels erfolgreich aktualisiert")
         
     except Exception as e:
-        print(f"❌ Panel-Update Fehler: {e}")
+        updater_logger.error(f"❌ Panel-Update Fehler: {e}")
 
 async def notify_admins_about_update():
     """Notify server admins about bot updates"""
@@ -6693,12 +8597,12 @@ async def notify_admins_about_update():
                     notified_guilds += 1
                     
             except Exception as e:
-                print(f"⚠️ Benachrichtigung Fehler für {guild.name}: {e}")
+                updater_logger.warning(f"⚠️ Benachrichtigung Fehler für {guild.name}: {e}")
         
-        print(f"📢 {notified_guilds} Server über Update benachrichtigt")
+        updater_logger.info(f"📢 {notified_guilds} Server über Update benachrichtigt")
         
     except Exception as e:
-        print(f"❌ Admin-Benachrichtigung Fehler: {e}")
+        updater_logger.error(f"❌ Admin-Benachrichtigung Fehler: {e}")
 
 async def create_ticket_panel_in_channel(channel):
     """Create ticket panel in specified channel"""
@@ -6709,7 +8613,6 @@ async def create_ticket_panel_in_channel(channel):
             description="Willkommen beim Haze Visuals Support-System!\n\nWähle die passende Kategorie für dein Anliegen:",
             color=0x2ecc71
         )
-        embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
         embed.set_footer(text=f"Haze Visuals Bot v{BOT_VERSION} • Automatisch aktualisiert")
         
         # Create ticket buttons
@@ -6729,8 +8632,7 @@ async def create_ticket_panel_in_channel(channel):
             ticket_view.add_item(button)
         
         # Send with banner
-        banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-        await channel.send(embed=embed, view=ticket_view, file=banner_file)
+        await channel.send(embed=embed, view=ticket_view, **await banner_attachment(channel.guild, embed))
         
         # Save panel channel ID
         server_config = get_server_config(channel.guild.id)
@@ -6738,7 +8640,7 @@ async def create_ticket_panel_in_channel(channel):
         save_server_config(channel.guild.id, server_config)
         
     except Exception as e:
-        print(f"❌ Panel-Erstellung Fehler: {e}")
+        tickets_logger.error(f"❌ Panel-Erstellung Fehler: {e}")
 
 def create_ticket_callback(ticket_type):
     """Create callback for ticket creation"""
@@ -6787,8 +8689,363 @@ async def force_update_command(interaction: discord.Interaction):
 # GIVEAWAY SYSTEM
 # ========================================
 
-# Global storage for active giveaways
-active_giveaways = {}
+GIVEAWAY_EMOJI = "🎉"
+GIVEAWAY_UPDATE_INTERVAL = float(os.getenv('GIVEAWAY_UPDATE_INTERVAL', '15'))
+
+GIVEAWAY_MAX_WINNERS = 20
+
+def parse_giveaway_rules(text, guild):
+    """Parse ``gewinner=3; rolle=Customer; alter=30; gewicht=Booster:2`` into draw rules.
+
+    ``rolle`` may be given several times (all roles are required), weights
+    are ``role:weight`` pairs separated by commas. Raises ValueError with a
+    German message for invalid input.
+    """
+    rules = {"winners": 1, "required_roles": [], "min_account_age_days": 0, "role_weights": {}}
+    
+    def find_role(name):
+        role = discord.utils.get(guild.roles, name=name.strip())
+        if role is None:
+            raise ValueError(f"Rolle '{name.strip()}' nicht gefunden")
+        return role
+    
+    def number(key, value, kind=int):
+        try:
+            return kind(value)
+        except ValueError:
+            raise ValueError(f"Ungültiger Wert für '{key}': {value}") from None
+    
+    for part in (text or "").split(';'):
+        key, _, value = part.partition('=')
+        key, value = key.strip().lower(), value.strip()
+        if not key:
+            continue
+        if key == "gewinner":
+            rules["winners"] = number(key, value)
+            if not 1 <= rules["winners"] <= GIVEAWAY_MAX_WINNERS:
+                raise ValueError(f"Gewinner muss zwischen 1 und {GIVEAWAY_MAX_WINNERS} liegen")
+        elif key == "rolle":
+            rules["required_roles"].append(find_role(value).id)
+        elif key == "alter":
+            rules["min_account_age_days"] = number(key, value)
+        elif key == "gewicht":
+            for item in value.split(','):
+                name, _, weight = item.rpartition(':')
+                rules["role_weights"][str(find_role(name).id)] = number(key, weight, float)
+        else:
+            raise ValueError(f"Unbekannte Regel '{key}'")
+    return rules
+
+def describe_giveaway_rules(giveaway):
+    lines = []
+    if giveaway.get("required_roles"):
+        lines.append("🎭 Benötigte Rolle(n): " + ", ".join(f"<@&{role_id}>" for role_id in giveaway["required_roles"]))
+    if giveaway.get("min_account_age_days"):
+        lines.append(f"📆 Account mindestens {giveaway['min_account_age_days']} Tage alt")
+    for role_id, weight in (giveaway.get("role_weights") or {}).items():
+        lines.append(f"⚖️ <@&{role_id}> zählt {weight:g}x")
+    return lines
+
+class GiveawayDraw:
+    """Reproducible weighted draw of giveaway winners.
+
+    Every entrant gets the key ``u ** (1 / weight)`` with ``u`` taken from a
+    ``random.Random(seed)`` in user id order; the highest keys win (weighted
+    sampling without replacement). Requirements and weights are evaluated in
+    one pass over the entrants using the roles recorded when they entered
+    (entries without recorded roles are fetched) - account age comes from the
+    user id itself. Candidates are popped from a heap, so re-rolling an
+    invalid winner is cheap. The same seed, ``drawn_at`` timestamp and entries
+    give the same order, independent of the member cache - so a saved draw
+    can be re-run for an audit.
+    """
+    def __init__(self, guild, giveaway, seed, drawn_at=None):
+        self.guild = guild
+        self.seed = seed
+        self.drawn_at = time.time() if drawn_at is None else drawn_at
+        self.required_roles = set(giveaway.get("required_roles") or ())
+        self.role_weights = {int(role_id): weight for role_id, weight in (giveaway.get("role_weights") or {}).items()}
+        min_age = giveaway.get("min_account_age_days") or 0
+        # Snowflakes start with their creation time, so the age check is an integer comparison
+        self.max_user_id = (
+            discord.utils.time_snowflake(datetime.fromtimestamp(self.drawn_at, pytz.UTC) - timedelta(days=min_age), high=True)
+            if min_age else None
+        )
+        self.participants = giveaway["participants"]  # user_id -> role ids at entry, None if unknown
+        self.entrants = len(self.participants)
+        self.eligible = 0
+        self.rerolls = 0
+        self._heap = None
+    
+    def _weight(self, role_ids):
+        """Weight of an entrant with ``role_ids``, 0 if a requirement is not met"""
+        if not self.required_roles <= role_ids:
+            return 0.0
+        return max((self.role_weights[role_id] for role_id in role_ids & self.role_weights.keys()), default=1.0)
+    
+    async def _entry_roles(self, user_id):
+        roles = self.participants[user_id]
+        if roles is not None:
+            return set(roles)
+        # Entered before roles were recorded - look the member up once
+        member = await resolve_member(self.guild, user_id)
+        return None if member is None else {role.id for role in member.roles}
+    
+    async def _rank(self):
+        rng = random.Random(self.seed)
+        heap = []
+        for user_id in sorted(self.participants):
+            u = rng.random()  # drawn for every entrant so filters do not shift the others' keys
+            if self.max_user_id is not None and user_id > self.max_user_id:
+                continue
+            role_ids = await self._entry_roles(user_id)
+            weight = 0.0 if role_ids is None else self._weight(role_ids)
+            if weight <= 0:
+                continue
+            heap.append((-(u ** (1.0 / weight)), user_id))
+        heapq.heapify(heap)
+        self.eligible = len(heap)
+        return heap
+    
+    async def _resolve(self, user_id):
+        member = await resolve_member(self.guild, user_id)
+        if member is None or not self.required_roles <= {role.id for role in member.roles}:
+            return None
+        return member
+    
+    async def winners(self, count):
+        """Draw up to ``count`` winners that are still valid members, re-rolling the others"""
+        if self._heap is None:
+            self._heap = await self._rank()
+        winners = []
+        while self._heap and len(winners) < count:
+            _, user_id = heapq.heappop(self._heap)
+            member = await self._resolve(user_id)
+            if member is None:
+                self.rerolls += 1
+                continue
+            winners.append(member)
+        return winners
+
+def build_giveaway_embed(giveaway):
+    """Embed of a running giveaway"""
+    embed = discord.Embed(
+        title="🎉 GIVEAWAY LÄUFT!",
+        description=f"**🎁 Preis:** {giveaway['prize']}\n\n**⏰ Endet:** <t:{int(giveaway['end_ts'])}:R>\n**📅 Endzeit:** <t:{int(giveaway['end_ts'])}:F>",
+        color=0xff6b35
+    )
+    
+    if giveaway.get("description"):
+        embed.add_field(
+            name="📝 Beschreibung:",
+            value=giveaway["description"],
+            inline=False
+        )
+    
+    if giveaway.get("requirements"):
+        embed.add_field(
+            name="📋 Teilnahmebedingungen:",
+            value=giveaway["requirements"],
+            inline=False
+        )
+    
+    embed.add_field(
+        name="🎯 Teilnahme:",
+        value=f"Reagiere mit {GIVEAWAY_EMOJI} um teilzunehmen!",
+        inline=False
+    )
+    
+    embed.add_field(
+        name="👥 Teilnehmer:",
+        value=str(len(giveaway.get("participants", ()))),
+        inline=True
+    )
+    
+    winner_count = giveaway.get("winners", 1)
+    embed.add_field(
+        name="🏆 Gewinner:",
+        value="Wird automatisch ausgewählt" if winner_count == 1 else f"{winner_count} Gewinner werden automatisch ausgewählt",
+        inline=True
+    )
+    
+    rule_lines = describe_giveaway_rules(giveaway)
+    if rule_lines:
+        embed.add_field(
+            name="⚙️ Regeln:",
+            value="\n".join(rule_lines),
+            inline=False
+        )
+    
+    embed.set_footer(text=f"Erstellt von {giveaway.get('creator_name', 'Team')} • Haze Visuals Bot")
+    embed.set_thumbnail(url="https://cdn.discordapp.com/emojis/1234567890123456789.png")  # You can replace with actual emoji URL
+    return embed
+
+class GiveawayEngine:
+    """Runs giveaways from gateway events instead of polling the message.
+
+    Entries come from raw reaction add/remove events and are written through
+    to the database, so running giveaways survive a restart; reactions made
+    while the bot was offline are reconciled once on start. Participant count
+    edits are coalesced to at most one per ``update_interval`` per giveaway,
+    and a single timer ends giveaways from a heap of end times. A giveaway
+    only counts as ended in the database once its winners are announced.
+    """
+    def __init__(self, db, update_interval):
+        self.db = db
+        self.update_interval = update_interval
+        self.active = {}         # giveaway_id -> data incl. "participants" (user_id -> role ids)
+        self._by_message = {}    # message_id -> giveaway_id
+        self._heap = []          # (end_ts, giveaway_id)
+        self._wakeup = asyncio.Event()
+        self._dirty = set()
+        self._flush_task = None
+        self._task = None
+        self.counters = collections.Counter()
+    
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    def _register(self, giveaway_id, giveaway):
+        self.active[giveaway_id] = giveaway
+        self._by_message[giveaway["message_id"]] = giveaway_id
+        heapq.heappush(self._heap, (giveaway["end_ts"], giveaway_id))
+        if self._heap[0][1] == giveaway_id:
+            self._wakeup.set()
+    
+    async def create(self, giveaway_id, giveaway):
+        """Persist a new giveaway and schedule its end"""
+        giveaway.setdefault("participants", {})
+        await self.db.put_giveaway(giveaway_id, giveaway)
+        self._register(giveaway_id, giveaway)
+    
+    async def finish(self, giveaway_id):
+        """Stop tracking a giveaway (entries are frozen). Returns its data, or None if it was not running.
+
+        The database row stays open until ``end_giveaway`` has saved and
+        announced the winners, so a restart in between ends it again.
+        """
+        giveaway = self.active.pop(giveaway_id, None)
+        if giveaway is None:
+            return None
+        self._by_message.pop(giveaway["message_id"], None)
+        self._dirty.discard(giveaway_id)
+        return giveaway
+    
+    async def on_reaction(self, payload, added):
+        giveaway_id = self._by_message.get(payload.message_id)
+        if giveaway_id is None or str(payload.emoji) != GIVEAWAY_EMOJI or payload.user_id == bot.user.id:
+            return
+        if added and payload.member is not None and payload.member.bot:
+            return
+        participants = self.active[giveaway_id]["participants"]
+        if added == (payload.user_id in participants):
+            return
+        if added:
+            # Roles at entry time decide requirements and weights in the draw
+            roles = [role.id for role in payload.member.roles] if payload.member is not None else None
+            participants[payload.user_id] = roles
+            await self.db.add_giveaway_entries(giveaway_id, {payload.user_id: roles})
+        else:
+            participants.pop(payload.user_id, None)
+            await self.db.remove_giveaway_entries(giveaway_id, [payload.user_id])
+        self.counters['reactions'] += 1
+        self.mark_dirty(giveaway_id)
+    
+    def mark_dirty(self, giveaway_id):
+        self._dirty.add(giveaway_id)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_counts())
+    
+    async def _flush_counts(self):
+        while self._dirty:
+            await asyncio.sleep(self.update_interval)
+            dirty, self._dirty = self._dirty, set()
+            # Only the edit batch is timed, not the wait before it
+            with metrics.timer('ticketbot_background_task_seconds', task='giveaway_counts'):
+                for giveaway_id in dirty:
+                    giveaway = self.active.get(giveaway_id)
+                    channel = giveaway and bot.get_channel(giveaway["channel_id"])
+                    if not channel:
+                        continue
+                    try:
+                        await channel.get_partial_message(giveaway["message_id"]).edit(embed=build_giveaway_embed(giveaway))
+                        self.counters['edits'] += 1
+                    except Exception as e:
+                        giveaway_logger.error(f"❌ Participant Update Error: {e}")
+    
+    async def _reconcile(self, giveaway_id):
+        """Catch up on reactions made while the bot was offline"""
+        giveaway = self.active[giveaway_id]
+        channel = bot.get_channel(giveaway["channel_id"])
+        if not channel:
+            return
+        try:
+            message = await channel.fetch_message(giveaway["message_id"])
+        except discord.NotFound:
+            return
+        
+        participants = {}
+        for reaction in message.reactions:
+            if str(reaction.emoji) == GIVEAWAY_EMOJI:
+                async for user in reaction.users():
+                    if not user.bot:
+                        participants[user.id] = [role.id for role in user.roles] if isinstance(user, discord.Member) else None
+                break
+        
+        added = {user_id: roles for user_id, roles in participants.items() if user_id not in giveaway["participants"]}
+        removed = giveaway["participants"].keys() - participants.keys()
+        # Entries that stayed keep the roles recorded when they entered
+        participants.update({user_id: giveaway["participants"][user_id] for user_id in participants.keys() - added.keys()})
+        if added:
+            await self.db.add_giveaway_entries(giveaway_id, added)
+        if removed:
+            await self.db.remove_giveaway_entries(giveaway_id, removed)
+        if added or removed:
+            giveaway["participants"] = participants
+            self.mark_dirty(giveaway_id)
+    
+    async def _run(self):
+        await bot.wait_until_ready()
+        for giveaway_id, giveaway in (await self.db.get_open_giveaways()).items():
+            if giveaway_id not in self.active:
+                self._register(giveaway_id, giveaway)
+        for giveaway_id in list(self.active):
+            if self.active[giveaway_id]["end_ts"] <= time.time():
+                continue  # entries closed at the end time, reactions after it do not count
+            try:
+                await self._reconcile(giveaway_id)
+            except Exception as e:
+                giveaway_logger.error(f"❌ Giveaway {giveaway_id} konnte nicht abgeglichen werden: {e}")
+        if self.active:
+            giveaway_logger.info(f"🎉 {len(self.active)} laufende(s) Giveaway(s) wiederhergestellt")
+        
+        while True:
+            # Drop giveaways that already ended
+            while self._heap and self._heap[0][1] not in self.active:
+                heapq.heappop(self._heap)
+            
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            if timeout is None or timeout > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            _, giveaway_id = heapq.heappop(self._heap)
+            await end_giveaway(giveaway_id)
+
+giveaways = GiveawayEngine(ticket_db, GIVEAWAY_UPDATE_INTERVAL)
+
+@bot.event
+async def on_raw_reaction_add(payload):
+    await giveaways.on_reaction(payload, added=True)
+
+@bot.event
+async def on_raw_reaction_remove(payload):
+    await giveaways.on_reaction(payload, added=False)
 
 @bot.tree.command(name="giveaway", description="Erstelle ein Giveaway mit automatischem Countdown und Gewinner-Auswahl")
 async def giveaway_command(interaction: discord.Interaction):
@@ -6839,10 +9096,18 @@ class GiveawaySetupModal(Modal):
             max_length=300
         )
         
+        self.rules = TextInput(
+            label="🏆 Gewinner & Regeln (optional)",
+            placeholder="z.B. gewinner=3; rolle=Customer; alter=30; gewicht=Booster:2",
+            required=False,
+            max_length=300
+        )
+        
         self.add_item(self.prize)
         self.add_item(self.duration)
         self.add_item(self.description)
         self.add_item(self.requirements)
+        self.add_item(self.rules)
     
     async def on_submit(self, interaction: discord.Interaction):
         try:
@@ -6856,6 +9121,13 @@ class GiveawaySetupModal(Modal):
                 await interaction.response.send_message("❌ Ungültige Dauer. Bitte gib eine Zahl in Minuten ein.", ephemeral=True)
                 return
             
+            # Validate draw rules
+            try:
+                rules = parse_giveaway_rules(self.rules.value, interaction.guild)
+            except ValueError as e:
+                await interaction.response.send_message(f"❌ Ungültige Regeln: {e}", ephemeral=True)
+                return
+            
             # Calculate end time
             end_time = datetime.now(pytz.UTC) + timedelta(minutes=duration_minutes)
             
@@ -6865,15 +9137,18 @@ class GiveawaySetupModal(Modal):
                 self.prize.value,
                 end_time,
                 self.description.value or None,
-                self.requirements.value or None
+                self.requirements.value or None,
+                rules
             )
             
         except Exception as e:
-            print(f"❌ Giveaway Setup Error: {e}")
+            giveaway_logger.error(f"❌ Giveaway Setup Error: {e}")
             await interaction.response.send_message(f"❌ Fehler beim Erstellen des Giveaways: {str(e)}", ephemeral=True)
 
-async def create_giveaway(interaction, prize, end_time, description=None, requirements=None):
+async def create_giveaway(interaction, prize, end_time, description=None, requirements=None, rules=None):
     """Create giveaway channel and message"""
+    # Channel creation, message and reaction take longer than Discord's 3 seconds under load
+    await interaction.response.defer(ephemeral=True, thinking=True)
     try:
         guild = interaction.guild
         
@@ -6909,84 +9184,40 @@ async def create_giveaway(interaction, prize, end_time, description=None, requir
                 manage_messages=True
             )
         
-        # Create channel with timestamp
-        channel_name = f"🎉-giveaway-{datetime.now().strftime('%m%d-%H%M')}"
-        giveaway_channel = await guild.create_text_channel(
-            name=channel_name,
-            topic=f"🎁 Giveaway: {prize} | Läuft bis {end_time.strftime('%d.%m.%Y %H:%M')} UTC",
-            overwrites=overwrites,
-            reason=f"Giveaway erstellt von {interaction.user.display_name}"
-        )
-        
-        # Create giveaway embed
-        time_left = end_time - datetime.now(pytz.UTC)
-        hours, remainder = divmod(int(time_left.total_seconds()), 3600)
-        minutes, _ = divmod(remainder, 60)
-        
-        embed = discord.Embed(
-            title="🎉 GIVEAWAY LÄUFT!",
-            description=f"**🎁 Preis:** {prize}\n\n**⏰ Endet:** <t:{int(end_time.timestamp())}:R>\n**📅 Endzeit:** <t:{int(end_time.timestamp())}:F>",
-            color=0xff6b35
-        )
-        
-        if description:
-            embed.add_field(
-                name="📝 Beschreibung:",
-                value=description,
-                inline=False
-            )
-        
-        if requirements:
-            embed.add_field(
-                name="📋 Teilnahmebedingungen:",
-                value=requirements,
-                inline=False
-            )
-        
-        embed.add_field(
-            name="🎯 Teilnahme:",
-            value="Reagiere mit 🎉 um teilzunehmen!",
-            inline=False
-        )
-        
-        embed.add_field(
-            name="👥 Teilnehmer:",
-            value="0",
-            inline=True
-        )
-        
-        embed.add_field(
-            name="🏆 Gewinner:",
-            value="Wird automatisch ausgewählt",
-            inline=True
+        # Create channel with timestamp
+        channel_name = f"🎉-giveaway-{datetime.now().strftime('%m%d-%H%M')}"
+        giveaway_channel = await guild.create_text_channel(
+            name=channel_name,
+            topic=f"🎁 Giveaway: {prize} | Läuft bis {end_time.strftime('%d.%m.%Y %H:%M')} UTC",
+            overwrites=overwrites,
+            reason=f"Giveaway erstellt von {interaction.user.display_name}"
         )
         
-        embed.set_footer(text=f"Erstellt von {interaction.user.display_name} • Haze Visuals Bot")
-        embed.set_thumbnail(url="https://cdn.discordapp.com/emojis/1234567890123456789.png")  # You can replace with actual emoji URL
-        
-        # Send giveaway message
-        giveaway_message = await giveaway_channel.send("@everyone 🎉 **NEUES GIVEAWAY!** 🎉", embed=embed)
-        
-        # Add reaction
-        await giveaway_message.add_reaction("🎉")
-        
-        # Store giveaway data
-        giveaway_id = f"{guild.id}_{giveaway_channel.id}_{giveaway_message.id}"
-        active_giveaways[giveaway_id] = {
+        # Create giveaway embed
+        giveaway = {
             "guild_id": guild.id,
             "channel_id": giveaway_channel.id,
-            "message_id": giveaway_message.id,
             "prize": prize,
-            "end_time": end_time,
+            "end_ts": end_time.timestamp(),
             "description": description,
             "requirements": requirements,
             "creator": interaction.user.id,
-            "participants": set(),
-            "ended": False
+            "creator_name": interaction.user.display_name,
+            "participants": {},
+            **(rules or parse_giveaway_rules(None, guild))
         }
+        embed = build_giveaway_embed(giveaway)
+        
+        # Send giveaway message
+        giveaway_message = await giveaway_channel.send("@everyone 🎉 **NEUES GIVEAWAY!** 🎉", embed=embed)
         
-        # Start countdown task
-        asyncio.create_task(giveaway_countdown(giveaway_id))
+        # Store giveaway data (the engine ends it on time, also after restarts)
+        giveaway_id = f"{guild.id}_{giveaway_channel.id}_{giveaway_message.id}"
+        giveaway["message_id"] = giveaway_message.id
+        await giveaways.create(giveaway_id, giveaway)
+        
+        # Add reaction
+        await giveaway_message.add_reaction(GIVEAWAY_EMOJI)
         
         # Confirm creation
         success_embed = discord.Embed(
@@ -6995,111 +9226,54 @@ async def create_giveaway(interaction, prize, end_time, description=None, requir
             color=0x00ff00
         )
         
-        await interaction.response.send_message(embed=success_embed, ephemeral=True)
-        print(f"✅ Giveaway erstellt: {giveaway_id}")
-        
-    except Exception as e:
-        print(f"❌ Giveaway Creation Error: {e}")
-        await interaction.response.send_message(f"❌ Fehler beim Erstellen des Giveaways: {str(e)}", ephemeral=True)
-
-async def giveaway_countdown(giveaway_id):
-    """Handle giveaway countdown and winner selection"""
-    try:
-        giveaway_data = active_giveaways.get(giveaway_id)
-        if not giveaway_data:
-            return
-        
-        while datetime.now(pytz.UTC) < giveaway_data["end_time"] and not giveaway_data["ended"]:
-            # Update every 60 seconds
-            await asyncio.sleep(60)
-            
-            # Update participant count
-            await update_giveaway_participants(giveaway_id)
-        
-        # End giveaway
-        if not giveaway_data["ended"]:
-            await end_giveaway(giveaway_id)
-            
-    except Exception as e:
-        print(f"❌ Giveaway Countdown Error: {e}")
-
-async def update_giveaway_participants(giveaway_id):
-    """Update participant count in giveaway message"""
-    try:
-        giveaway_data = active_giveaways.get(giveaway_id)
-        if not giveaway_data or giveaway_data["ended"]:
-            return
-        
-        guild = bot.get_guild(giveaway_data["guild_id"])
-        if not guild:
-            return
-        
-        channel = guild.get_channel(giveaway_data["channel_id"])
-        if not channel:
-            return
-        
-        try:
-            message = await channel.fetch_message(giveaway_data["message_id"])
-        except discord.NotFound:
-            return
-        
-        # Get reaction users
-        participants = set()
-        for reaction in message.reactions:
-            if str(reaction.emoji) == "🎉":
-                async for user in reaction.users():
-                    if not user.bot:
-                        participants.add(user.id)
-                break
-        
-        # Update stored participants
-        giveaway_data["participants"] = participants
-        
-        # Update embed
-        embed = message.embeds[0]
-        
-        # Find and update participant count field
-        for i, field in enumerate(embed.fields):
-            if field.name == "👥 Teilnehmer:":
-                embed.set_field_at(i, name="👥 Teilnehmer:", value=str(len(participants)), inline=True)
-                break
-        
-        await message.edit(embed=embed)
+        await interaction.followup.send(embed=success_embed, ephemeral=True)
+        giveaway_logger.info(f"✅ Giveaway erstellt: {giveaway_id}")
         
     except Exception as e:
-        print(f"❌ Participant Update Error: {e}")
+        giveaway_logger.error(f"❌ Giveaway Creation Error: {e}")
+        await interaction.followup.send(f"❌ Fehler beim Erstellen des Giveaways: {str(e)}", ephemeral=True)
 
+@metrics.timed('ticketbot_background_task_seconds', task='giveaway_end')
 async def end_giveaway(giveaway_id):
     """End giveaway and select winner"""
     try:
-        giveaway_data = active_giveaways.get(giveaway_id)
-        if not giveaway_data or giveaway_data["ended"]:
+        giveaway_data = await giveaways.finish(giveaway_id)
+        if not giveaway_data:
             return
         
-        giveaway_data["ended"] = True
-        
         guild = bot.get_guild(giveaway_data["guild_id"])
-        if not guild:
-            return
-        
-        channel = guild.get_channel(giveaway_data["channel_id"])
+        channel = guild.get_channel(giveaway_data["channel_id"]) if guild else None
         if not channel:
+            # Server or channel is gone - nothing left to announce
+            await ticket_db.set_giveaway_ended(giveaway_id)
             return
         
-        try:
-            message = await channel.fetch_message(giveaway_data["message_id"])
-        except discord.NotFound:
-            return
-        
-        # Get final participants
-        await update_giveaway_participants(giveaway_id)
-        participants = list(giveaway_data["participants"])
+        message = channel.get_partial_message(giveaway_data["message_id"])
         
-        if not participants:
-            # No participants
+        # Final participants are kept up to date by the reaction events
+        participants = giveaway_data["participants"]
+        if "winner_ids" in giveaway_data:
+            # Drawn before a restart - announce the saved result instead of drawing again
+            seed = giveaway_data["seed"]
+            winners = [member for member in [await resolve_member(guild, user_id)
+                                             for user_id in giveaway_data["winner_ids"]] if member]
+            giveaway_logger.info(f"🎲 Giveaway {giveaway_id}: gespeicherte Auslosung (Seed {seed}) wird verkündet")
+        else:
+            seed = random.SystemRandom().getrandbits(63)
+            draw = GiveawayDraw(guild, giveaway_data, seed)
+            winners = await draw.winners(giveaway_data.get("winners", 1))
+            await ticket_db.save_giveaway_result(giveaway_id, seed=seed, drawn_at=draw.drawn_at,
+                                                 winner_ids=[winner.id for winner in winners])
+            giveaway_logger.info(f"🎲 Giveaway {giveaway_id}: {len(winners)} Gewinner aus {draw.eligible}/{len(participants)} "
+                  f"gültigen Teilnehmern, {draw.rerolls} Neuauslosung(en), Seed {seed}")
+        
+        if not winners:
+            # No (valid) participants
             embed = discord.Embed(
                 title="🎉 GIVEAWAY BEENDET",
-                description=f"**🎁 Preis:** {giveaway_data['prize']}\n\n❌ **Keine Teilnehmer!**\nLeider hat niemand an diesem Giveaway teilgenommen.",
+                description=f"**🎁 Preis:** {giveaway_data['prize']}\n\n❌ **Keine Teilnehmer!**\nLeider hat niemand an diesem Giveaway teilgenommen."
+                if not participants else
+                f"**🎁 Preis:** {giveaway_data['prize']}\n\n❌ **Keine gültigen Teilnehmer!**\nKein Teilnehmer erfüllt die Teilnahmebedingungen.",
                 color=0xff0000
             )
             embed.set_footer(text="Haze Visuals Bot • Giveaway System")
@@ -7108,22 +9282,20 @@ async def end_giveaway(giveaway_id):
             await channel.send("😢 Das Giveaway ist ohne Teilnehmer zu Ende gegangen.")
             
         else:
-            # Select winner
-            winner_id = random.choice(participants)
-            winner = guild.get_member(winner_id)
+            mentions = ", ".join(winner.mention for winner in winners)
             
-            if winner:
-                # Update message
-                embed = discord.Embed(
-                    title="🎉 GIVEAWAY BEENDET!",
-                    description=f"**🎁 Preis:** {giveaway_data['prize']}\n\n🏆 **Gewinner:** {winner.mention}\n👥 **Teilnehmer:** {len(participants)}",
-                    color=0xffd700
-                )
-                embed.set_footer(text="Herzlichen Glückwunsch! • Haze Visuals Bot")
-                
-                await message.edit(embed=embed)
-                
-                # Send winner DM
+            # Update message
+            embed = discord.Embed(
+                title="🎉 GIVEAWAY BEENDET!",
+                description=f"**🎁 Preis:** {giveaway_data['prize']}\n\n🏆 **Gewinner:** {mentions}\n👥 **Teilnehmer:** {len(participants)}",
+                color=0xffd700
+            )
+            embed.set_footer(text=f"Herzlichen Glückwunsch! • Seed {seed} • Haze Visuals Bot")
+            
+            await message.edit(embed=embed)
+            
+            # Send winner DMs
+            for winner in winners:
                 try:
                     dm_embed = discord.Embed(
                         title="🎉 Du hast gewonnen!",
@@ -7133,29 +9305,29 @@ async def end_giveaway(giveaway_id):
                     dm_embed.set_footer(text="Haze Visuals Bot • Giveaway Gewinner")
                     
                     await winner.send(embed=dm_embed)
-                    print(f"✅ Winner DM sent to {winner.display_name}")
+                    giveaway_logger.info(f"✅ Winner DM sent to {winner.display_name}")
                     
                 except discord.Forbidden:
                     await channel.send(f"⚠️ {winner.mention} Konnte dir keine DM senden! Bitte melde dich bei einem Admin.")
-                
-                # Announce in channel
-                winner_announcement = discord.Embed(
-                    title="🏆 GEWINNER VERKÜNDET!",
-                    description=f"**{winner.mention} hat gewonnen!**\n\n🎁 **Preis:** {giveaway_data['prize']}\n🎯 **Aus {len(participants)} Teilnehmern ausgewählt**",
-                    color=0xffd700
-                )
-                
-                await channel.send(embed=winner_announcement)
-                
-                # Post in winner channel if configured
+            
+            # Announce in channel
+            winner_announcement = discord.Embed(
+                title="🏆 GEWINNER VERKÜNDET!",
+                description=f"**{mentions} {'hat' if len(winners) == 1 else 'haben'} gewonnen!**\n\n🎁 **Preis:** {giveaway_data['prize']}\n🎯 **Aus {len(participants)} Teilnehmern ausgewählt**",
+                color=0xffd700
+            )
+            
+            await channel.send(embed=winner_announcement)
+            
+            # Post in winner channel if configured
+            for winner in winners:
                 await post_winner_announcement(guild, winner, giveaway_data['prize'], len(participants))
-                
-        # Clean up
-        del active_giveaways[giveaway_id]
-        print(f"✅ Giveaway beendet: {giveaway_id}")
+        
+        await ticket_db.set_giveaway_ended(giveaway_id)
+        giveaway_logger.info(f"✅ Giveaway beendet: {giveaway_id}")
         
     except Exception as e:
-        print(f"❌ End Giveaway Error: {e}")
+        giveaway_logger.error(f"❌ End Giveaway Error: {e}")
 
 async def post_winner_announcement(guild, winner, prize, total_participants):
     """Post winner announcement in configured winner channel"""
@@ -7181,39 +9353,94 @@ async def post_winner_announcement(guild, winner, prize, total_participants):
         await winner_channel.send(f"🎉 **NEUER GIVEAWAY GEWINNER!** 🎉", embed=embed)
         
     except Exception as e:
-        print(f"⚠️ Winner Channel Post Error: {e}")
+        giveaway_logger.warning(f"⚠️ Winner Channel Post Error: {e}")
 
 # Real-time Crypto Price API
-async def get_crypto_prices():
-    """Hole aktuelle Crypto-Preise von CoinGecko API"""
-    url = "https://api.coingecko.com/api/v3/simple/price"
-    params = {
-        'ids': 'bitcoin,ethereum',
-        'vs_currencies': 'eur',
-        'include_24hr_change': 'true'
-    }
-    
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
+CRYPTO_PRICE_URL = os.getenv('CRYPTO_PRICE_URL', 'https://api.coingecko.com/api/v3/simple/price')
+CRYPTO_PRICE_TTL = float(os.getenv('CRYPTO_PRICE_TTL', '60'))
+CRYPTO_PRICE_MAX_STALE = float(os.getenv('CRYPTO_PRICE_MAX_STALE', '600'))
+
+class CryptoPriceCache:
+    """TTL cache for the CoinGecko EUR quotes.
+
+    Quotes younger than ``ttl`` are served directly. Older quotes up to
+    ``max_stale`` are served while one background refresh runs, and they are
+    also the fallback when the API fails. Concurrent callers share a single
+    in-flight request.
+    """
+    def __init__(self, url, ttl, max_stale, http):
+        self.url = url
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.http = http
+        self._prices = None
+        self._fetched_at = None
+        self._refresh_task = None
+        self.counters = collections.Counter()
+    
+    def _age(self):
+        return None if self._fetched_at is None else time.monotonic() - self._fetched_at
+    
+    async def get(self):
+        """Return the current quotes or None if no usable quote is available"""
+        age = self._age()
+        if age is not None and age < self.ttl:
+            self.counters['hits'] += 1
+            return self._prices
+        if age is not None and age < self.max_stale:
+            self.counters['stale_hits'] += 1
+            self._refresh()
+            return self._prices
+        
+        self.counters['misses'] += 1
+        return await asyncio.shield(self._refresh())
+    
+    def _refresh(self):
+        # Single flight: every caller waits on the same request
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._fetch())
+        return self._refresh_task
+    
+    async def _fetch(self):
+        params = {
+            'ids': 'bitcoin,ethereum',
+            'vs_currencies': 'eur',
+            'include_24hr_change': 'true'
+        }
+        self.counters['fetches'] += 1
+        try:
+            async with self.http.session.get(self.url, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
-                    return {
+                    self._prices = {
                         'bitcoin': data['bitcoin']['eur'],
                         'ethereum': data['ethereum']['eur'],
                         'btc_change': data['bitcoin'].get('eur_24h_change', 0),
                         'eth_change': data['ethereum'].get('eur_24h_change', 0)
                     }
-                else:
-                    print(f"⚠️ CoinGecko API Error: {response.status}")
-                    return None
-    except Exception as e:
-        print(f"⚠️ Crypto price fetch error: {e}")
-        return None
+                    self._fetched_at = time.monotonic()
+                    return self._prices
+                payments_logger.warning(f"⚠️ CoinGecko API Error: {response.status}")
+        except Exception as e:
+            payments_logger.warning(f"⚠️ Crypto price fetch error: {e}")
+        
+        self.counters['errors'] += 1
+        age = self._age()
+        return self._prices if age is not None and age < self.max_stale else None
+    
+    def stats(self):
+        return dict(self.counters, age=self._age())
+
+crypto_price_cache = CryptoPriceCache(CRYPTO_PRICE_URL, CRYPTO_PRICE_TTL, CRYPTO_PRICE_MAX_STALE, http_client)
 
-async def calculate_crypto_amount(eur_amount, crypto_type):
+async def get_crypto_prices():
+    """Hole aktuelle Crypto-Preise (gecacht) von der CoinGecko API"""
+    return await crypto_price_cache.get()
+
+async def calculate_crypto_amount(eur_amount, crypto_type, prices=None):
     """Rechne EUR-Betrag in Crypto um"""
-    prices = await get_crypto_prices()
+    if prices is None:
+        prices = await get_crypto_prices()
     if not prices:
         return None
     
@@ -7235,7 +9462,6 @@ async def handle_tebex_payment(interaction, ticket_channel, user, order_data, fi
         description=f"**Shop:** `{tebex_domain}`\n**Betrag:** {final_price:.2f}€\n**Verwendungszweck:** `{purpose_of_use}`\n\n✅ Kaufe einen Tebex-Code im Wert von {final_price:.2f}€ und gib ihn hier ein.",
         color=0xff6b35
     )
-    embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
     
     # Tebex Code eingeben
     tebex_button = Button(label="🛒 Tebex Code eingeben", style=discord.ButtonStyle.primary)
@@ -7244,10 +9470,9 @@ async def handle_tebex_payment(interaction, ticket_channel, user, order_data, fi
     payment_view = View(timeout=None)
     payment_view.add_item(tebex_button)
     
-    banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-    await ticket_channel.send(embed=embed, view=payment_view, file=banner_file)
-    
     await interaction.response.send_message("✅ Tebex Payment initiiert!", ephemeral=True)
+    
+    await ticket_channel.send(embed=embed, view=payment_view, **await banner_attachment(ticket_channel.guild, embed))
 
 class TebexCodeModal(Modal):
     def __init__(self, ticket_channel, user, final_price, purpose_of_use):
@@ -7271,7 +9496,6 @@ class TebexCodeModal(Modal):
             description=f"**Code:** `{self.tebex_code.value}`\n**Betrag:** {self.final_price:.2f}€\n**Verwendungszweck:** `{self.purpose_of_use}`\n\n✅ Dein Tebex Code wurde an unser Team weitergeleitet.",
             color=0x00ff00
         )
-        embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
         
         payment_confirm_view = View(timeout=None)
         confirm_button = Button(label="✅ Code gesendet", style=discord.ButtonStyle.success)
@@ -7285,9 +9509,8 @@ class TebexCodeModal(Modal):
         confirm_button.callback = tebex_sent_callback
         payment_confirm_view.add_item(confirm_button)
         
-        banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-        await self.ticket_channel.send(embed=embed, view=payment_confirm_view, file=banner_file)
         await interaction.response.send_message("✅ Tebex Code übermittelt!", ephemeral=True)
+        await self.ticket_channel.send(embed=embed, view=payment_confirm_view, **await banner_attachment(self.ticket_channel.guild, embed))
 
 async def show_tebex_code_modal(interaction, ticket_channel, user, final_price, purpose_of_use):
     modal = TebexCodeModal(ticket_channel, user, final_price, purpose_of_use)
@@ -7300,7 +9523,6 @@ async def handle_amazon_payment(interaction, ticket_channel, user, order_data, f
         description=f"**Betrag:** {final_price:.2f}€\n**Verwendungszweck:** `{purpose_of_use}`\n\n✅ Sende uns einen Amazon Gutschein im Wert von {final_price:.2f}€ oder mehr.",
         color=0xff9900
     )
-    embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
     
     amazon_button = Button(label="📦 Amazon Gutschein senden", style=discord.ButtonStyle.primary)
     amazon_button.callback = lambda i: show_amazon_card_modal(i, ticket_channel, user, final_price, purpose_of_use)
@@ -7308,10 +9530,9 @@ async def handle_amazon_payment(interaction, ticket_channel, user, order_data, f
     payment_view = View(timeout=None)
     payment_view.add_item(amazon_button)
     
-    banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-    await ticket_channel.send(embed=embed, view=payment_view, file=banner_file)
-    
     await interaction.response.send_message("✅ Amazon Payment initiiert!", ephemeral=True)
+    
+    await ticket_channel.send(embed=embed, view=payment_view, **await banner_attachment(ticket_channel.guild, embed))
 
 class AmazonCardModal(Modal):
     def __init__(self, ticket_channel, user, final_price, purpose_of_use):
@@ -7344,7 +9565,6 @@ class AmazonCardModal(Modal):
             description=f"**Code:** `{self.card_code.value}`\n**Wert:** {self.card_value.value}€\n**Benötigt:** {self.final_price:.2f}€\n**Verwendungszweck:** `{self.purpose_of_use}`\n\n✅ Dein Amazon Gutschein wurde an unser Team weitergeleitet.",
             color=0x00ff00
         )
-        embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
         
         payment_confirm_view = View(timeout=None)
         confirm_button = Button(label="✅ Gutschein gesendet", style=discord.ButtonStyle.success)
@@ -7358,9 +9578,8 @@ class AmazonCardModal(Modal):
         confirm_button.callback = amazon_sent_callback
         payment_confirm_view.add_item(confirm_button)
         
-        banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-        await self.ticket_channel.send(embed=embed, view=payment_confirm_view, file=banner_file)
         await interaction.response.send_message("✅ Amazon Gutschein übermittelt!", ephemeral=True)
+        await self.ticket_channel.send(embed=embed, view=payment_confirm_view, **await banner_attachment(self.ticket_channel.guild, embed))
 
 async def show_amazon_card_modal(interaction, ticket_channel, user, final_price, purpose_of_use):
     modal = AmazonCardModal(ticket_channel, user, final_price, purpose_of_use)
@@ -7373,7 +9592,6 @@ async def handle_netflix_payment(interaction, ticket_channel, user, order_data,
         description=f"**Betrag:** {final_price:.2f}€\n**Verwendungszweck:** `{purpose_of_use}`\n\n✅ Sende uns eine Netflix Karte im Wert von {final_price:.2f}€ oder mehr.",
         color=0xe50914
     )
-    embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
     
     netflix_button = Button(label="🎬 Netflix Karte senden", style=discord.ButtonStyle.primary)
     netflix_button.callback = lambda i: show_netflix_card_modal(i, ticket_channel, user, final_price, purpose_of_use)
@@ -7381,10 +9599,9 @@ async def handle_netflix_payment(interaction, ticket_channel, user, order_data,
     payment_view = View(timeout=None)
     payment_view.add_item(netflix_button)
     
-    banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-    await ticket_channel.send(embed=embed, view=payment_view, file=banner_file)
-    
     await interaction.response.send_message("✅ Netflix Payment initiiert!", ephemeral=True)
+    
+    await ticket_channel.send(embed=embed, view=payment_view, **await banner_attachment(ticket_channel.guild, embed))
 
 class NetflixCardModal(Modal):
     def __init__(self, ticket_channel, user, final_price, purpose_of_use):
@@ -7417,7 +9634,6 @@ class NetflixCardModal(Modal):
             description=f"**Code:** `{self.card_code.value}`\n**Wert:** {self.card_value.value}€\n**Benötigt:** {self.final_price:.2f}€\n**Verwendungszweck:** `{self.purpose_of_use}`\n\n✅ Deine Netflix Karte wurde an unser Team weitergeleitet.",
             color=0x00ff00
         )
-        embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
         
         payment_confirm_view = View(timeout=None)
         confirm_button = Button(label="✅ Karte gesendet", style=discord.ButtonStyle.success)
@@ -7431,9 +9647,8 @@ class NetflixCardModal(Modal):
         confirm_button.callback = netflix_sent_callback
         payment_confirm_view.add_item(confirm_button)
         
-        banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-        await self.ticket_channel.send(embed=embed, view=payment_confirm_view, file=banner_file)
         await interaction.response.send_message("✅ Netflix Karte übermittelt!", ephemeral=True)
+        await self.ticket_channel.send(embed=embed, view=payment_confirm_view, **await banner_attachment(self.ticket_channel.guild, embed))
 
 async def show_netflix_card_modal(interaction, ticket_channel, user, final_price, purpose_of_use):
     modal = NetflixCardModal(ticket_channel, user, final_price, purpose_of_use)
@@ -7451,7 +9666,6 @@ async def handle_creditcard_payment(interaction, ticket_channel, user, order_dat
         description=f"**Payment-Site:** `{cc_site}`\n**Karte:** `{cc_number}`\n**Betrag:** {final_price:.2f}€\n**Verwendungszweck:** `{purpose_of_use}`\n\n✅ Besuche die Payment-Site und zahle {final_price:.2f}€.",
         color=0x1f4e79
     )
-    embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
     
     payment_confirm_view = View(timeout=None)
     confirm_button = Button(label="✅ Zahlung gesendet", style=discord.ButtonStyle.success)
@@ -7465,26 +9679,28 @@ async def handle_creditcard_payment(interaction, ticket_channel, user, order_dat
     confirm_button.callback = cc_payment_sent_callback
     payment_confirm_view.add_item(confirm_button)
     
-    banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-    await ticket_channel.send(embed=embed, view=payment_confirm_view, file=banner_file)
-    
     await interaction.response.send_message("✅ Credit Card Details gesendet!", ephemeral=True)
+    
+    await ticket_channel.send(embed=embed, view=payment_confirm_view, **await banner_attachment(ticket_channel.guild, embed))
 
 async def handle_bitcoin_payment(interaction, ticket_channel, user, order_data, final_price, purpose_of_use):
     """Handle Bitcoin Payment with Real-time Conversion"""
     server_config = get_server_config(interaction.guild.id)
     btc_wallet = server_config.get("payment", {}).get("crypto", {}).get("bitcoin_wallet", "bc1q...")
     
+    # A cache miss waits for the price API - answer within Discord's 3 seconds first
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    
     # Real-time Bitcoin Umrechnung
-    btc_amount = await calculate_crypto_amount(final_price, "bitcoin")
-    crypto_prices = await get_crypto_prices()
+    quotes = await get_crypto_prices()
+    btc_amount = await calculate_crypto_amount(final_price, "bitcoin", quotes)
     
-    if btc_amount is None or crypto_prices is None:
-        await interaction.response.send_message("❌ Fehler beim Abrufen der Bitcoin-Kurse. Versuche es später erneut.", ephemeral=True)
+    if btc_amount is None or quotes is None:
+        await interaction.followup.send("❌ Fehler beim Abrufen der Bitcoin-Kurse. Versuche es später erneut.", ephemeral=True)
         return
     
-    btc_price = crypto_prices['bitcoin']
-    btc_change = crypto_prices['btc_change']
+    btc_price = quotes['bitcoin']
+    btc_change = quotes['btc_change']
     change_emoji = "📈" if btc_change > 0 else "📉"
     
     embed = discord.Embed(
@@ -7492,7 +9708,6 @@ async def handle_bitcoin_payment(interaction, ticket_channel, user, order_data,
         description=f"**Wallet:** `{btc_wallet}`\n**EUR Betrag:** {final_price:.2f}€\n**BTC Betrag:** `{btc_amount:.8f} BTC`\n**BTC Kurs:** {btc_price:.2f}€ {change_emoji} {btc_change:+.2f}%\n**Verwendungszweck:** `{purpose_of_use}`\n\n✅ Sende genau {btc_amount:.8f} BTC an die Wallet-Adresse.",
         color=0xf7931a
     )
-    embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
     
     payment_confirm_view = View(timeout=None)
     confirm_button = Button(label="✅ Bitcoin gesendet", style=discord.ButtonStyle.success)
@@ -7506,26 +9721,28 @@ async def handle_bitcoin_payment(interaction, ticket_channel, user, order_data,
     confirm_button.callback = btc_payment_sent_callback
     payment_confirm_view.add_item(confirm_button)
     
-    banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-    await ticket_channel.send(embed=embed, view=payment_confirm_view, file=banner_file)
+    await interaction.followup.send("✅ Bitcoin Details mit Real-time Kurs gesendet!", ephemeral=True)
     
-    await interaction.response.send_message("✅ Bitcoin Details mit Real-time Kurs gesendet!", ephemeral=True)
+    await ticket_channel.send(embed=embed, view=payment_confirm_view, **await banner_attachment(ticket_channel.guild, embed))
 
 async def handle_ethereum_payment(interaction, ticket_channel, user, order_data, final_price, purpose_of_use):
     """Handle Ethereum Payment with Real-time Conversion"""
     server_config = get_server_config(interaction.guild.id)
     eth_wallet = server_config.get("payment", {}).get("crypto", {}).get("ethereum_wallet", "0x...")
     
+    # A cache miss waits for the price API - answer within Discord's 3 seconds first
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    
     # Real-time Ethereum Umrechnung
-    eth_amount = await calculate_crypto_amount(final_price, "ethereum")
-    crypto_prices = await get_crypto_prices()
+    quotes = await get_crypto_prices()
+    eth_amount = await calculate_crypto_amount(final_price, "ethereum", quotes)
     
-    if eth_amount is None or crypto_prices is None:
-        await interaction.response.send_message("❌ Fehler beim Abrufen der Ethereum-Kurse. Versuche es später erneut.", ephemeral=True)
+    if eth_amount is None or quotes is None:
+        await interaction.followup.send("❌ Fehler beim Abrufen der Ethereum-Kurse. Versuche es später erneut.", ephemeral=True)
         return
     
-    eth_price = crypto_prices['ethereum']
-    eth_change = crypto_prices['eth_change']
+    eth_price = quotes['ethereum']
+    eth_change = quotes['eth_change']
     change_emoji = "📈" if eth_change > 0 else "📉"
     
     embed = discord.Embed(
@@ -7533,7 +9750,6 @@ async def handle_ethereum_payment(interaction, ticket_channel, user, order_data,
         description=f"**Wallet:** `{eth_wallet}`\n**EUR Betrag:** {final_price:.2f}€\n**ETH Betrag:** `{eth_amount:.6f} ETH`\n**ETH Kurs:** {eth_price:.2f}€ {change_emoji} {eth_change:+.2f}%\n**Verwendungszweck:** `{purpose_of_use}`\n\n✅ Sende genau {eth_amount:.6f} ETH an die Wallet-Adresse.",
         color=0x627eea
     )
-    embed.set_image(url="attachment://bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
     
     payment_confirm_view = View(timeout=None)
     confirm_button = Button(label="✅ Ethereum gesendet", style=discord.ButtonStyle.success)
@@ -7547,10 +9763,9 @@ async def handle_ethereum_payment(interaction, ticket_channel, user, order_data,
     confirm_button.callback = eth_payment_sent_callback
     payment_confirm_view.add_item(confirm_button)
     
-    banner_file = discord.File("attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif")
-    await ticket_channel.send(embed=embed, view=payment_confirm_view, file=banner_file)
+    await interaction.followup.send("✅ Ethereum Details mit Real-time Kurs gesendet!", ephemeral=True)
     
-    await interaction.response.send_message("✅ Ethereum Details mit Real-time Kurs gesendet!", ephemeral=True)
+    await ticket_channel.send(embed=embed, view=payment_confirm_view, **await banner_attachment(ticket_channel.guild, embed))
 
 async def show_welcome_messages_modal(interaction):
     await interaction.response.send_message("🚧 Willkommensnachrichten werden noch entwickelt...", ephemeral=True)
@@ -7611,6 +9826,8 @@ async def create_review_channel(interaction):
 
 async def create_new_review_channel(interaction, guild):
     """Erstelle neuen Review-Channel"""
+    # Creating and configuring the channel takes longer than Discord's 3 seconds under load
+    await interaction.response.defer(ephemeral=True, thinking=True)
     try:
         # Create the review channel
         review_channel = await guild.create_text_channel(
@@ -7682,12 +9899,9 @@ async def create_new_review_channel(interaction, guild):
             inline=False
         )
         
-        try:
-            await interaction.response.send_message(embed=success_embed, ephemeral=True)
-        except:
-            await interaction.followup.send(embed=success_embed, ephemeral=True)
+        await interaction.followup.send(embed=success_embed, ephemeral=True)
         
-        print(f"✅ Review-Channel erstellt für {guild.name}: {review_channel.name} (ID: {review_channel.id})")
+        tickets_logger.info(f"✅ Review-Channel erstellt für {guild.name}: {review_channel.name} (ID: {review_channel.id})")
         
     except Exception as e:
         error_embed = discord.Embed(
@@ -7696,10 +9910,7 @@ async def create_new_review_channel(interaction, guild):
             color=0xff0000
         )
         
-        try:
-            await interaction.response.send_message(embed=error_embed, ephemeral=True)
-        except:
-            await interaction.followup.send(embed=error_embed, ephemeral=True)
+        await interaction.followup.send(embed=error_embed, ephemeral=True)
 
 # Winner Channel Creation Function
 async def create_winner_channel(interaction):
@@ -7757,6 +9968,8 @@ async def create_winner_channel(interaction):
 
 async def create_new_winner_channel(interaction, guild):
     """Erstelle neuen Winner-Channel"""
+    # Creating and configuring the channel takes longer than Discord's 3 seconds under load
+    await interaction.response.defer(ephemeral=True, thinking=True)
     try:
         # Create the winner channel
         winner_channel = await guild.create_text_channel(
@@ -7828,12 +10041,9 @@ async def create_new_winner_channel(interaction, guild):
             inline=False
         )
         
-        try:
-            await interaction.response.send_message(embed=success_embed, ephemeral=True)
-        except:
-            await interaction.followup.send(embed=success_embed, ephemeral=True)
+        await interaction.followup.send(embed=success_embed, ephemeral=True)
         
-        print(f"✅ Winner-Channel erstellt für {guild.name}: {winner_channel.name} (ID: {winner_channel.id})")
+        giveaway_logger.info(f"✅ Winner-Channel erstellt für {guild.name}: {winner_channel.name} (ID: {winner_channel.id})")
         
     except Exception as e:
         error_embed = discord.Embed(
@@ -7842,10 +10052,7 @@ async def create_new_winner_channel(interaction, guild):
             color=0xff0000
         )
         
-        try:
-            await interaction.response.send_message(embed=error_embed, ephemeral=True)
-        except:
-            await interaction.followup.send(embed=error_embed, ephemeral=True)
+        await interaction.followup.send(embed=error_embed, ephemeral=True)
 
 async def show_ticket_messages_modal(interaction):
     await interaction.response.send_message("🚧 Ticket-Nachrichten werden noch entwickelt...", ephemeral=True)
@@ -8560,7 +10767,7 @@ async def run_business_setup(interaction):
         await welcome_channel.send(embed=welcome_embed)
         
         # Calendar Display
-        await update_calendar_display()
+        await update_calendar_display(guild)
         
         # 9. Erfolgsmeldung
         success_embed = discord.Embed(
@@ -8616,7 +10823,7 @@ async def run_community_setup(interaction):
 
 async def create_shop_ticket(interaction: discord.Interaction):
     """Erstelle Shop-Ticket mit Kategorie-Auswahl"""
-    print(f"🛍️ Shop-Ticket von {interaction.user} angefordert")
+    shop_logger.info(f"🛍️ Shop-Ticket von {interaction.user} angefordert")
     
     # Lade Shop-Kategorien
     shop_categories = load_shop_categories()
@@ -8748,15 +10955,12 @@ async def create_product_ticket(interaction, category, product_name, price):
     channel_name = f"shop-{user.name.lower()}-{timestamp}"
     
     # Prüfe ob User bereits ein offenes Shop-Ticket hat
-    existing_shop_tickets = [
-        channel for channel in guild.channels 
-        if isinstance(channel, discord.TextChannel) 
-        and channel.name.startswith(f"shop-{user.name.lower()}")
-    ]
+    await open_tickets.ready()
+    existing_shop_tickets = open_tickets.user_tickets(guild.id, user.id, ticket_type="Shop")
     
     if existing_shop_tickets:
         await interaction.response.send_message(
-            f"❌ Du hast bereits ein offenes Shop-Ticket: {existing_shop_tickets[0].mention}\n"
+            f"❌ Du hast bereits ein offenes Shop-Ticket: <#{existing_shop_tickets[0]}>\n"
             "Bitte schließe es zuerst, bevor du ein neues erstellst.",
             ephemeral=True
         )
@@ -8862,7 +11066,7 @@ async def create_product_ticket(interaction, category, product_name, price):
                 f"📦 **Produkt:** {product_name}\n"
                 f"💰 **Preis:** {price}"
             )
-            print(f"🏷️ Shop-Ticket {channel_name} wurde von {claim_interaction.user} geclaimed")
+            logger.info(f"🏷️ Shop-Ticket {channel_name} wurde von {claim_interaction.user} geclaimed")
         
         async def shop_paid_callback(paid_interaction):
             staff_role = discord.utils.get(paid_interaction.guild.roles, name="HV | Team")
@@ -8870,15 +11074,6 @@ async def create_product_ticket(interaction, category, product_name, price):
                 await paid_interaction.response.send_message("❌ Nur HV | Team kann Zahlungen bestätigen.", ephemeral=True)
                 return
             
-            # Customer-Rolle zuweisen
-            try:
-                customer_role = discord.utils.get(guild.roles, name=server_config["roles"]["customer_role"])
-                if customer_role:
-                    await user.add_roles(customer_role)
-                    print(f"✅ Customer role assigned to {user}")
-            except Exception as e:
-                print(f"⚠️ Error assigning Customer role: {e}")
-            
             await paid_interaction.response.send_message(
                 f"💰 **Zahlung bestätigt!**\n"
                 f"👤 **Kunde:** {user.mention}\n"
@@ -8886,7 +11081,16 @@ async def create_product_ticket(interaction, category, product_name, price):
                 f"✅ **Status:** Bezahlt - Arbeit kann beginnen!\n\n"
                 f"🎉 {user.mention}, deine Zahlung wurde bestätigt! Wir beginnen nun mit der Arbeit an deinem **{product_name}**."
             )
-            print(f"💰 Shop-Ticket {channel_name} als bezahlt markiert")
+            logger.info(f"💰 Shop-Ticket {channel_name} als bezahlt markiert")
+            
+            # Customer-Rolle zuweisen (nach der Antwort - Rollen-Updates sind rate-limitiert)
+            try:
+                customer_role = discord.utils.get(guild.roles, name=server_config["roles"]["customer_role"])
+                if customer_role:
+                    await user.add_roles(customer_role)
+                    logger.info(f"✅ Customer role assigned to {user}")
+            except Exception as e:
+                logger.warning(f"⚠️ Error assigning Customer role: {e}")
         
         async def shop_finished_callback(finished_interaction):
             staff_role = discord.utils.get(finished_interaction.guild.roles, name="HV | Team")
@@ -8904,7 +11108,7 @@ async def create_product_ticket(interaction, category, product_name, price):
             
             # Review-System starten
             await start_review_system(ticket_channel, user)
-            print(f"✅ Shop-Ticket {channel_name} als fertig markiert")
+            logger.info(f"✅ Shop-Ticket {channel_name} als fertig markiert")
         
         async def shop_close_callback(close_interaction):
             staff_role = discord.utils.get(close_interaction.guild.roles, name="HV | Team")
@@ -8921,7 +11125,8 @@ async def create_product_ticket(interaction, category, product_name, price):
             # Channel löschen nach 10 Sekunden
             await asyncio.sleep(10)
             await ticket_channel.delete()
-            print(f"🔒 Shop-Ticket {channel_name} geschlossen")
+            await open_tickets.close(ticket_channel.id)
+            logger.info(f"🔒 Shop-Ticket {channel_name} geschlossen")
         
         # Callbacks zuweisen
         discount_button.callback = discount_callback
@@ -8940,14 +11145,17 @@ async def create_product_ticket(interaction, category, product_name, price):
         # Ticket-Nachricht senden
         await ticket_channel.send(embed=embed, view=ticket_view)
         
-        # Ticket zu pending_tickets.json hinzufügen
-        try:
-            with open('pending_tickets.json', 'r') as f:
-                pending_tickets = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            pending_tickets = {}
-        
-        pending_tickets[str(ticket_channel.id)] = {
+        # Ticket zur Datenbank hinzufügen (auch für das Review-System)
+        await open_tickets.open({
+            "channel_id": ticket_channel.id,
+            "guild_id": guild.id,
+            "user_id": user.id,
+            "user_name": user.name,
+            "ticket_type": "Shop",
+            "channel_name": channel_name,
+            "created_at": interaction.created_at.timestamp()
+        })
+        await ticket_db.put_pending_ticket(ticket_channel.id, {
             "user_id": user.id,
             "username": user.name,
             "type": "Shop",
@@ -8956,18 +11164,15 @@ async def create_product_ticket(interaction, category, product_name, price):
             "price": price,
             "created_at": int(interaction.created_at.timestamp()),
             "status": "Created"
-        }
-        
-        with open('pending_tickets.json', 'w') as f:
-            json.dump(pending_tickets, f, indent=2)
+        })
         
-        print(f"🛍️ Shop-Ticket erstellt: {channel_name} für {product_name} ({price})")
+        logger.info(f"🛍️ Shop-Ticket erstellt: {channel_name} für {product_name} ({price})")
         
         # Ticket-Counter aktualisieren
-        await update_ticket_counter(guild)
+        await update_ticket_counter_channel(guild)
         
     except Exception as e:
-        print(f"❌ Fehler beim Erstellen des Shop-Tickets: {e}")
+        logger.error(f"❌ Fehler beim Erstellen des Shop-Tickets: {e}")
         await interaction.followup.send(
             "❌ Es gab einen Fehler beim Erstellen des Shop-Tickets. Bitte kontaktiere einen Administrator.",
             ephemeral=True
@@ -8993,22 +11198,17 @@ async def show_bot_statistics(interaction):
     
     # Bot-spezifische Statistiken
     try:
-        with open('pending_tickets.json', 'r', encoding='utf-8') as f:
-            pending_tickets = json.load(f)
-        active_tickets = len(pending_tickets)
+        active_tickets = await ticket_db.count_pending_tickets()
     except:
         active_tickets = 0
     
     try:
-        with open('discount_codes.json', 'r', encoding='utf-8') as f:
-            discount_codes = json.load(f)
-        total_discounts = len(discount_codes)
+        total_discounts = await ticket_db.count_discount_codes()
     except:
         total_discounts = 0
     
     try:
-        with open('prices.json', 'r', encoding='utf-8') as f:
-            prices = json.load(f)
+        prices = read_json_file('prices.json')
         total_categories = len(prices)
         total_products = sum(len(items) if isinstance(items, dict) else 0 for items in prices.values())
     except:
@@ -9041,6 +11241,26 @@ async def show_bot_statistics(interaction):
         inline=True
     )
     
+    # Zähler-Kanäle
+    counter_lines = []
+    for counter in counter_scheduler.status(guild.id):
+        if counter["pending"]:
+            counter_lines.append(f"⏳ **{counter['desired']}** (in {int(counter['next_rename_in'])}s, {counter['dropped']} übersprungen)")
+        else:
+            counter_lines.append(f"✅ **{counter['applied']}** ({counter['renames']} Umbenennungen)")
+    if counter_lines:
+        embed.add_field(name="📊 Zähler-Kanäle", value="\n".join(counter_lines), inline=False)
+    
+    # Event-Loop
+    loop_stats = loop_monitor.stats()
+    loop_lines = [
+        f"⏱️ **Lag p50/p99:** {loop_stats['lag_p50_ms']} / {loop_stats['lag_p99_ms']} ms",
+        f"📈 **Max (letzte {loop_stats['window_s']} s):** {loop_stats['lag_max_ms']} ms",
+        f"🐢 **Blockierende Callbacks:** {loop_stats['slow_callbacks']}",
+    ]
+    loop_lines += [f"• `{entry['name'][:80]}` ({entry['count']}x)" for entry in loop_stats['top_slow_callbacks']]
+    embed.add_field(name="🔄 Event-Loop", value="\n".join(loop_lines), inline=False)
+    
     # Performance-Info
     try:
         import psutil
@@ -9062,7 +11282,7 @@ async def show_bot_statistics(interaction):
             inline=True
         )
     
-    embed.set_footer(text=f"Statistiken • {datetime.datetime.now().strftime('%d.%m.%Y um %H:%M')}")
+    embed.set_footer(text=f"Statistiken • {datetime.now().strftime('%d.%m.%Y um %H:%M')}")
     
     view = View(timeout=300)
     
@@ -9097,13 +11317,14 @@ async def create_bot_backup(interaction):
         # Erstelle Backup-Ordner
         os.makedirs(backup_folder, exist_ok=True)
         
+        # Ausstehende Schreibvorgänge abschließen, damit das Backup aktuell ist
+        await asyncio.to_thread(json_writer.flush)
+        
         # Wichtige Dateien sichern
         files_to_backup = [
             'prices.json',
-            'server_configs.json', 
-            'discount_codes.json',
-            'appointments.json',
-            'pending_tickets.json'
+            'server_configs.json',
+            'shop_categories.json'
         ]
         
         backed_up_files = []
@@ -9112,6 +11333,10 @@ async def create_bot_backup(interaction):
                 shutil.copy2(file, backup_folder)
                 backed_up_files.append(file)
         
+        # Datenbank (Termine, Tickets, Discount-Codes, Formulare) konsistent sichern
+        await ticket_db.backup(os.path.join(backup_folder, os.path.basename(DATABASE_PATH)))
+        backed_up_files.append(os.path.basename(DATABASE_PATH))
+        
         embed = discord.Embed(
             title="✅ Backup erfolgreich erstellt",
             description=f"Alle Bot-Daten wurden in `{backup_folder}` gesichert!",
@@ -9124,7 +11349,7 @@ async def create_bot_backup(interaction):
             inline=False
         )
         
-        print(f"✅ Backup erstellt: {backup_folder}")
+        storage_logger.info(f"✅ Backup erstellt: {backup_folder}")
         
     except Exception as e:
         embed = discord.Embed(
@@ -9132,7 +11357,7 @@ async def create_bot_backup(interaction):
             description=f"Fehler beim Erstellen des Backups: {str(e)}",
             color=0xff0000
         )
-        print(f"❌ Backup-Fehler: {e}")
+        storage_logger.error(f"❌ Backup-Fehler: {e}")
     
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
@@ -9155,22 +11380,19 @@ async def export_all_config(interaction):
         
         # Preise laden
         try:
-            with open('prices.json', 'r', encoding='utf-8') as f:
-                export_data['prices'] = json.load(f)
+            export_data['prices'] = read_json_file('prices.json')
         except:
             export_data['prices'] = {}
         
         # Discount-Codes laden
         try:
-            with open('discount_codes.json', 'r', encoding='utf-8') as f:
-                export_data['discount_codes'] = json.load(f)
+            export_data['discount_codes'] = await ticket_db.get_discount_codes()
         except:
             export_data['discount_codes'] = {}
         
         # Export-Datei erstellen
         export_filename = f"haze_bot_config_{timestamp}.json"
-        with open(export_filename, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+        write_json_file(export_filename, export_data)
         
         embed = discord.Embed(
             title="✅ Export erfolgreich",
@@ -9187,7 +11409,7 @@ async def export_all_config(interaction):
             inline=False
         )
         
-        print(f"✅ Konfiguration exportiert: {export_filename}")
+        admin_logger.info(f"✅ Konfiguration exportiert: {export_filename}")
         
     except Exception as e:
         embed = discord.Embed(
@@ -9195,7 +11417,7 @@ async def export_all_config(interaction):
             description=f"Fehler beim Exportieren: {str(e)}",
             color=0xff0000
         )
-        print(f"❌ Export-Fehler: {e}")
+        admin_logger.error(f"❌ Export-Fehler: {e}")
     
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
@@ -9404,139 +11626,226 @@ async def confirm_reset_config(interaction):
         await interaction.response.send_message(embed=error_embed, ephemeral=True)
 
 # Calendar system functions
-async def generate_weekly_calendar():
-    """Generate and display the weekly appointment calendar"""
+CALENDAR_DEBOUNCE = float(os.getenv('CALENDAR_DEBOUNCE', '2'))
+CALENDAR_CONCURRENCY = int(os.getenv('CALENDAR_CONCURRENCY', '4'))
+LEGACY_CALENDAR_CHANNEL_ID = 1413668409853345792  # Calendar of the original server
+CALENDAR_HEADER = "📅 **HAZE VISUALS - APPOINTMENT CALENDAR**\n" + "=" * 50 + "\n\n"
+
+def calendar_week_start(now=None):
+    """Monday 00:00 (Berlin) of the current week"""
+    berlin_tz = pytz.timezone('Europe/Berlin')
+    now = now or datetime.now(berlin_tz)
+    start_of_week = now - timedelta(days=now.weekday())
+    return start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
+
+async def load_week_bookings(guild_id, start_of_week):
+    """Booked times (time -> user_name) of the 7 days starting at ``start_of_week``"""
+    return [
+        await appointment_slots.booked_day(guild_id, (start_of_week + timedelta(days=day_offset)).strftime('%Y-%m-%d'))
+        for day_offset in range(7)
+    ]
+
+def render_calendar_day(current_day, booked):
+    """Calendar text of one day"""
+    day_text = f"**{current_day.strftime('%A')}, {current_day.strftime('%d.%m.%Y')}**\n"
+    available_slots = []
+    unavailable_slots = []
+    for time_slot in appointment_slots.slot_times:
+        if time_slot in booked:
+            unavailable_slots.append(f"🔴 {time_slot} - Gebucht ({booked[time_slot]})")
+        else:
+            available_slots.append(f"🟢 {time_slot} - Verfügbar")
+    for slot in available_slots + unavailable_slots:
+        day_text += f"  {slot}\n"
+    return day_text + "\n"
+
+def render_calendar_summary(week_bookings):
+    """Summary block for a week of bookings"""
+    total_slots = 7 * len(appointment_slots.slot_times)
+    booked_slots = sum(
+        1 for booked in week_bookings for time_slot in booked if time_slot in appointment_slots.slot_times
+    )
+    free_slots = total_slots - booked_slots
+    summary = f"📊 **ZUSAMMENFASSUNG:**\n"
+    summary += f"✅ Verfügbare Termine: **{free_slots}**\n"
+    summary += f"❌ Gebuchte Termine: **{booked_slots}**\n"
+    summary += f"📅 Gesamt Termine: **{total_slots}**\n\n"
+    summary += f"🕐 **Öffnungszeiten:** Montag - Sonntag, {appointment_slots.hours_label} Uhr\n"
+    summary += f"⏰ **Termin-Dauer:** {appointment_slots.slot_minutes} Minuten\n"
+    summary += f"📍 **Zeitzone:** Berlin (CET/CEST)\n\n"
+    summary += f"💡 *Termine werden automatisch über das Ticket-System gebucht!*"
+    return summary
+
+async def generate_weekly_calendar(guild_id):
+    """Generate and display the weekly appointment calendar of a guild"""
     try:
-        berlin_tz = pytz.timezone('Europe/Berlin')
-        now = datetime.now(berlin_tz)
-        
-        # Get the start of current week (Monday)
-        start_of_week = now - timedelta(days=now.weekday())
-        start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        # Load current appointments
-        try:
-            with open('appointments.json', 'r', encoding='utf-8') as f:
-                appointments = json.load(f)
-        except FileNotFoundError:
-            appointments = {}
-        
-        # Generate calendar for current week
-        calendar_text = "📅 **HAZE VISUALS - APPOINTMENT CALENDAR**\n"
-        calendar_text += "=" * 50 + "\n\n"
-        
-        total_slots = 0
-        booked_slots = 0
+        start_of_week = calendar_week_start()
+        week_bookings = await load_week_bookings(guild_id, start_of_week)
         
+        calendar_text = CALENDAR_HEADER
         for day_offset in range(7):  # Monday to Sunday
-            current_day = start_of_week + timedelta(days=day_offset)
-            day_name = current_day.strftime('%A')
-            day_date = current_day.strftime('%d.%m.%Y')
-            
-            calendar_text += f"**{day_name}, {day_date}**\n"
-            
-            # Generate time slots from 18:00 to 22:00 (30-minute intervals)
-            available_slots = []
-            unavailable_slots = []
-            
-            for hour in range(18, 22):
-                for minute in [0, 30]:
-                    time_slot = f"{hour:02d}:{minute:02d}"
-                    slot_datetime = current_day.replace(hour=hour, minute=minute)
-                    slot_key = slot_datetime.strftime('%Y-%m-%d_%H:%M')
-                    
-                    total_slots += 1
-                    
-                    if slot_key in appointments:
-                        unavailable_slots.append(f"🔴 {time_slot} - Gebucht ({appointments[slot_key]['user_name']})")
-                        booked_slots += 1
-                    else:
-                        available_slots.append(f"🟢 {time_slot} - Verfügbar")
-            
-            # Add slots to calendar
-            all_slots = available_slots + unavailable_slots
-            for slot in all_slots:
-                calendar_text += f"  {slot}\n"
-            
-            calendar_text += "\n"
-        
-        # Add summary
-        free_slots = total_slots - booked_slots
-        calendar_text += f"📊 **ZUSAMMENFASSUNG:**\n"
-        calendar_text += f"✅ Verfügbare Termine: **{free_slots}**\n"
-        calendar_text += f"❌ Gebuchte Termine: **{booked_slots}**\n"
-        calendar_text += f"📅 Gesamt Termine: **{total_slots}**\n\n"
-        calendar_text += f"🕐 **Öffnungszeiten:** Montag - Sonntag, 18:00 - 22:00 Uhr\n"
-        calendar_text += f"⏰ **Termin-Dauer:** 30 Minuten\n"
-        calendar_text += f"📍 **Zeitzone:** Berlin (CET/CEST)\n\n"
-        calendar_text += f"💡 *Termine werden automatisch über das Ticket-System gebucht!*"
-        
-        return calendar_text
+            calendar_text += render_calendar_day(start_of_week + timedelta(days=day_offset), week_bookings[day_offset])
+        return calendar_text + render_calendar_summary(week_bookings)
         
     except Exception as e:
-        print(f"❌ Fehler beim Generieren des Kalenders: {e}")
+        calendar_logger.error(f"❌ Fehler beim Generieren des Kalenders: {e}")
         return "❌ Fehler beim Laden des Kalenders."
 
-async def update_calendar_display():
-    """Update the calendar display in the designated channel"""
-    try:
-        # Get calendar channel from server config (fallback to hardcoded for existing server)
-        calendar_channel_id = 1413668409853345792  # Default for existing server
-        
-        # Try to get from server configs for other servers
-        for guild in bot.guilds:
-            config = get_server_config(guild.id)
-            if config["channels"]["calendar_channel"]:
-                calendar_channel_id = config["channels"]["calendar_channel"]
-                break
-        
-        calendar_channel = bot.get_channel(calendar_channel_id)
-        if not calendar_channel:
-            print("❌ Kalender-Channel nicht gefunden")
-            return
-        
-        # Generate new calendar
-        calendar_text = await generate_weekly_calendar()
-        
-        # Clear old messages (keep only last 10 messages)
-        async for message in calendar_channel.history(limit=50):
-            if message.author == bot.user:
-                await message.delete()
-        
-        # Send new calendar
-        # Split message if too long (Discord limit is 2000 characters)
-        if len(calendar_text) > 2000:
-            # Split into chunks
-            chunks = []
-            current_chunk = ""
-            lines = calendar_text.split('\n')
-            
-            for line in lines:
-                if len(current_chunk + line + '\n') > 1900:  # Leave some buffer
-                    chunks.append(current_chunk)
-                    current_chunk = line + '\n'
+class CalendarPublisher:
+    """Keeps the weekly calendar of every guild up to date by editing messages.
+
+    Each guild's calendar is rendered from its own appointments and posted
+    as one message per day plus a summary; the message ids and their text
+    are stored in the database. Bookings mark their day dirty, bursts are
+    debounced into one update, and only the messages whose text changed are
+    edited. A new week or a missing message reposts the calendar. Guilds are
+    published concurrently, at most ``concurrency`` at a time.
+    """
+    SECTIONS = 8  # Monday..Sunday + summary
+    
+    def __init__(self, db, debounce, concurrency):
+        self.db = db
+        self.debounce = debounce
+        self.concurrency = concurrency
+        self._states = {}        # channel_id -> {"week", "messages", "contents"}
+        self._dirty = {}         # guild_id -> set of dirty days, None = whole week
+        self._locks = collections.defaultdict(asyncio.Lock)
+        self._flush_task = None
+        self.counters = collections.Counter()
+    
+    def mark_dirty(self, guild_id, slot_keys=None):
+        """Mark the days of ``slot_keys`` (or the whole week) dirty and schedule an update"""
+        if slot_keys is None or (guild_id in self._dirty and self._dirty[guild_id] is None):
+            self._dirty[guild_id] = None
+        else:
+            self._dirty.setdefault(guild_id, set()).update(slot_key.split('_')[0] for slot_key in slot_keys)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+    
+    async def _flush_later(self):
+        await asyncio.sleep(self.debounce)
+        while self._dirty:
+            guilds = []
+            for guild_id in list(self._dirty):
+                guild = bot.get_guild(guild_id)
+                if guild:
+                    guilds.append(guild)
                 else:
-                    current_chunk += line + '\n'
+                    del self._dirty[guild_id]
+            await self.publish_many(guilds)
+    
+    async def publish_many(self, guilds, force=False):
+        """Publish the calendars of ``guilds`` concurrently"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def _publish(guild):
+            async with semaphore:
+                try:
+                    await self.publish(guild, force=force)
+                except Exception as e:
+                    self.counters['errors'] += 1
+                    calendar_logger.error(f"❌ Fehler beim Aktualisieren des Kalenders für {guild.name}: {e}")
+        
+        await asyncio.gather(*(_publish(guild) for guild in guilds))
+    
+    async def _load_state(self, channel_id):
+        if channel_id not in self._states:
+            raw = await self.db.get_meta(f"calendar:{channel_id}")
+            self._states[channel_id] = json.loads(raw) if raw else None
+        return self._states[channel_id]
+    
+    async def _save_state(self, channel_id, state):
+        self._states[channel_id] = state
+        await self.db.set_meta(f"calendar:{channel_id}", json.dumps(state, ensure_ascii=False))
+    
+    @staticmethod
+    def _format(text):
+        return f"```\n{text}\n```"
+    
+    @metrics.timed('ticketbot_background_task_seconds', task='calendar_publish')
+    async def publish(self, guild, force=False):
+        """Bring the calendar message(s) of ``guild`` up to date now"""
+        async with self._locks[guild.id]:
+            dirty_days = self._dirty.pop(guild.id, set())
+            all_dirty = force or dirty_days is None
+            
+            channel = resolve_calendar_channel(guild)
+            if not channel:
+                return
             
-            if current_chunk:
-                chunks.append(current_chunk)
+            start_of_week = calendar_week_start()
+            week = start_of_week.strftime('%Y-%m-%d')
+            state = await self._load_state(channel.id)
+            if state is None or state.get("week") != week or len(state.get("contents", [])) != self.SECTIONS:
+                all_dirty = True
+            
+            week_bookings = await load_week_bookings(guild.id, start_of_week)
+            contents = [None] * self.SECTIONS if all_dirty else list(state["contents"])
+            for day_offset in range(7):
+                current_day = start_of_week + timedelta(days=day_offset)
+                if all_dirty or current_day.strftime('%Y-%m-%d') in dirty_days:
+                    day_text = render_calendar_day(current_day, week_bookings[day_offset])
+                    contents[day_offset] = (CALENDAR_HEADER + day_text) if day_offset == 0 else day_text
+            contents[7] = render_calendar_summary(week_bookings)
+            
+            if state is None or state.get("week") != week or len(state.get("messages", [])) != self.SECTIONS:
+                await self._repost(channel, state, week, contents)
+                return
             
-            # Send chunks
-            for i, chunk in enumerate(chunks):
-                if i == 0:
-                    await calendar_channel.send(f"```\n{chunk}\n```")
-                else:
-                    await calendar_channel.send(f"```\n{chunk}\n```")
+            for index, text in enumerate(contents):
+                if text == state["contents"][index]:
+                    continue
+                try:
+                    await channel.get_partial_message(state["messages"][index]).edit(content=self._format(text))
+                    self.counters['edits'] += 1
+                except discord.NotFound:
+                    await self._repost(channel, state, week, contents)
+                    return
+            await self._save_state(channel.id, {"week": week, "messages": state["messages"], "contents": contents})
+            calendar_logger.info(f"📅 Kalender für {guild.name} aktualisiert")
+    
+    async def _repost(self, channel, state, week, contents):
+        if state is None:
+            # First run on this channel: clear calendars posted by older versions
+            async for message in channel.history(limit=50):
+                if message.author == bot.user:
+                    await message.delete()
         else:
-            await calendar_channel.send(f"```\n{calendar_text}\n```")
-        
-        print("📅 Kalender erfolgreich aktualisiert")
-        
+            for message_id in state.get("messages", []):
+                try:
+                    await channel.get_partial_message(message_id).delete()
+                except discord.NotFound:
+                    pass
+        
+        messages = []
+        for text in contents:
+            message = await channel.send(self._format(text))
+            messages.append(message.id)
+        self.counters['reposts'] += 1
+        await self._save_state(channel.id, {"week": week, "messages": messages, "contents": contents})
+        calendar_logger.info(f"📅 Kalender für {channel.guild.name} neu gepostet")
+
+calendar_publisher = CalendarPublisher(ticket_db, CALENDAR_DEBOUNCE, CALENDAR_CONCURRENCY)
+
+def resolve_calendar_channel(guild):
+    """Calendar channel of a guild from its server config (classic or business setup)"""
+    channels = get_server_config(guild.id).get("channels", {})
+    channel_id = channels.get("calendar_channel") or channels.get("calendar")
+    return guild.get_channel(channel_id) if channel_id else None
+
+async def update_calendar_display(guild=None):
+    """Update the calendar display of one guild, or of all guilds"""
+    try:
+        if guild is not None:
+            await calendar_publisher.publish(guild, force=True)
+        else:
+            await calendar_publisher.publish_many(bot.guilds, force=True)
     except Exception as e:
-        print(f"❌ Fehler beim Aktualisieren des Kalenders: {e}")
+        calendar_logger.error(f"❌ Fehler beim Aktualisieren des Kalenders: {e}")
 
 # Weekly calendar update task (runs every Saturday at 00:00 Berlin time)
 @tasks.loop(hours=24)  # Check daily
+@metrics.timed('ticketbot_background_task_seconds', task='weekly_calendar_update')
 async def weekly_calendar_update():
     """Update calendar and cleanup old appointments every Saturday"""
     try:
@@ -9545,40 +11854,17 @@ async def weekly_calendar_update():
         
         # Check if it's Saturday at midnight (or within the hour)
         if now.weekday() == 5 and now.hour == 0:  # Saturday = 5, Sunday = 6
-            print("📅 Saturday cleanup: Clearing old appointments...")
-            
-            # Load current appointments
-            try:
-                with open('appointments.json', 'r', encoding='utf-8') as f:
-                    appointments = json.load(f)
-            except FileNotFoundError:
-                appointments = {}
+            calendar_logger.info("📅 Saturday cleanup: Clearing old appointments...")
             
             # Calculate cutoff date (start of current week)
             start_of_week = now - timedelta(days=now.weekday())
             start_of_week = start_of_week.replace(hour=0, minute=0, second=0, microsecond=0)
             
-            # Remove old appointments (from previous weeks)
-            appointments_to_remove = []
-            for slot_key in appointments:
-                try:
-                    slot_datetime = datetime.strptime(slot_key, '%Y-%m-%d_%H:%M')
-                    slot_datetime = berlin_tz.localize(slot_datetime)
-                    
-                    if slot_datetime < start_of_week:
-                        appointments_to_remove.append(slot_key)
-                except ValueError:
-                    continue
-            
-            # Remove old appointments
-            for slot_key in appointments_to_remove:
-                del appointments[slot_key]
+            # Remove old appointments (from previous weeks) - slot_keys sort chronologically
+            removed_count = await ticket_db.delete_appointments_before(start_of_week.strftime('%Y-%m-%d'))
+            appointment_slots.prune(start_of_week.strftime('%Y-%m-%d'))
             
-            # Save updated appointments
-            with open('appointments.json', 'w', encoding='utf-8') as f:
-                json.dump(appointments, f, ensure_ascii=False, indent=2)
-            
-            print(f"🗑️ {len(appointments_to_remove)} alte Termine entfernt")
+            calendar_logger.info(f"🗑️ {removed_count} alte Termine entfernt")
             
             # Force calendar update
             await update_calendar_display()
@@ -9588,23 +11874,27 @@ async def weekly_calendar_update():
             await update_calendar_display()
             
     except Exception as e:
-        print(f"❌ Fehler in weekly_calendar_update: {e}")
+        calendar_logger.error(f"❌ Fehler in weekly_calendar_update: {e}")
 
 @weekly_calendar_update.before_loop
 async def before_weekly_calendar_update():
     """Wait for bot to be ready before starting the task"""
     await bot.wait_until_ready()
-    # Initial calendar display
-    await update_calendar_display()
+    # The initial calendar display is a startup step
 
-# Background task for checking unresponded tickets
-@tasks.loop(minutes=5)  # Check every 5 minutes
-async def check_tickets_task():
-    """Background task to check for unresponded tickets"""
-    await check_and_ping_unresponded_tickets(bot)
+# Background task correcting drift of the incremental member counters
+@tasks.loop(hours=6)
+@metrics.timed('ticketbot_background_task_seconds', task='reconcile_member_counters')
+async def reconcile_member_counters():
+    """Recount human members so missed join/leave events do not accumulate"""
+    for guild in bot.guilds:
+        drift = member_counter.reconcile(guild)
+        if drift:
+            counters_logger.info(f"👥 Mitgliederzähler für {guild.name} um {drift:+d} korrigiert")
+            await update_member_counter_channel(guild)
 
-@check_tickets_task.before_loop
-async def before_check_tickets_task():
+@reconcile_member_counters.before_loop
+async def before_reconcile_member_counters():
     """Wait for bot to be ready before starting the task"""
     await bot.wait_until_ready()
 
@@ -9698,19 +11988,17 @@ async def show_shop_categories_config(interaction):
 def load_shop_categories():
     """Lade Shop-Kategorien aus JSON-Datei"""
     try:
-        with open('shop_categories.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_json_file('shop_categories.json')
     except (FileNotFoundError, json.JSONDecodeError):
         return {}
 
 def save_shop_categories(categories):
     """Speichere Shop-Kategorien in JSON-Datei"""
     try:
-        with open('shop_categories.json', 'w', encoding='utf-8') as f:
-            json.dump(categories, f, indent=2, ensure_ascii=False)
+        write_json_file('shop_categories.json', categories)
         return True
     except Exception as e:
-        print(f"❌ Fehler beim Speichern der Shop-Kategorien: {e}")
+        shop_logger.error(f"❌ Fehler beim Speichern der Shop-Kategorien: {e}")
         return False
 
 async def create_default_shop_categories(interaction):
@@ -9769,7 +12057,7 @@ async def create_default_shop_categories(interaction):
             "Alle Kategorien wurden mit den Standard-Produkten und -Preisen eingerichtet.",
             ephemeral=True
         )
-        print("✅ Standard-Shop-Kategorien erstellt")
+        shop_logger.info("✅ Standard-Shop-Kategorien erstellt")
         
         # Zeige aktualisierte Übersicht
         await asyncio.sleep(2)
@@ -9855,7 +12143,7 @@ class AddShopCategoryModal(Modal):
                     f"Du kannst jetzt Produkte zu dieser Kategorie hinzufügen.",
                     ephemeral=True
                 )
-                print(f"✅ Shop-Kategorie '{self.category_name.value}' erstellt")
+                shop_logger.info(f"✅ Shop-Kategorie '{self.category_name.value}' erstellt")
             else:
                 await interaction.response.send_message(
                     "❌ Fehler beim Speichern der Kategorie.",
@@ -9863,7 +12151,7 @@ class AddShopCategoryModal(Modal):
                 )
                 
         except Exception as e:
-            print(f"❌ Fehler beim Erstellen der Shop-Kategorie: {e}")
+            shop_logger.error(f"❌ Fehler beim Erstellen der Shop-Kategorie: {e}")
             await interaction.response.send_message(
                 "❌ Ein Fehler ist aufgetreten.",
                 ephemeral=True
@@ -9945,7 +12233,7 @@ class AddShopProductModal(Modal):
                     f"Das Produkt ist jetzt im Shop-System verfügbar!",
                     ephemeral=True
                 )
-                print(f"✅ Produkt '{self.product_name.value}' zu '{self.category_name.value}' hinzugefügt")
+                shop_logger.info(f"✅ Produkt '{self.product_name.value}' zu '{self.category_name.value}' hinzugefügt")
             else:
                 await interaction.response.send_message(
                     "❌ Fehler beim Speichern des Produkts.",
@@ -9953,7 +12241,7 @@ class AddShopProductModal(Modal):
                 )
                 
         except Exception as e:
-            print(f"❌ Fehler beim Hinzufügen des Produkts: {e}")
+            shop_logger.error(f"❌ Fehler beim Hinzufügen des Produkts: {e}")
             await interaction.response.send_message(
                 "❌ Ein Fehler ist aufgetreten.",
                 ephemeral=True
@@ -10008,7 +12296,7 @@ class SelectCategoryToEditModal(Modal):
             await interaction.response.send_modal(edit_modal)
             
         except Exception as e:
-            print(f"❌ Fehler beim Auswählen der Kategorie: {e}")
+            shop_logger.error(f"❌ Fehler beim Auswählen der Kategorie: {e}")
             await interaction.response.send_message(
                 "❌ Ein Fehler ist aufgetreten.",
                 ephemeral=True
@@ -10098,7 +12386,7 @@ class EditShopCategoryModal(Modal):
                     f"Alle Änderungen sind sofort im Shop verfügbar!",
                     ephemeral=True
                 )
-                print(f"✅ Shop-Kategorie '{self.original_name}' zu '{self.category_name.value}' aktualisiert")
+                shop_logger.info(f"✅ Shop-Kategorie '{self.original_name}' zu '{self.category_name.value}' aktualisiert")
             else:
                 await interaction.response.send_message(
                     "❌ Fehler beim Speichern der Kategorie.",
@@ -10106,7 +12394,7 @@ class EditShopCategoryModal(Modal):
                 )
                 
         except Exception as e:
-            print(f"❌ Fehler beim Bearbeiten der Shop-Kategorie: {e}")
+            shop_logger.error(f"❌ Fehler beim Bearbeiten der Shop-Kategorie: {e}")
             await interaction.response.send_message(
                 "❌ Ein Fehler ist aufgetreten.",
                 ephemeral=True
@@ -10170,7 +12458,7 @@ class SelectCategoryToDeleteModal(Modal):
                     f"⚠️ Diese Änderung kann nicht rückgängig gemacht werden!",
                     ephemeral=True
                 )
-                print(f"🗑️ Shop-Kategorie '{self.category_name.value}' gelöscht ({products_count} Produkte)")
+                shop_logger.info(f"🗑️ Shop-Kategorie '{self.category_name.value}' gelöscht ({products_count} Produkte)")
             else:
                 await interaction.response.send_message(
                     "❌ Fehler beim Löschen der Kategorie.",
@@ -10178,7 +12466,7 @@ class SelectCategoryToDeleteModal(Modal):
                 )
                 
         except Exception as e:
-            print(f"❌ Fehler beim Löschen der Shop-Kategorie: {e}")
+            shop_logger.error(f"❌ Fehler beim Löschen der Shop-Kategorie: {e}")
             await interaction.response.send_message(
                 "❌ Ein Fehler ist aufgetreten.",
                 ephemeral=True
@@ -10238,7 +12526,7 @@ class SelectProductToEditModal(Modal):
             await interaction.response.send_modal(edit_modal)
             
         except Exception as e:
-            print(f"❌ Fehler beim Auswählen des Produkts: {e}")
+            shop_logger.error(f"❌ Fehler beim Auswählen des Produkts: {e}")
             await interaction.response.send_message(
                 "❌ Ein Fehler ist aufgetreten.",
                 ephemeral=True
@@ -10321,7 +12609,7 @@ class EditShopProductModal(Modal):
                     f"Das Produkt ist sofort im Shop verfügbar!",
                     ephemeral=True
                 )
-                print(f"✅ Produkt '{self.original_product_name}' zu '{self.product_name.value}' aktualisiert")
+                shop_logger.info(f"✅ Produkt '{self.original_product_name}' zu '{self.product_name.value}' aktualisiert")
             else:
                 await interaction.response.send_message(
                     "❌ Fehler beim Speichern des Produkts.",
@@ -10329,7 +12617,7 @@ class EditShopProductModal(Modal):
                 )
                 
         except Exception as e:
-            print(f"❌ Fehler beim Bearbeiten des Produkts: {e}")
+            shop_logger.error(f"❌ Fehler beim Bearbeiten des Produkts: {e}")
             await interaction.response.send_message(
                 "❌ Ein Fehler ist aufgetreten.",
                 ephemeral=True
@@ -10409,7 +12697,7 @@ class SelectProductToDeleteModal(Modal):
                     f"⚠️ Diese Änderung kann nicht rückgängig gemacht werden!",
                     ephemeral=True
                 )
-                print(f"🗑️ Produkt '{self.product_name.value}' aus '{self.category_name.value}' gelöscht")
+                shop_logger.info(f"🗑️ Produkt '{self.product_name.value}' aus '{self.category_name.value}' gelöscht")
             else:
                 await interaction.response.send_message(
                     "❌ Fehler beim Löschen des Produkts.",
@@ -10417,7 +12705,7 @@ class SelectProductToDeleteModal(Modal):
                 )
                 
         except Exception as e:
-            print(f"❌ Fehler beim Löschen des Produkts: {e}")
+            shop_logger.error(f"❌ Fehler beim Löschen des Produkts: {e}")
             await interaction.response.send_message(
                 "❌ Ein Fehler ist aufgetreten.",
                 ephemeral=True
@@ -10501,7 +12789,7 @@ class ShopDiscountCodeModal(Modal):
     async def on_submit(self, interaction: discord.Interaction):
         try:
             # Validate and apply discount code
-            success, new_price, discount_text, message = validate_and_use_discount_code(
+            success, new_price, discount_text, message = await validate_and_use_discount_code(
                 self.discount_code.value, 
                 self.user.id, 
                 self.original_price
@@ -10556,29 +12844,28 @@ class ShopDiscountCodeModal(Modal):
                                     break
                             break
                 except Exception as e:
-                    print(f"❌ Fehler beim Aktualisieren der Ticket-Nachricht: {e}")
+                    logger.error(f"❌ Fehler beim Aktualisieren der Ticket-Nachricht: {e}")
                 
                 # Log discount usage
-                print(f"🎟️ Discount Code '{self.discount_code.value}' verwendet von {self.user} in {self.ticket_channel.name}")
+                logger.info(f"🎟️ Discount Code '{self.discount_code.value}' verwendet von {self.user} in {self.ticket_channel.name}")
                 
                 # Update pending tickets with new price
                 try:
-                    with open('pending_tickets.json', 'r') as f:
-                        pending_tickets = json.load(f)
+                    pending_tickets = await ticket_db.get_pending_tickets_for_user(self.user.id)
                     
                     for ticket_id, ticket_data in pending_tickets.items():
-                        if ticket_data.get("user_id") == self.user.id and ticket_data.get("product") == self.product_name:
-                            ticket_data["original_price"] = self.original_price
-                            ticket_data["discounted_price"] = new_price
-                            ticket_data["discount_code"] = self.discount_code.value.upper()
-                            ticket_data["discount_text"] = discount_text
+                        if ticket_data.get("product") == self.product_name:
+                            await ticket_db.update_pending_ticket(
+                                ticket_id,
+                                original_price=self.original_price,
+                                discounted_price=new_price,
+                                discount_code=self.discount_code.value.upper(),
+                                discount_text=discount_text
+                            )
                             break
-                    
-                    with open('pending_tickets.json', 'w') as f:
-                        json.dump(pending_tickets, f, indent=2)
                         
                 except Exception as e:
-                    print(f"❌ Fehler beim Aktualisieren der pending_tickets.json: {e}")
+                    logger.error(f"❌ Fehler beim Aktualisieren des Shop-Tickets: {e}")
             
             else:
                 # Send error message
@@ -10593,7 +12880,7 @@ class ShopDiscountCodeModal(Modal):
                 )
                 
         except Exception as e:
-            print(f"❌ Fehler beim Anwenden des Discount Codes: {e}")
+            logger.error(f"❌ Fehler beim Anwenden des Discount Codes: {e}")
             await interaction.response.send_message(
                 "❌ Ein Fehler ist beim Anwenden des Discount-Codes aufgetreten. "
                 "Bitte versuche es erneut oder kontaktiere einen Administrator.",
@@ -10722,9 +13009,9 @@ class AddEnhancedDiscountModal(Modal):
                 return
             
             # Load existing codes
-            discount_codes = load_discount_codes()
+            existing_code = await ticket_db.get_discount_code(code)
             
-            if code in discount_codes:
+            if existing_code is not None:
                 await interaction.response.send_message(
                     f"❌ Discount-Code '{code}' existiert bereits!",
                     ephemeral=True
@@ -10743,8 +13030,7 @@ class AddEnhancedDiscountModal(Modal):
                 "description": self.description.value or f"{'Prozentualer' if discount_type == 'percentage' else 'Fester'} Rabatt"
             }
             
-            discount_codes[code] = new_code
-            save_discount_codes(discount_codes)
+            await save_discount_code(code, new_code)
             
             # Success message
             if discount_type == "percentage":
@@ -10763,10 +13049,10 @@ class AddEnhancedDiscountModal(Modal):
                 f"Der Code ist sofort im Shop verfügbar!",
                 ephemeral=True
             )
-            print(f"➕ Enhanced Discount Code erstellt: {code} ({value_display}, {usage_display}) von {interaction.user}")
+            payments_logger.info(f"➕ Enhanced Discount Code erstellt: {code} ({value_display}, {usage_display}) von {interaction.user}")
             
         except Exception as e:
-            print(f"❌ Fehler beim Erstellen des Enhanced Discount Codes: {e}")
+            payments_logger.error(f"❌ Fehler beim Erstellen des Enhanced Discount Codes: {e}")
             await interaction.response.send_message(
                 "❌ Ein Fehler ist aufgetreten.",
                 ephemeral=True
@@ -10846,9 +13132,9 @@ class SingleUseDiscountModal(Modal):
                 return
             
             # Load existing codes
-            discount_codes = load_discount_codes()
+            existing_code = await ticket_db.get_discount_code(code)
             
-            if code in discount_codes:
+            if existing_code is not None:
                 await interaction.response.send_message(
                     f"❌ Discount-Code '{code}' existiert bereits!",
                     ephemeral=True
@@ -10867,8 +13153,7 @@ class SingleUseDiscountModal(Modal):
                 "description": self.description.value or f"Einmaliger {'prozentualer' if discount_type == 'percentage' else 'fester'} Rabatt"
             }
             
-            discount_codes[code] = new_code
-            save_discount_codes(discount_codes)
+            await save_discount_code(code, new_code)
             
             # Success message
             if discount_type == "percentage":
@@ -10885,10 +13170,10 @@ class SingleUseDiscountModal(Modal):
                 f"⚠️ **Wichtig:** Dieser Code kann nur einmal verwendet werden und wird danach automatisch deaktiviert!",
                 ephemeral=True
             )
-            print(f"🎫 Single-Use Discount Code erstellt: {code} ({value_display}) von {interaction.user}")
+            payments_logger.info(f"🎫 Single-Use Discount Code erstellt: {code} ({value_display}) von {interaction.user}")
             
         except Exception as e:
-            print(f"❌ Fehler beim Erstellen des Single-Use Discount Codes: {e}")
+            payments_logger.error(f"❌ Fehler beim Erstellen des Single-Use Discount Codes: {e}")
             await interaction.response.send_message(
                 "❌ Ein Fehler ist aufgetreten.",
                 ephemeral=True
@@ -10925,9 +13210,10 @@ class ResetDiscountUsageModal(Modal):
                 return
             
             code = self.code_name.value.upper().strip()
-            discount_codes = load_discount_codes()
+            # Reset usage
+            reset_result = await ticket_db.reset_discount_code_usage(code)
             
-            if code not in discount_codes:
+            if reset_result is None:
                 await interaction.response.send_message(
                     f"❌ Code '{code}' nicht gefunden!\n\n"
                     f"Überprüfe die Schreibweise des Codes.",
@@ -10935,15 +13221,8 @@ class ResetDiscountUsageModal(Modal):
                 )
                 return
             
-            # Store old values for confirmation
-            old_uses = discount_codes[code].get("current_uses", 0)
-            old_users = len(discount_codes[code].get("used_by", []))
-            
-            # Reset usage
-            discount_codes[code]["current_uses"] = 0
-            discount_codes[code]["used_by"] = []
-            
-            save_discount_codes(discount_codes)
+            # Old values for confirmation
+            old_uses, old_users = reset_result
             
             await interaction.response.send_message(
                 f"✅ **Code-Nutzung zurückgesetzt!**\n\n"
@@ -10953,10 +13232,10 @@ class ResetDiscountUsageModal(Modal):
                 f"Der Code kann jetzt wieder von allen Nutzern verwendet werden!",
                 ephemeral=True
             )
-            print(f"🔄 Discount Code Nutzung zurückgesetzt: {code} (war {old_uses}x verwendet) von {interaction.user}")
+            payments_logger.info(f"🔄 Discount Code Nutzung zurückgesetzt: {code} (war {old_uses}x verwendet) von {interaction.user}")
             
         except Exception as e:
-            print(f"❌ Fehler beim Zurücksetzen der Code-Nutzung: {e}")
+            payments_logger.error(f"❌ Fehler beim Zurücksetzen der Code-Nutzung: {e}")
             await interaction.response.send_message(
                 "❌ Ein Fehler ist aufgetreten.",
                 ephemeral=True
@@ -10990,12 +13269,26 @@ async def show_banner_config(interaction):
         inline=False
     )
     
+    asset_channel_id = get_server_config(interaction.guild.id).get("channels", {}).get("asset_channel")
+    embed.add_field(
+        name="🗄️ Banner-Cache",
+        value=(f"Lokale Banner werden einmal in <#{asset_channel_id}> hochgeladen und danach per Link wiederverwendet."
+               if asset_channel_id else
+               "❌ Kein Asset-Kanal gesetzt - jede Bestell- und Zahlungsnachricht lädt das Banner neu hoch.\n"
+               "Setze einen (am besten nur für den Bot sichtbaren) Kanal über **🗄️ Asset-Kanal**."),
+        inline=False
+    )
+    
     # Set current banner as preview
     if current_banner.startswith("http"):
         embed.set_image(url=current_banner)
     
     banner_view = View(timeout=300)
     
+    # Asset channel for the banner upload cache
+    asset_button = Button(label="🗄️ Asset-Kanal", style=discord.ButtonStyle.secondary)
+    asset_button.callback = lambda i: show_asset_channel_modal(i)
+    
     # Manual URL button
     manual_button = Button(label="🔗 URL eingeben", style=discord.ButtonStyle.primary)
     manual_button.callback = lambda i: show_banner_url_modal(i)
@@ -11010,6 +13303,7 @@ async def show_banner_config(interaction):
     
     banner_view.add_item(manual_button)
     banner_view.add_item(reset_button)
+    banner_view.add_item(asset_button)
     banner_view.add_item(back_button)
     
     await interaction.response.send_message(embed=embed, view=banner_view, ephemeral=True)
@@ -11019,21 +13313,25 @@ async def show_banner_url_modal(interaction):
     modal = BannerUrlModal()
     await interaction.response.send_modal(modal)
 
+async def show_asset_channel_modal(interaction):
+    """Show modal for the banner cache's asset channel"""
+    modal = AssetChannelModal()
+    await interaction.response.send_modal(modal)
+
 async def reset_banner_to_default(interaction):
     """Reset banner to default"""
     try:
-        default_banner = "attached_assets/bannergif-ezgif.com-video-to-gif-converter_1757170618892.gif"
-        set_server_banner_url(interaction.guild.id, default_banner)
+        set_server_banner_url(interaction.guild.id, DEFAULT_BANNER_PATH)
         
         await interaction.response.send_message(
             "✅ **Banner zurückgesetzt!**\n\n"
             "Das Standard-Banner wird wieder für alle Bot-Nachrichten verwendet.",
             ephemeral=True
         )
-        print(f"🖼️ Banner reset to default for guild {interaction.guild.name}")
+        assets_logger.info(f"🖼️ Banner reset to default for guild {interaction.guild.name}")
         
     except Exception as e:
-        print(f"❌ Error resetting banner: {e}")
+        assets_logger.error(f"❌ Error resetting banner: {e}")
         await interaction.response.send_message(
             "❌ Fehler beim Zurücksetzen des Banners.",
             ephemeral=True
@@ -11081,15 +13379,61 @@ class BannerUrlModal(Modal):
             embed.set_footer(text="Haze Visuals • Banner System")
             
             await interaction.response.send_message(embed=embed, ephemeral=True)
-            print(f"🖼️ Banner manually set for guild {interaction.guild.name}: {banner_url}")
+            assets_logger.info(f"🖼️ Banner manually set for guild {interaction.guild.name}: {banner_url}")
             
         except Exception as e:
-            print(f"❌ Error setting banner URL: {e}")
+            assets_logger.error(f"❌ Error setting banner URL: {e}")
             await interaction.response.send_message(
                 "❌ Fehler beim Setzen der Banner-URL.",
                 ephemeral=True
             )
 
+class AssetChannelModal(Modal):
+    def __init__(self):
+        super().__init__(title="🗄️ Asset-Kanal für Banner")
+        
+        self.channel_id = TextInput(
+            label="Asset Kanal ID",
+            placeholder="ID eines Kanals nur für den Bot - leer lassen zum Deaktivieren",
+            required=False,
+            max_length=20
+        )
+        
+        self.add_item(self.channel_id)
+    
+    async def on_submit(self, interaction: discord.Interaction):
+        config = get_server_config(interaction.guild.id)
+        value = self.channel_id.value.strip()
+        
+        if not value:
+            config.setdefault("channels", {})["asset_channel"] = None
+            save_server_config(interaction.guild.id, config)
+            await interaction.response.send_message(
+                "✅ **Asset-Kanal entfernt!**\n\nBanner werden wieder an jede Nachricht angehängt.",
+                ephemeral=True
+            )
+            return
+        
+        channel = interaction.guild.get_channel(int(value)) if value.isdigit() else None
+        if not isinstance(channel, discord.TextChannel):
+            await interaction.response.send_message("❌ Kein Textkanal mit dieser ID auf diesem Server gefunden.", ephemeral=True)
+            return
+        permissions = channel.permissions_for(interaction.guild.me)
+        if not (permissions.send_messages and permissions.attach_files and permissions.read_message_history):
+            await interaction.response.send_message(
+                f"❌ Der Bot braucht in {channel.mention} die Rechte Nachrichten senden, Dateien anhängen und Nachrichtenverlauf lesen.",
+                ephemeral=True
+            )
+            return
+        
+        config.setdefault("channels", {})["asset_channel"] = channel.id
+        save_server_config(interaction.guild.id, config)
+        await interaction.response.send_message(
+            f"✅ **Asset-Kanal gesetzt!**\n\nBanner werden ab jetzt einmal in {channel.mention} hochgeladen und danach wiederverwendet.",
+            ephemeral=True
+        )
+        assets_logger.info(f"🗄️ Asset channel for guild {interaction.guild.name} set to #{channel.name}")
+
 class AutoDeleteDiscountModal(Modal):
     def __init__(self):
         super().__init__(title="🗑️ Auto-Lösch-Code erstellen")
@@ -11164,9 +13508,9 @@ class AutoDeleteDiscountModal(Modal):
                 return
             
             # Load existing codes
-            discount_codes = load_discount_codes()
+            existing_code = await ticket_db.get_discount_code(code)
             
-            if code in discount_codes:
+            if existing_code is not None:
                 await interaction.response.send_message(
                     f"❌ Discount-Code '{code}' existiert bereits!",
                     ephemeral=True
@@ -11185,8 +13529,7 @@ class AutoDeleteDiscountModal(Modal):
                 "description": self.description.value or f"Auto-Lösch {'prozentualer' if discount_type == 'percentage' else 'fester'} Rabatt"
             }
             
-            discount_codes[code] = new_code
-            save_discount_codes(discount_codes)
+            await save_discount_code(code, new_code)
             
             # Success message
             if discount_type == "percentage":
@@ -11203,36 +13546,27 @@ class AutoDeleteDiscountModal(Modal):
                 f"⚠️ **Wichtig:** Dieser Code verschwindet komplett nach einmaliger Nutzung!",
                 ephemeral=True
             )
-            print(f"🗑️ Auto-Delete Discount Code erstellt: {code} ({value_display}) von {interaction.user}")
+            payments_logger.info(f"🗑️ Auto-Delete Discount Code erstellt: {code} ({value_display}) von {interaction.user}")
             
         except Exception as e:
-            print(f"❌ Fehler beim Erstellen des Auto-Delete Discount Codes: {e}")
+            payments_logger.error(f"❌ Fehler beim Erstellen des Auto-Delete Discount Codes: {e}")
             await interaction.response.send_message(
                 "❌ Ein Fehler ist aufgetreten.",
                 ephemeral=True
             )
 
-def run_flask():
-    """Run Flask server in a separate thread"""
-    app.run(host="0.0.0.0", port=5000, debug=False)
-
 def run_discord_bot():
     """Run Discord bot"""
     token = os.getenv("DISCORD_TOKEN")
     if not token:
-        print("❌ Fehler: DISCORD_TOKEN Umgebungsvariable ist nicht gesetzt!")
+        logger.error("❌ Fehler: DISCORD_TOKEN Umgebungsvariable ist nicht gesetzt!")
         exit(1)
     
-    bot.run(token)
+    bot.run(token, log_handler=None)  # discord.py logs through our queue handler
 
 # Bot starten
 if __name__ == "__main__":
-    print("🚀 Starting Discord bot with HTTP server...")
-    
-    # Start Flask server in a separate thread
-    flask_thread = threading.Thread(target=run_flask, daemon=True)
-    flask_thread.start()
-    print("✅ HTTP server started on port 5000")
+    logger.info("🚀 Starting Discord bot with HTTP server...")
     
-    # Start Discord bot (this will block)
-    run_discord_bot()
\ No newline at end of file
+    # The HTTP server runs on the bot's event loop (started in setup_hook)
+    run_discord_bot()
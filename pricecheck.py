@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Haze Visuals Discord Bot - Crypto Price Cache Check
+Runs main.py's CryptoPriceCache against the local price stand-in
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+
+from fakeprices import FakePriceServer
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+TTL = 0.3
+MAX_STALE = 1.0
+
+def import_main(workdir):
+    os.environ.setdefault('DATABASE_PATH', os.path.join(workdir, 'ticketbot.db'))
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_DIR)
+    import main
+    return main
+
+class Checks:
+    def __init__(self):
+        self.failed = 0
+
+    def expect(self, condition, description):
+        print(f"{'✅' if condition else '❌'} {description}")
+        if not condition:
+            self.failed += 1
+
+async def check_ttl_hit(main, server, http, checks):
+    cache = main.CryptoPriceCache(server.url, TTL, MAX_STALE, http)
+    first = await cache.get()
+    second = await cache.get()
+    checks.expect(first == second and first['bitcoin'] == server.prices['bitcoin'], "TTL: Kurse aus dem Cache identisch")
+    checks.expect(server.requests == 1, f"TTL: ein Upstream-Request für zwei Abfragen ({server.requests})")
+    checks.expect(cache.counters['hits'] == 1, "TTL: zweite Abfrage ist ein Cache-Hit")
+
+async def check_single_flight(main, server, http, checks):
+    cache = main.CryptoPriceCache(server.url, TTL, MAX_STALE, http)
+    server.latency = 0.2
+    results = await asyncio.gather(*(cache.get() for _ in range(25)))
+    server.latency = 0.0
+    checks.expect(server.requests == 1, f"Single Flight: 25 gleichzeitige Abfragen, {server.requests} Upstream-Request")
+    checks.expect(all(result == results[0] and result for result in results), "Single Flight: alle Aufrufer bekommen dieselben Kurse")
+
+async def check_stale_fallback(main, server, http, checks):
+    cache = main.CryptoPriceCache(server.url, TTL, MAX_STALE, http)
+    fresh = await cache.get()
+    await asyncio.sleep(TTL + 0.05)
+
+    server.fail_status = 500
+    stale = await cache.get()
+    await cache._refresh_task
+    checks.expect(stale == fresh, "Fallback: abgelaufener Kurs wird während des Refreshs ausgeliefert")
+    checks.expect(cache.counters['errors'] == 1, "Fallback: Upstream-Fehler wird gezählt")
+    checks.expect(await cache.get() == fresh, "Fallback: nach dem Fehler weiter der letzte Kurs")
+
+    await asyncio.sleep(MAX_STALE)
+    checks.expect(await cache.get() is None, "Fallback: kein Kurs mehr nach max_stale bei Upstream-Fehler")
+
+    server.fail_status = None
+    recovered = await cache.get()
+    checks.expect(recovered == fresh, "Fallback: nach Ende der Störung wieder frische Kurse")
+
+async def run_checks(main):
+    checks = Checks()
+    http = main.HttpClient(pool_size=5, timeout=2.0)
+    try:
+        for check in (check_ttl_hit, check_single_flight, check_stale_fallback):
+            server = FakePriceServer()
+            await server.start()
+            try:
+                await check(main, server, http, checks)
+            finally:
+                await server.stop()
+    finally:
+        await http.close()
+    return checks.failed
+
+def main_entry():
+    workdir = tempfile.mkdtemp(prefix="ticketbot-pricecheck-")
+    try:
+        failed = asyncio.run(run_checks(import_main(workdir)))
+    finally:
+        os.chdir(REPO_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(f"\n❌ {failed} Checks fehlgeschlagen" if failed else "\n✅ Alle Checks bestanden")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main_entry())
@@ -9,31 +9,21 @@ import sys
 import asyncio
 import signal
 import logging
-from main import bot, app
-import threading
-import time
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from main import bot
 
+# Handlers and levels come from main.py's logging setup
 logger = logging.getLogger('HazeVisuals')
 
-def signal_handler(signum, frame):
+shutdown_tasks = set()
+
+def request_shutdown(signum):
     """Handle shutdown signals gracefully"""
     logger.info(f"Received signal {signum}, shutting down gracefully...")
-    # Close bot connection
-    asyncio.create_task(bot.close())
-    sys.exit(0)
-
-def run_flask_server():
-    """Run Flask server in separate thread"""
-    try:
-        app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)), debug=False)
-    except Exception as e:
-        logger.error(f"Flask server error: {e}")
+    # Closes the gateway connection and the HTTP server together; keep a
+    # reference so the task is not garbage-collected mid-shutdown
+    task = asyncio.create_task(bot.close())
+    shutdown_tasks.add(task)
+    task.add_done_callback(shutdown_tasks.discard)
 
 async def main():
     """Main startup function"""
@@ -48,13 +38,13 @@ async def main():
     logger.info(f"🐍 Python version: {sys.version}")
     logger.info(f"📍 Working directory: {os.getcwd()}")
     
+    # Set up signal handlers for graceful shutdown
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, request_shutdown, signum)
+    
     try:
-        # Start Flask server in background thread
-        flask_thread = threading.Thread(target=run_flask_server, daemon=True)
-        flask_thread.start()
-        logger.info("✅ HTTP server started in background")
-        
-        # Start Discord bot
+        # Start Discord bot (also serves the HTTP endpoints on this event loop)
         await bot.start(discord_token)
         
     except KeyboardInterrupt:
@@ -68,10 +58,6 @@ async def main():
         logger.info("🛑 Bot shutdown complete")
 
 if __name__ == "__main__":
-    # Set up signal handlers for graceful shutdown
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-    
     # Run the bot
     try:
         asyncio.run(main())